@@ -1,10 +1,26 @@
 import os
+import shlex
+import tempfile
+import time
+from functools import partial
 import streamlit as st
 from dotenv import load_dotenv
 from database.db_manager import init_db, SessionLocal, migrate_schema
-from database.models import Base, Resume, Job, Decision
-from utils.resume_parser import parse_resume_file
-from llm.llm_handler import get_reviewer_chain, review_resumes
+from database.models import Base, Resume, Job
+from database.bulk import stream_save_decisions
+from database.job_queue import ACTIVE_JOB_STATES, cancel_job, enqueue_job, job_progress
+from database.queries import decision_stats, export_decisions, iter_decisions, list_decisions, list_jobs
+from database.resume_store import get_or_create_resumes
+from llm.llm_handler import SCREEN_MODEL_NAMES, get_batch_reviewer_chain, get_reviewer_chain, iter_review_resumes, iter_review_resumes_packed
+from llm.cascade import cascade_stats, is_single_tier, iter_review_resumes_cascade
+from llm.clients import pool_stats
+from llm.resilience import resilience_stats
+from llm.async_engine import iter_review_resumes_async
+from llm.usage_tracker import usage_context
+from utils.prescreen import iter_review_with_prescreen, prescreen
+from utils.resume_index import get_resume_index
+from utils.token_counter import compact_resumes
+from config.settings import settings
 
 # Suppress ALTS credentials warning for local development
 os.environ['GRPC_VERBOSITY'] = 'ERROR'
@@ -14,18 +30,139 @@ load_dotenv()
 
 st.set_page_config(page_title="ATS Agent", layout="wide")
 
+@st.cache_resource
+def _setup_database():
+    """Create tables and run the lightweight migration once per process, not on every rerun."""
+    engine, Session = init_db()
+    Base.metadata.create_all(bind=engine)
+    migrate_schema(engine)
+    return engine, Session
+
+
 # Initialize DB
-engine, _Session = init_db()
-Base.metadata.create_all(bind=engine)
-# Run lightweight migration for new columns (idempotent)
-migrate_schema(engine)
+engine, _Session = _setup_database()
+
+
+def _paged(key, scope, fetch):
+    """Keyset pagination state: ``fetch(after)`` returns (rows, next cursor); the cursor stack resets when ``scope`` changes."""
+    state = st.session_state.setdefault(key, {"scope": None, "cursors": [None]})
+    if state["scope"] != scope:
+        state.update(scope=scope, cursors=[None])
+    rows, next_cursor = fetch(state["cursors"][-1])
+    prev_col, page_col, next_col = st.columns([1, 2, 1])
+    if prev_col.button("◀ Previous", key=f"{key}_prev", disabled=len(state["cursors"]) == 1):
+        state["cursors"].pop()
+        st.rerun()
+    page_col.caption(f"Page {len(state['cursors'])}")
+    if next_col.button("Next ▶", key=f"{key}_next", disabled=next_cursor is None):
+        state["cursors"].append(next_cursor)
+        st.rerun()
+    return rows
+
+
+def _export_command(filters, fmt, output):
+    """The ``history.py export`` command line equivalent to the History view's filters."""
+    parts = ["python history.py export", f"--job-id {filters['job_id']}", f"--format {fmt}", f"--output {output}"]
+    if filters.get("categories"):
+        parts.append("--category " + " ".join(filters["categories"]))
+    if filters.get("min_score") is not None:
+        parts.append(f"--min-score {filters['min_score']} --max-score {filters['max_score']}")
+    if filters.get("filename"):
+        parts.append(f"--filename {shlex.quote(filters['filename'])}")
+    return " ".join(parts)
+
+
+def _history_view():
+    """Past jobs and their decisions: keyset pages, SQL aggregates and a streamed export."""
+    session = _Session()
+    try:
+        f1, f2 = st.columns(2)
+        title_filter = f1.text_input("Job title contains").strip() or None
+        status_filter = f2.selectbox("Job status", ["any", "queued", "running", "done", "cancelled"])
+        status_filter = None if status_filter == "any" else status_filter
+        jobs = _paged("history_jobs", (title_filter, status_filter),
+                      lambda after: list_jobs(session, after=after, limit=20, status=status_filter, title=title_filter))
+        if not jobs:
+            st.info("No jobs match.")
+            return
+        st.dataframe(jobs, hide_index=True, column_order=["id", "title", "status", "provider", "engine", "created_at", "decisions", "A", "B", "C", "errors"])
+        job = st.selectbox("Job", jobs, format_func=lambda j: f"#{j['id']} {j['title']} ({j['decisions']} decisions)")
+
+        st.subheader(f"Job {job['id']}: {job['title']}")
+        c1, c2, c3 = st.columns(3)
+        categories = c1.multiselect("Category", ["A", "B", "C", "error"])
+        score_range = c2.slider("Score", 0, 100, (0, 100))
+        filename = c3.text_input("Filename contains").strip() or None
+        filters = {"job_id": job["id"], "categories": categories or None, "filename": filename}
+        if score_range != (0, 100):  # the full range also keeps unscored (error) rows
+            filters.update(min_score=score_range[0], max_score=score_range[1])
+
+        stats = decision_stats(session, **filters)
+        m = st.columns(6)
+        for col, (label, key) in zip(m, [("Decisions", "decisions"), ("A", "A"), ("B", "B"), ("C", "C"), ("Errors", "errors"), ("Avg score", "avg_score")]):
+            col.metric(label, "—" if stats[key] is None else stats[key])
+        if stats["histogram"]:
+            st.bar_chart({"decisions": stats["histogram"]})
+
+        rows = _paged("history_decisions", tuple(sorted((k, str(v)) for k, v in filters.items())),
+                      lambda after: list_decisions(session, after=after, limit=50, **filters))
+        st.dataframe(rows, hide_index=True, column_order=["filename", "decision", "category", "match_score", "escalated", "rationale", "resume_id", "created_at"])
+
+        e1, e2 = st.columns([1, 3])
+        fmt = e1.radio("Export format", ["csv", "jsonl"], horizontal=True)
+        if stats["decisions"] > settings.history_export_max_rows:
+            # Streamlit serves downloads from memory; large exports stream to a file from the CLI instead
+            e2.info(f"{stats['decisions']} rows is above HISTORY_EXPORT_MAX_ROWS ({settings.history_export_max_rows}). Export them with:")
+            e2.code(_export_command(filters, fmt, f"job_{job['id']}.{fmt}"), language="bash")
+        elif e2.button(f"Prepare {fmt.upper()} export ({stats['decisions']} rows)"):
+            with tempfile.TemporaryFile("w+b") as raw:
+                with open(raw.fileno(), "w", encoding="utf-8", newline="", closefd=False) as fh:
+                    count = export_decisions(session, fh, fmt=fmt, limit=settings.history_export_max_rows, **filters)
+                raw.seek(0)
+                st.download_button(f"Download {count} decision(s)", raw.read(), file_name=f"job_{job['id']}.{fmt}",
+                                   mime="text/csv" if fmt == "csv" else "application/jsonl")
+    finally:
+        session.close()
+
 
 st.title("ATS Agent: Resume Screening")
 
+if st.sidebar.radio("View", ["Screen resumes", "History"], horizontal=True) == "History":
+    _history_view()
+    st.stop()
+
 with st.sidebar:
     st.header("Settings")
     provider = st.selectbox("LLM Provider", ["openai", "anthropic", "google"], index=["openai","anthropic","google"].index(os.getenv("DEFAULT_LLM_PROVIDER", "openai")))
     temperature = st.slider("Temperature", 0.0, 1.0, 0.2, 0.05)
+    engine_modes = ["threads", "async", "packed", "cascade"]
+    engine_mode = st.selectbox("Review engine", engine_modes, index=engine_modes.index(settings.review_engine if settings.review_engine in engine_modes else "threads"), help="async: rate-limited asyncio engine with adaptive concurrency and retries. packed: several resumes per call sharing one JD prompt. cascade: a cheap model screens everything and only close calls go to the selected provider's model.")
+    if engine_mode == "cascade":
+        with st.expander("Cascade", expanded=True):
+            providers = ["openai", "anthropic", "google"]
+            screen_provider = st.selectbox("Screening provider", providers, index=providers.index(settings.cascade_screen_provider or provider))
+            screen_model = st.text_input("Screening model", value=settings.cascade_screen_model or SCREEN_MODEL_NAMES[screen_provider])
+            cascade_band = st.slider("Escalate scores in", 0, 100, (settings.cascade_band_low, settings.cascade_band_high), help="Category B verdicts are always escalated.")
+            if is_single_tier(provider, screen_provider, screen_model):
+                st.warning(f"The screening model is the review model ({screen_model}); the cascade will run as a single tier. Pick a cheaper screening model.")
+    run_in_background = st.checkbox("Run in background", value=settings.job_queue_enabled, help="Queue the review for worker processes (`python worker.py`) instead of running it in this page. Closing the tab or restarting the app does not lose progress.")
+    resume_token_budget = st.number_input("Resume token budget (0 = no truncation)", min_value=0, value=settings.resume_token_budget, step=500, help="Resumes are cleaned of PDF noise and, above this size, trimmed by section priority before review.")
+    bypass_cache = st.checkbox("Bypass decision cache", value=False, help="Re-run the LLM even for resumes already screened against this exact job.")
+    with st.expander("Lexical prescreen"):
+        prescreen_on = st.checkbox("Prescreen before LLM", value=settings.prescreen_enabled, help="Rank resumes with BM25 against the JD and only send the best ones to the LLM; the rest are filed as C.")
+        prescreen_top_k = st.number_input("Top K sent to LLM (0 = no cap)", min_value=0, value=settings.prescreen_top_k, step=10)
+        prescreen_threshold = st.slider("Min lexical score", 0, 100, settings.prescreen_threshold)
+        prescreen_shadow = st.checkbox("Shadow mode (review everyone, measure recall)", value=settings.prescreen_shadow)
+    with st.expander("Resume archive"):
+        archive_on = st.checkbox("Include archived resumes", value=False, help="Search every resume stored by earlier runs and add the best matches for this JD to the review.")
+        archive_top_n = st.number_input("Archived candidates to review", min_value=1, value=25, step=5)
+    with st.expander("Hedging and provider health"):
+        hedge_options = ["none"] + [p for p in ["openai", "anthropic", "google"] if p != provider]
+        hedge_choice = st.selectbox("Hedge slow calls to", hedge_options, index=hedge_options.index(settings.hedge_provider) if settings.hedge_provider in hedge_options else 0, help="A call still running past the provider's p95 latency is also sent here; the first valid answer wins. Threads and packed engines only.")
+        hedge_provider = None if hedge_choice == "none" else hedge_choice
+        st.json(resilience_stats())
+    with st.expander("Connection pools"):
+        st.json(pool_stats())
 
 col1, col2 = st.columns(2)
 
@@ -40,121 +177,294 @@ with col2:
     uploads = st.file_uploader("Upload resumes (PDF/DOCX)", type=["pdf","docx"], accept_multiple_files=True)
     start = st.button("Run Screening")
 
+CATEGORY_TITLES = {"A": "Category A (Strong Fit)", "B": "Category B (Potential Fit)", "C": "Category C (Not Suitable)",
+                   "error": "Errors (review failed, not a rejection)"}
+
+
+def _bucket(decision, category):
+    return "error" if decision == "error" else (category or "C")
+
+
+def _normalize_result(item):
+    """Result dict from any engine (older engines returned (id, decision, rationale) tuples)."""
+    if isinstance(item, dict):
+        return item
+    if isinstance(item, (list, tuple)) and len(item) >= 3:
+        rid, decision, rationale = item[:3]
+        return {
+            "resume_id": rid,
+            "decision": decision,
+            "rationale": rationale,
+            "category": 'A' if decision == 'approved' else 'C',
+            "match_score": None,
+        }
+    return None
+
+
+def _category_markdown(results, id_to_name):
+    lines = []
+    for res in sorted(results, key=lambda r: -(r.get("match_score") or 0)):
+        name = id_to_name.get(res["resume_id"], f"Resume ID {res['resume_id']}")
+        score = res.get("match_score")
+        cached = " (cached)" if res.get("cached") else ""
+        if res.get("escalated"):
+            cached += f" (escalated from {(res.get('screen') or {}).get('category') or 'error'})"
+        lines.append(f"- {name} (ID {res['resume_id']}) Score: {score if score is not None else '—'}{cached} — {res['rationale']}")
+    return "\n".join(lines) or "_None yet_"
+
+
+def _saved_results(job_id):
+    """Stored decisions of a job grouped by category bucket, and resume names by id."""
+    session = _Session()
+    saved, names = {}, {}
+    try:
+        for row in iter_decisions(session, job_id=job_id):
+            row["screen"] = {"category": row["screen_category"]}
+            saved.setdefault(_bucket(row["decision"], row["category"]), []).append(row)
+            names[row["resume_id"]] = row["filename"]
+    finally:
+        session.close()
+    return saved, names
+
+
+def _render_saved(saved, names):
+    for cat, title in CATEGORY_TITLES.items():
+        st.subheader(title)
+        st.markdown(_category_markdown(saved.get(cat, []), names))
+
+
+@st.fragment(run_every=2)
+def _queued_job_panel(job_id):
+    """Progress of a background job, refreshed every two seconds until the workers finish it."""
+    session = _Session()
+    try:
+        progress = job_progress(session, job_id)
+    finally:
+        session.close()
+    if progress["status"] not in ACTIVE_JOB_STATES:
+        st.rerun()  # finished or cancelled: redraw the page once without polling
+    finished = progress["done"] + progress["failed"]
+    st.progress(min(1.0, finished / max(progress["total"], 1)), text=f"{finished} / {progress['total']} reviewed ({progress['leased']} in progress, {progress['pending']} waiting for a worker)")
+    if st.button("Cancel job", key=f"cancel_job_{job_id}", help="Unfinished resumes are not reviewed. Finished results are kept."):
+        session = _Session()
+        try:
+            cancel_job(session, job_id)
+        finally:
+            session.close()
+        st.rerun()
+    _render_saved(*_saved_results(job_id))
+
+
+# A click on "Cancel remaining" stops the running script; this rerun shows what was saved before the stop
+if st.session_state.get("cancel_review") and st.session_state.get("active_job_id"):
+    cancelled_job_id = st.session_state.pop("active_job_id")
+    saved, names = _saved_results(cancelled_job_id)
+    st.warning(f"Review cancelled. {sum(len(v) for v in saved.values())} finished decision(s) for job {cancelled_job_id} were saved; remaining resumes were not reviewed.")
+    _render_saved(saved, names)
+
+# A background job submitted from this page (or opened with ?job=<id>): the workers do the review, the page polls
+queued_job_id = st.session_state.get("queued_job_id") or st.query_params.get("job")
+if queued_job_id and str(queued_job_id).isdigit() and not start:
+    queued_job_id = int(queued_job_id)
+    session = _Session()
+    try:
+        queued_progress = job_progress(session, queued_job_id)
+    finally:
+        session.close()
+    if queued_progress["status"] is not None:
+        st.subheader(f"Background job {queued_job_id}")
+        if queued_progress["status"] in ACTIVE_JOB_STATES:
+            if not queued_progress["leased"] and not queued_progress["done"] + queued_progress["failed"]:
+                st.caption("Waiting for a worker. Start one with `python worker.py` if none is running.")
+            _queued_job_panel(queued_job_id)
+        else:
+            if queued_progress["status"] == "cancelled":
+                st.warning(f"Job cancelled: {queued_progress['done']} resume(s) reviewed, {queued_progress['cancelled']} not reviewed.")
+            else:
+                st.success(f"Job complete: {queued_progress['decisions']} decision(s).")
+            if queued_progress["failed"]:
+                st.warning(f"{queued_progress['failed']} resume(s) could not be reviewed after every retry; they are listed under Errors.")
+            _render_saved(*_saved_results(queued_job_id))
+        if st.button("Dismiss", key="dismiss_queued_job"):
+            st.session_state.pop("queued_job_id", None)
+            st.query_params.pop("job", None)
+            st.rerun()
+
 if start:
-    if not job_desc or not uploads:
-        st.warning("Please provide a job description and at least one resume.")
+    if not job_desc or not (uploads or archive_on):
+        st.warning("Please provide a job description and at least one resume (or include archived resumes).")
         st.stop()
+    uploads = uploads or []
 
     session = _Session()
     try:
         # Save Job
         with st.spinner("Setting up job..."):
-            job = Job(title=job_title, description=job_desc, hr_prompt=hr_prompt)
+            job = Job(title=job_title, description=job_desc, hr_prompt=hr_prompt, provider=provider, temperature=temperature, engine=engine_mode)
             session.add(job)
             session.commit()
             session.refresh(job)
 
         # Parse resumes
         with st.spinner(f"Parsing {len(uploads)} resume(s)..."):
+            progress_bar = st.progress(0)
+            stored, parse_stats = get_or_create_resumes(
+                session,
+                [(file.name, file.getvalue()) for file in uploads],
+                on_progress=lambda done, total: progress_bar.progress(done / max(total, 1)),
+            )
             parsed_resumes = []
             id_to_name = {}
-            progress_bar = st.progress(0)
-            for idx, file in enumerate(uploads):
-                text = parse_resume_file(file)
-                resume = Resume(filename=file.name, content=text)
-                session.add(resume)
-                session.commit()
-                session.refresh(resume)
-                parsed_resumes.append((resume, text))
-                id_to_name[resume.id] = resume.filename
-                progress_bar.progress((idx + 1) / len(uploads))
+            for file, resume in zip(uploads, stored):
+                if resume.id in id_to_name:  # same file uploaded twice in this batch
+                    continue
+                parsed_resumes.append((resume, resume.content))
+                id_to_name[resume.id] = file.name
             progress_bar.empty()
+            if parse_stats["reused"] or parse_stats["duplicates"]:
+                st.caption(f"Parsed {parse_stats['parsed']} new file(s); reused {parse_stats['reused']} already-stored resume(s); skipped {parse_stats['duplicates']} duplicate upload(s).")
+            if parse_stats["reports"]:
+                with st.expander(f"Parse report ({parse_stats['failed']} issue(s))"):
+                    st.dataframe([
+                        {"file": r["filename"], "method": r["method"], "seconds": round(r["duration"], 3), "error": r["error"] or ""}
+                        for r in parse_stats["reports"]
+                    ])
+
+        if archive_on:
+            with st.spinner("Searching the resume archive..."):
+                index = get_resume_index()
+                index.sync(session)
+                hits = index.search(job_desc, hr_prompt, top_n=int(archive_top_n), exclude_ids=set(id_to_name))
+                hit_ids = [rid for rid, _ in hits]
+                archived = session.query(Resume).filter(Resume.id.in_(hit_ids)).all() if hit_ids else []
+                by_id = {r.id: r for r in archived}
+                for rid in hit_ids:
+                    if rid in by_id:
+                        parsed_resumes.append((by_id[rid], by_id[rid].content))
+                        id_to_name[rid] = f"{by_id[rid].filename} (archive)"
+            st.caption(f"Added {len(archived)} archived resume(s) from an index of {index.count}.")
 
-        # Run LLM review (now in parallel!)
-        st.info(f"🤖 Reviewing {len(parsed_resumes)} resume(s) in parallel... This should be much faster!")
-        with st.spinner("AI is analyzing resumes..."):
+        if run_in_background:
+            to_queue = [(r.id, t) for r, t in parsed_resumes]
+            screened_out = []
+            if prescreen_on and not prescreen_shadow:
+                to_queue, screened_out, _ = prescreen(job_desc, hr_prompt, to_queue, top_k=int(prescreen_top_k) or None, threshold=prescreen_threshold or None)
+            options = {"token_budget": int(resume_token_budget), "use_cache": not bypass_cache, "hedge_provider": hedge_provider}
+            if engine_mode == "cascade":
+                options.update(screen_provider=screen_provider, screen_model=screen_model, band=list(cascade_band))
+            queued = enqueue_job(session, job, [rid for rid, _ in to_queue], provider=provider, temperature=temperature,
+                                 engine=engine_mode, options=options, decided=screened_out)
+            st.session_state["queued_job_id"] = job.id
+            st.query_params["job"] = str(job.id)
+            if prescreen_on and prescreen_shadow:
+                st.toast("Shadow prescreen is not available for background runs; every resume was queued.")
+            st.toast(f"Queued {queued} resume(s) as job {job.id}.")
+            st.rerun()
+
+        # Run LLM review; each verdict is shown and saved as soon as its resume finishes
+        st.info(f"🤖 Reviewing {len(parsed_resumes)} resume(s) in parallel; results appear as each one finishes.")
+        with usage_context(job_id=job.id):
             chain = get_reviewer_chain(provider=provider, temperature=temperature)
-            raw_results = review_resumes(chain, job_desc, hr_prompt, [(r.id, t) for r, t in parsed_resumes], provider_name=provider)
-            # Normalize results shape (support older tuple version)
-            results = []
-            for item in raw_results:
-                if isinstance(item, dict):
-                    results.append(item)
-                elif isinstance(item, (list, tuple)) and len(item) >= 3:
-                    rid, decision, rationale = item[:3]
-                    results.append({
-                        "resume_id": rid,
-                        "decision": decision,
-                        "rationale": rationale,
-                        "category": 'A' if decision == 'approved' else 'C',
-                        "match_score": None,
-                    })
-                else:
-                    continue
+            if engine_mode == "packed":
+                iter_fn = partial(iter_review_resumes_packed, batch_chain=get_batch_reviewer_chain(provider=provider, temperature=temperature), hedge_provider=hedge_provider)
+            elif engine_mode == "async":
+                iter_fn = iter_review_resumes_async
+            elif engine_mode == "cascade":
+                iter_fn = partial(iter_review_resumes_cascade, screen_chain=get_reviewer_chain(provider=screen_provider, temperature=temperature, model=screen_model),
+                                  screen_provider=screen_provider, band=cascade_band, hedge_provider=hedge_provider)
+            else:
+                iter_fn = partial(iter_review_resumes, hedge_provider=hedge_provider)
+            to_review, compaction = compact_resumes([(r.id, t) for r, t in parsed_resumes], token_budget=int(resume_token_budget))
+            if compaction["saved_tokens"]:
+                st.caption(f"Compaction saved ~{compaction['saved_tokens']} of {compaction['original_tokens']} resume tokens ({compaction['truncated']} resume(s) truncated to budget).")
+            prescreen_report = {}
+            if prescreen_on:
+                stream = iter_review_with_prescreen(
+                    iter_fn, chain, job_desc, hr_prompt, to_review,
+                    top_k=int(prescreen_top_k) or None, threshold=prescreen_threshold or None, shadow=prescreen_shadow,
+                    report=prescreen_report, provider_name=provider, use_cache=not bypass_cache,
+                )
+            else:
+                stream = iter_fn(chain, job_desc, hr_prompt, to_review, provider_name=provider, use_cache=not bypass_cache)
+            persisted = stream_save_decisions(session, job.id, stream)
 
-        # Save decisions
-        with st.spinner("Saving results..."):
-            categories = {"A": [], "B": [], "C": []}
-            for res in results:
-                try:
-                    dec = Decision(
-                        job_id=job.id,
-                        resume_id=res["resume_id"],
-                        decision=res["decision"],
-                        rationale=res["rationale"],
-                        category=res.get("category"),
-                        match_score=res.get("match_score"),
-                    )
-                    session.add(dec)
-                    categories.setdefault(res.get("category", "C"), []).append(res)
-                except Exception as e:
-                    st.error(f"Failed to save decision for resume {res.get('resume_id')}: {e}")
+            st.session_state["active_job_id"] = job.id
+            st.button("Cancel remaining", key="cancel_review", help="Stop sending resumes to the model. Finished results are kept.")
+            total = len(to_review)
+            progress = st.progress(0.0, text=f"0 / {total} reviewed")
+            placeholders = {}
+            for cat, title in CATEGORY_TITLES.items():
+                st.subheader(title)
+                placeholders[cat] = st.empty()
+            results = []
+            categories = {cat: [] for cat in CATEGORY_TITLES}
+            last_render = 0.0
             try:
-                session.commit()
+                for item in persisted:
+                    res = _normalize_result(item)
+                    if res is None:
+                        continue
+                    results.append(res)
+                    categories.setdefault(_bucket(res.get("decision"), res.get("category")), []).append(res)
+                    progress.progress(min(1.0, len(results) / max(total, 1)), text=f"{len(results)} / {total} reviewed")
+                    # Redrawing every list per result is quadratic; cap it at a few frames per second
+                    if time.monotonic() - last_render >= 0.3:
+                        for cat, ph in placeholders.items():
+                            ph.markdown(_category_markdown(categories.get(cat, []), id_to_name))
+                        last_render = time.monotonic()
             except Exception as e:
-                session.rollback()
-                st.error(f"Database commit failed: {e}")
+                st.error(f"Review stopped early: {e}")
+            finally:
+                persisted.close()  # saves any buffered verdicts, cancels unfinished reviews
+            st.session_state.pop("active_job_id", None)
+            for cat, ph in placeholders.items():
+                ph.markdown(_category_markdown(categories.get(cat, []), id_to_name))
+            if prescreen_report.get("shadow"):
+                recall = prescreen_report["recall"]
+                st.caption(f"Prescreen (shadow): would keep {prescreen_report['kept']} of {prescreen_report['total']}; recall of LLM A/B verdicts: {'n/a' if recall is None else f'{recall:.0%}'}.")
+            elif prescreen_report:
+                st.caption(f"Prescreen: {prescreen_report['kept']} of {prescreen_report['total']} resume(s) sent to the LLM; {prescreen_report['screened_out']} filed as C by lexical score.")
     finally:
         session.close()
 
+    results.sort(key=lambda r: r["resume_id"])
     st.success("Screening complete")
-
-    st.subheader("Category A (Strong Fit)")
-    for res in categories.get("A", []):
-        name = id_to_name.get(res["resume_id"], f"Resume ID {res['resume_id']}")
-        score = res.get("match_score")
-        st.markdown(f"- {name} (ID {res['resume_id']}) Score: {score if score is not None else '—'} — {res['rationale']}")
-
-    st.subheader("Category B (Potential Fit)")
-    for res in categories.get("B", []):
-        name = id_to_name.get(res["resume_id"], f"Resume ID {res['resume_id']}")
-        score = res.get("match_score")
-        st.markdown(f"- {name} (ID {res['resume_id']}) Score: {score if score is not None else '—'} — {res['rationale']}")
-
-    st.subheader("Category C (Not Suitable)")
-    for res in categories.get("C", []):
-        name = id_to_name.get(res["resume_id"], f"Resume ID {res['resume_id']}")
-        score = res.get("match_score")
-        st.markdown(f"- {name} (ID {res['resume_id']}) Score: {score if score is not None else '—'} — {res['rationale']}")
+    cached_count = sum(1 for r in results if r.get("cached"))
+    if cached_count:
+        st.caption(f"{cached_count} of {len(results)} decision(s) served from cache (no LLM call).")
+    if engine_mode == "cascade":
+        stats = cascade_stats(results)
+        if stats["single_tier"]:
+            st.warning("Cascade ran as a single tier: the screening and review models are the same, so every resume was reviewed by the review model.")
+        elif stats["screened"]:
+            agreement = "n/a" if stats["agreement"] is None else f"{stats['agreement']:.0%}"
+            st.caption(f"Cascade: {stats['escalated']} of {stats['screened']} resume(s) escalated ({stats['escalation_rate']:.0%}); screening model agreed with the review model on {agreement} of escalations.")
+    error_count = sum(1 for r in results if r.get("decision") == "error")
+    hedged_count = sum(1 for r in results if r.get("hedged"))
+    if error_count:
+        st.warning(f"{error_count} resume(s) could not be reviewed (provider errors); they are listed under Errors and were not rejected. Run the screening again to retry them.")
+    if hedged_count:
+        answered = sum(1 for r in results if r.get("answered_by"))
+        st.caption(f"{hedged_count} slow call(s) were hedged; {answered} answered by the backup provider.")
 
     with st.expander("Raw decisions JSON"):
         st.json(results)
 
-    # Show real token usage if Google provider and usage data present
-    if provider == "google":
-        usage_rows = [r.get("usage") for r in results if r.get("usage")]
-        if usage_rows:
-            total_prompt = sum(u.get("prompt_tokens") or 0 for u in usage_rows)
-            total_response = sum(u.get("response_tokens") or 0 for u in usage_rows)
-            total_total = sum(u.get("total_tokens") or 0 for u in usage_rows)
-            st.subheader("Token Usage (Google Gemini - aggregated)")
-            st.caption(f"Prompt tokens: {total_prompt} | Response tokens: {total_response} | Total tokens: {total_total}")
-            with st.expander("Per resume usage"):
-                for r in results:
-                    if r.get("usage"):
-                        u = r["usage"]
-                        st.write(f"Resume {r['resume_id']}: prompt={u.get('prompt_tokens')} response={u.get('response_tokens')} total={u.get('total_tokens')}")
-        else:
-            st.info("No usage metadata returned by provider.")
+    # Show real token usage when the provider returned usage metadata
+    usage_rows = [r.get("usage") for r in results if r.get("usage")]
+    if usage_rows:
+        total_prompt = sum(u.get("prompt_tokens") or 0 for u in usage_rows)
+        total_cached = sum(u.get("cached_tokens") or 0 for u in usage_rows)
+        total_response = sum(u.get("response_tokens") or 0 for u in usage_rows)
+        total_total = sum(u.get("total_tokens") or 0 for u in usage_rows)
+        st.subheader(f"Token Usage ({provider} - aggregated)")
+        st.caption(f"Prompt tokens: {total_prompt} (cached: {total_cached}, uncached: {total_prompt - total_cached}) | Response tokens: {total_response} | Total tokens: {total_total}")
+        with st.expander("Per resume usage"):
+            for r in results:
+                if r.get("usage"):
+                    u = r["usage"]
+                    st.write(f"Resume {r['resume_id']}: prompt={u.get('prompt_tokens')} cached={u.get('cached_tokens', 0)} response={u.get('response_tokens')} total={u.get('total_tokens')}")
+    elif any(not r.get("cached") for r in results):
+        st.info("No usage metadata returned by provider.")
 
     # Token usage summary removed.
@@ -0,0 +1,451 @@
+"""Headless batch screening: stream a manifest through fetch → parse → review → persist.
+
+Manifests list applicants with a CV location, like ``hi.json``::
+
+    [{"ApplicantNo": 100, "cv": "https://host/cv.pdf"}, ...]
+
+Either a JSON array (parsed incrementally) or JSON Lines. CV locations may be
+``http(s)://`` URLs, ``file://`` URLs or plain paths. Stages run in their own
+threads and are connected by bounded queues, so memory stays flat however long
+the manifest is. Every persisted applicant is appended to a checkpoint file;
+re-running the same command skips them and reuses the same job.
+
+Example:
+    python batch_screen.py hi.json --job-title "Backend Engineer" --jd-file jd.txt --provider openai
+"""
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from sqlalchemy import select
+
+from config.settings import settings
+from database.bulk import save_decisions
+from database.db_manager import init_db, migrate_schema
+from database.models import Base, Decision, Job
+from database.resume_store import get_or_create_resumes
+from llm.async_engine import review_resumes_async
+from llm.cascade import job_cascade_stats, review_resumes_cascade
+from llm.llm_handler import get_reviewer_chain, review_resumes
+from llm.usage_tracker import get_usage_recorder, usage_context
+from utils.token_counter import compact_resumes
+
+_DONE = object()  # end-of-stream marker passed down the pipeline
+
+
+def iter_manifest(path: str, chunk_size: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+    """Yield manifest entries one at a time from a JSON array or a JSON Lines file."""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as fh:
+        buf = fh.read(chunk_size).lstrip()
+        if not buf.startswith("["):
+            for line in _iter_lines(buf, fh, chunk_size):
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+            return
+        buf = buf[1:]
+        eof = False
+        while True:
+            buf = buf.lstrip().lstrip(",").lstrip()
+            if buf.startswith("]"):
+                return
+            try:
+                obj, end = decoder.raw_decode(buf)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                more = fh.read(chunk_size)
+                eof = not more
+                buf += more
+                continue
+            yield obj
+            buf = buf[end:]
+
+
+def _iter_lines(head: str, fh, chunk_size: int) -> Iterator[str]:
+    pending = head
+    for chunk in iter(lambda: fh.read(chunk_size), ""):
+        pending += chunk
+        *lines, pending = pending.split("\n")
+        yield from lines
+    yield pending
+
+
+def _guess_filename(location: str, data: bytes, content_type: str | None = None) -> str:
+    name = os.path.basename(urllib.parse.urlparse(location).path) or "resume"
+    if name.lower().endswith((".pdf", ".docx")):
+        return name
+    if data[:5] == b"%PDF-" or (content_type or "").startswith("application/pdf"):
+        return f"{name}.pdf"
+    if data[:2] == b"PK":  # DOCX is a zip container
+        return f"{name}.docx"
+    return name
+
+
+def fetch_cv(location: str, timeout: float = 30.0) -> Tuple[str, bytes]:
+    """Return (filename, bytes) for an http(s)://, file:// or plain-path CV location."""
+    parsed = urllib.parse.urlparse(location)
+    if parsed.scheme in ("http", "https"):
+        req = urllib.request.Request(location, headers={"User-Agent": "ats-batch-screen/1.0"})
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            data = resp.read()
+            return _guess_filename(location, data, resp.headers.get("Content-Type")), data
+    path = urllib.request.url2pathname(parsed.path) if parsed.scheme == "file" else location
+    with open(path, "rb") as fh:
+        data = fh.read()
+    return _guess_filename(path, data), data
+
+
+class Checkpoint:
+    """Append-only JSONL: a header with the job id, then one line per finished applicant."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.job_id: int | None = None
+        self.done: set = set()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as fh:
+                for line in fh:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        rec = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn last line from a crash
+                    if "job_id" in rec and "applicant" not in rec:
+                        self.job_id = rec["job_id"]
+                    elif "applicant" in rec:
+                        self.done.add(str(rec["applicant"]))
+        self._fh = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def start(self, job_id: int) -> None:
+        if self.job_id is None:
+            self.job_id = job_id
+            self.write([{"job_id": job_id}])
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            for rec in records:
+                self._fh.write(json.dumps(rec) + "\n")
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+class Pipeline:
+    def __init__(self, args, job_id: int, checkpoint: Checkpoint, review_fn: Callable, chain, job_desc: str, hr_prompt: str):
+        self.args = args
+        self.job_id = job_id
+        self.checkpoint = checkpoint
+        self.review_fn = review_fn
+        self.chain = chain
+        self.job_desc = job_desc
+        self.hr_prompt = hr_prompt
+        self.stop = threading.Event()
+        self.errors: List[BaseException] = []
+        size = args.queue_size
+        self.q_fetch: "queue.Queue" = queue.Queue(size)
+        self.q_parse: "queue.Queue" = queue.Queue(size)
+        self.q_review: "queue.Queue" = queue.Queue(size)
+        self.q_persist: "queue.Queue" = queue.Queue(size)
+        self.stats = {"skipped": 0, "fetched": 0, "fetch_failed": 0, "parsed": 0, "reviewed": 0, "review_failed": 0, "persisted": 0}
+        self._stats_lock = threading.Lock()
+        self._out = open(args.output, "a", encoding="utf-8") if args.output else None
+        # resume_id -> verdict already stored for this job (same CV under several applicants)
+        self.decided: Dict[int, Dict[str, Any]] = {}
+
+    def _bump(self, key: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def _put(self, q: "queue.Queue", item: Any) -> None:
+        while not self.stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, q: "queue.Queue", timeout: float = 0.5):
+        while not self.stop.is_set():
+            try:
+                return q.get(timeout=timeout)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _batch(self, q: "queue.Queue", size: int, producers: int = 1) -> Iterator[List[Any]]:
+        """Group queue items into lists of up to ``size``, flushing early when the queue runs dry."""
+        finished = 0
+        batch: List[Any] = []
+        while finished < producers and not self.stop.is_set():
+            try:
+                item = q.get(timeout=self.args.batch_wait)
+            except queue.Empty:
+                if batch:
+                    yield batch
+                    batch = []
+                continue
+            if item is _DONE:
+                finished += 1
+                continue
+            batch.append(item)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch and not self.stop.is_set():
+            yield batch
+
+    def _guard(self, fn: Callable[[], None]) -> Callable[[], None]:
+        def run():
+            try:
+                fn()
+            except BaseException as e:  # Any stage failure stops the whole pipeline
+                self.errors.append(e)
+                self.stop.set()
+        return run
+
+    def read_stage(self) -> None:
+        queued = 0
+        try:
+            for entry in iter_manifest(self.args.manifest):
+                if self.stop.is_set() or (self.args.limit and queued >= self.args.limit):
+                    return
+                applicant = str(entry.get(self.args.id_field))
+                if applicant in self.checkpoint.done:
+                    self._bump("skipped")
+                    continue
+                self._put(self.q_fetch, (applicant, entry.get(self.args.cv_field)))
+                queued += 1
+        finally:
+            for _ in range(self.args.fetch_workers):
+                self._put(self.q_fetch, _DONE)
+
+    def fetch_stage(self) -> None:
+        try:
+            while True:
+                item = self._get(self.q_fetch)
+                if item is _DONE:
+                    return
+                applicant, location = item
+                try:
+                    filename, data = fetch_cv(location, timeout=self.args.fetch_timeout)
+                except Exception as e:
+                    self._bump("fetch_failed")
+                    print(f"[fetch] applicant {applicant}: {location}: {e}", file=sys.stderr)
+                    continue  # not checkpointed, so the next run retries it
+                self._bump("fetched")
+                self._put(self.q_parse, (applicant, filename, data))
+        finally:
+            self._put(self.q_parse, _DONE)
+
+    def parse_stage(self) -> None:
+        _, Session = init_db()
+        session = Session()
+        try:
+            for batch in self._batch(self.q_parse, self.args.batch_size, producers=self.args.fetch_workers):
+                rows, _stats = get_or_create_resumes(session, [(fn, data) for _, fn, data in batch])
+                for (applicant, _, _), resume in zip(batch, rows):
+                    self._put(self.q_review, (applicant, resume.id, resume.content))
+                self._bump("parsed", len(batch))
+                session.expunge_all()  # keep the identity map from growing with the manifest
+        finally:
+            session.close()
+            self._put(self.q_review, _DONE)
+
+    def review_stage(self) -> None:
+        try:
+            for batch in self._batch(self.q_review, self.args.batch_size):
+                unique: Dict[int, str] = {}
+                for _, resume_id, text in batch:
+                    if resume_id not in self.decided:
+                        unique.setdefault(resume_id, text)
+                results: Dict[int, Dict[str, Any]] = {}
+                if unique:
+                    to_review, _ = compact_resumes(list(unique.items()), token_budget=self.args.token_budget)
+                    with usage_context(job_id=self.job_id):
+                        for r in self.review_fn(self.chain, self.job_desc, self.hr_prompt, to_review, provider_name=self.args.provider):
+                            results[r["resume_id"]] = r
+                    self._bump("reviewed", len(results))
+                self._put(self.q_persist, (batch, results))
+        finally:
+            self._put(self.q_persist, _DONE)
+
+    def persist_stage(self) -> None:
+        _, Session = init_db()
+        session = Session()
+        try:
+            while True:
+                item = self._get(self.q_persist)
+                if item is _DONE:
+                    return
+                batch, results = item
+                new = [r for rid, r in results.items() if rid not in self.decided]
+                save_decisions(session, self.job_id, new, replace_errors=True)  # a retry supersedes the last error row
+                failed = set()
+                for r in new:
+                    if r.get("decision") == "error":
+                        failed.add(r["resume_id"])  # recorded, but not decided: the next run retries it
+                        continue
+                    self.decided[r["resume_id"]] = {k: r.get(k) for k in ("decision", "category", "match_score")}
+                if failed:
+                    self._bump("review_failed", len(failed))
+                records = []
+                for applicant, resume_id, _ in batch:
+                    if resume_id in failed:
+                        continue
+                    verdict = self.decided.get(resume_id, {})
+                    records.append({"applicant": applicant, "resume_id": resume_id, **verdict})
+                # Checkpoint only after the decisions are committed
+                self.checkpoint.write(records)
+                if self._out:
+                    for rec in records:
+                        self._out.write(json.dumps(rec) + "\n")
+                    self._out.flush()
+                self._bump("persisted", len(records))
+        finally:
+            session.close()
+
+    def run(self) -> int:
+        stages = [threading.Thread(target=self._guard(self.read_stage), name="read")]
+        stages += [threading.Thread(target=self._guard(self.fetch_stage), name=f"fetch-{i}") for i in range(self.args.fetch_workers)]
+        stages += [
+            threading.Thread(target=self._guard(self.parse_stage), name="parse"),
+            threading.Thread(target=self._guard(self.review_stage), name="review"),
+            threading.Thread(target=self._guard(self.persist_stage), name="persist"),
+        ]
+        for t in stages:
+            t.daemon = True
+            t.start()
+        started = time.monotonic()
+        try:
+            while any(t.is_alive() for t in stages):
+                stages[-1].join(timeout=self.args.progress_interval)
+                if self.args.progress_interval and any(t.is_alive() for t in stages):
+                    print(f"[{time.monotonic() - started:7.1f}s] {self.stats}", file=sys.stderr)
+        except KeyboardInterrupt:
+            print("Interrupted; finishing checkpoint. Re-run the same command to resume.", file=sys.stderr)
+            self.stop.set()
+            for t in stages:
+                t.join(timeout=10)
+        if self._out:
+            self._out.close()
+        print(f"Done in {time.monotonic() - started:.1f}s: {self.stats}", file=sys.stderr)
+        for e in self.errors:
+            print(f"Stage failed: {type(e).__name__}: {e}", file=sys.stderr)
+        return 1 if self.errors or self.stop.is_set() else 0
+
+
+def _read_text(value: str | None, path: str | None) -> str:
+    if path:
+        with open(path, "r", encoding="utf-8") as fh:
+            return fh.read()
+    return value or ""
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Screen a manifest of CVs without the Streamlit UI.")
+    parser.add_argument("manifest", help="JSON array or JSON Lines file of applicants")
+    parser.add_argument("--job-id", type=int, help="add decisions to an existing job instead of creating one")
+    parser.add_argument("--job-title", default="Batch screening")
+    parser.add_argument("--jd", help="job description text")
+    parser.add_argument("--jd-file", help="file containing the job description")
+    parser.add_argument("--hr", help="extra HR instructions")
+    parser.add_argument("--hr-file", help="file containing extra HR instructions")
+    parser.add_argument("--provider", default=settings.default_llm_provider, choices=["openai", "anthropic", "google", "fake"])
+    parser.add_argument("--temperature", type=float, default=0.2)
+    parser.add_argument("--engine", choices=["threads", "async", "cascade"],
+                        default=settings.review_engine if settings.review_engine in ("async", "cascade") else "threads")
+    parser.add_argument("--hedge-provider", choices=["openai", "anthropic", "google"], default=settings.hedge_provider or None,
+                        help="resend calls slower than the provider's p95 here (threads and cascade engines)")
+    parser.add_argument("--id-field", default="ApplicantNo")
+    parser.add_argument("--cv-field", default="cv")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <manifest>.checkpoint.jsonl)")
+    parser.add_argument("--output", help="append per-applicant verdicts to this JSONL file")
+    parser.add_argument("--batch-size", type=int, default=50, help="resumes per parse/review batch")
+    parser.add_argument("--batch-wait", type=float, default=1.0, help="seconds to wait before flushing a partial batch")
+    parser.add_argument("--queue-size", type=int, default=200, help="bound on every inter-stage queue")
+    parser.add_argument("--fetch-workers", type=int, default=8)
+    parser.add_argument("--fetch-timeout", type=float, default=30.0)
+    parser.add_argument("--token-budget", type=int, default=settings.resume_token_budget)
+    parser.add_argument("--limit", type=int, default=0, help="stop after this many new applicants (0 = all)")
+    parser.add_argument("--progress-interval", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    job_desc = _read_text(args.jd, args.jd_file)
+    hr_prompt = _read_text(args.hr, args.hr_file)
+    checkpoint = Checkpoint(args.checkpoint or f"{args.manifest}.checkpoint.jsonl")
+
+    engine, Session = init_db()
+    Base.metadata.create_all(bind=engine)
+    migrate_schema(engine)
+    session = Session()
+    try:
+        if args.job_id and checkpoint.job_id is not None and args.job_id != checkpoint.job_id:
+            parser.error(f"checkpoint {checkpoint.path} belongs to job {checkpoint.job_id}, not --job-id {args.job_id}; "
+                         "pass --checkpoint with a new file to screen this manifest for another job")
+        job_id = args.job_id or checkpoint.job_id
+        if job_id is not None:
+            job = session.get(Job, job_id)
+            if job is None:
+                parser.error(f"job {job_id} does not exist")
+            job_desc = job_desc or job.description
+            hr_prompt = hr_prompt or (job.hr_prompt or "")
+        else:
+            if not job_desc:
+                parser.error("a job description is required (--jd or --jd-file) when creating a job")
+            job = Job(title=args.job_title, description=job_desc, hr_prompt=hr_prompt,
+                      provider=args.provider, temperature=args.temperature, engine=args.engine)
+            session.add(job)
+            session.commit()
+            job_id = job.id
+        checkpoint.start(job_id)
+        decided = {
+            rid: {"decision": d, "category": c, "match_score": s}
+            for rid, d, c, s in session.execute(
+                select(Decision.resume_id, Decision.decision, Decision.category, Decision.match_score)
+                .where(Decision.job_id == job_id, Decision.decision != "error")
+            )
+        }
+    finally:
+        session.close()
+
+    chain = get_reviewer_chain(provider=args.provider, temperature=args.temperature)
+    if args.engine == "async":
+        review_fn = review_resumes_async
+    elif args.engine == "cascade":
+        review_fn = partial(review_resumes_cascade, hedge_provider=args.hedge_provider)
+    else:
+        review_fn = partial(review_resumes, hedge_provider=args.hedge_provider)
+    pipeline = Pipeline(args, job_id, checkpoint, review_fn, chain, job_desc, hr_prompt)
+    pipeline.decided = decided
+    print(f"Job {job_id}: {len(checkpoint.done)} applicant(s) already done per checkpoint {checkpoint.path}", file=sys.stderr)
+    try:
+        code = pipeline.run()
+        if args.engine == "cascade":
+            session = Session()
+            try:
+                print(f"Cascade: {job_cascade_stats(session, job_id)}", file=sys.stderr)
+            finally:
+                session.close()
+        return code
+    finally:
+        checkpoint.close()
+        get_usage_recorder().flush()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
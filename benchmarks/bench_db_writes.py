@@ -0,0 +1,126 @@
+"""Write-throughput benchmark: per-row ORM commits vs one ORM flush vs bulk inserts.
+
+Each strategy saves N resumes plus N decisions into a fresh database and
+reports rows/second. Uses a throwaway SQLite file unless --database-url is given.
+
+    python benchmarks/bench_db_writes.py --rows 1000
+    python benchmarks/bench_db_writes.py --rows 5000 --json
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from database import db_manager  # noqa: E402
+from database.bulk import insert_resumes, save_decisions  # noqa: E402
+from database.models import Base, Decision, Job, Resume  # noqa: E402
+
+
+def _resume_rows(n: int) -> List[Dict[str, Any]]:
+    body = "Experienced engineer. Python, SQL, AWS. " * 60  # ~2.5 KB, a typical parsed CV
+    return [{"filename": f"cv_{i}.pdf", "content": f"Candidate {i}\n{body}", "content_hash": f"{i:064x}"} for i in range(n)]
+
+
+def _results(resume_ids: List[int]) -> List[Dict[str, Any]]:
+    return [
+        {"resume_id": rid, "decision": "approved" if i % 3 else "rejected", "rationale": "Matches most required skills.",
+         "category": "ABC"[i % 3], "match_score": (i * 37) % 100}
+        for i, rid in enumerate(resume_ids)
+    ]
+
+
+def per_row(session, job_id: int, n: int) -> None:
+    """What app.py used to do: add + commit + refresh for each resume, then one Decision at a time."""
+    ids = []
+    for row in _resume_rows(n):
+        r = Resume(**row)
+        session.add(r)
+        session.commit()
+        session.refresh(r)
+        ids.append(r.id)
+    for res in _results(ids):
+        session.add(Decision(job_id=job_id, **res))
+    session.commit()
+
+
+def orm_batch(session, job_id: int, n: int) -> None:
+    resumes = [Resume(**row) for row in _resume_rows(n)]
+    session.add_all(resumes)
+    session.commit()
+    session.add_all([Decision(job_id=job_id, **res) for res in _results([r.id for r in resumes])])
+    session.commit()
+
+
+def bulk(session, job_id: int, n: int) -> None:
+    ids = insert_resumes(session, _resume_rows(n))
+    session.commit()
+    save_decisions(session, job_id, _results(ids))
+
+
+STRATEGIES: Dict[str, Callable] = {"per_row": per_row, "orm_batch": orm_batch, "bulk": bulk}
+
+
+def run(strategy: str, rows: int, database_url: str | None, tuned: bool) -> Dict[str, Any]:
+    tmpdir = None
+    if database_url is None:
+        tmpdir = tempfile.mkdtemp(prefix="ats-bench-")
+        database_url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    engine = create_engine(database_url, future=True)
+    if tuned and engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", db_manager._tune_sqlite)
+    Base.metadata.drop_all(engine, tables=[Decision.__table__, Resume.__table__, Job.__table__])
+    Base.metadata.create_all(engine, tables=[Resume.__table__, Job.__table__, Decision.__table__])
+    Session = sessionmaker(bind=engine, autoflush=False)
+    with Session() as session:
+        job = Job(title="bench", description="bench")
+        session.add(job)
+        session.commit()
+        job_id = job.id
+    with Session() as session:
+        started = time.perf_counter()
+        STRATEGIES[strategy](session, job_id, rows)
+        elapsed = time.perf_counter() - started
+    engine.dispose()
+    if tmpdir:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    written = rows * 2
+    return {
+        "strategy": strategy,
+        "dialect": engine.dialect.name,
+        "sqlite_tuned": tuned if engine.dialect.name == "sqlite" else None,
+        "rows": written,
+        "seconds": round(elapsed, 4),
+        "rows_per_sec": round(written / elapsed, 1) if elapsed else None,
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark resume/decision write throughput.")
+    parser.add_argument("--rows", type=int, default=1000, help="resumes (and decisions) per strategy")
+    parser.add_argument("--strategies", nargs="+", choices=sorted(STRATEGIES), default=list(STRATEGIES))
+    parser.add_argument("--database-url", help="benchmark against this database (tables are dropped!)")
+    parser.add_argument("--no-tuning", action="store_true", help="skip the SQLite WAL/synchronous pragmas")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args(argv)
+
+    results = [run(s, args.rows, args.database_url, not args.no_tuning) for s in args.strategies]
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        for r in results:
+            print(f"{r['strategy']:<10} {r['rows']:>7} rows  {r['seconds']:>8.3f}s  {r['rows_per_sec']:>10.1f} rows/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Tail latency with and without hedging, using fake providers that inject delay, hangs and failures.
+
+No API keys or network: each provider is the offline ``FakeChatModel``
+(``llm/fake_models.py``) set to straggle, hang or fail at a given rate. Every scenario
+reviews the same batch through ``review_resumes`` and reports batch time,
+per-resume completion percentiles, errors and the providers' breaker state.
+
+    python benchmarks/bench_hedging.py --resumes 200
+    python benchmarks/bench_hedging.py --resumes 500 --workers 20 --json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from functools import partial
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Keep the run self-contained: no decision cache or usage rows in the configured database
+os.environ["DECISION_CACHE_ENABLED"] = "0"
+os.environ["USAGE_TRACKING_ENABLED"] = "0"
+os.environ.setdefault("HEDGE_INITIAL_DELAY", "1")
+
+import numpy as np  # noqa: E402
+from langchain_core.runnables import RunnableLambda  # noqa: E402
+
+from config.settings import settings  # noqa: E402
+from llm.fake_models import FakeChatModel  # noqa: E402
+from llm.llm_handler import iter_review_resumes  # noqa: E402
+from llm.prompt_cache import build_review_messages  # noqa: E402
+from llm.resilience import reset_provider_health, resilience_stats  # noqa: E402
+
+_models: List[FakeChatModel] = []  # released at exit so "hung" calls return and the process can end
+
+
+def fake_chain(median_s: float, straggle_rate: float = 0.0, straggle_s: float = 3.0, hang_rate: float = 0.0,
+               fail_rate: float = 0.0, fail_after: int | None = None, seed: int = 0):
+    """A reviewer chain over the offline ``FakeChatModel``; ``fail_after`` makes every call after the first N fail."""
+    model = FakeChatModel(latency=median_s, jitter=median_s * 0.3, straggle_rate=straggle_rate, straggle=straggle_s,
+                          hang_rate=hang_rate, error_rate=fail_rate, fail_after=fail_after, seed=seed)
+    _models.append(model)
+    return RunnableLambda(partial(build_review_messages, provider="fake")) | model
+
+
+def run(name: str, chain, hedge_chain, n: int, workers: int) -> Dict[str, Any]:
+    reset_provider_health()
+    resumes = [(i, f"Candidate {i}: Python, SQL, AWS.") for i in range(1, n + 1)]
+    started = time.perf_counter()
+    done_at: List[float] = []
+    results = []
+    for r in iter_review_resumes(chain, "Backend engineer", "", resumes, max_workers=workers, provider_name="primary",
+                                 use_cache=False, hedge_provider="backup" if hedge_chain else None, hedge_chain=hedge_chain):
+        done_at.append(time.perf_counter() - started)
+        results.append(r)
+    return {
+        "scenario": name,
+        "batch_s": round(time.perf_counter() - started, 2),
+        "p50_s": round(float(np.percentile(done_at, 50)), 2),
+        "p99_s": round(float(np.percentile(done_at, 99)), 2),
+        "errors": sum(1 for r in results if r["decision"] == "error"),
+        "hedged": sum(1 for r in results if r.get("hedged")),
+        "answered_by_backup": sum(1 for r in results if r.get("answered_by")),
+        "providers": resilience_stats(),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=5.0, help="LLM_REQUEST_TIMEOUT for the run")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+    settings.llm_request_timeout = args.timeout
+
+    def straggly(seed: int = 1):
+        return fake_chain(0.2, straggle_rate=0.05, straggle_s=3.0, seed=seed)
+
+    scenarios: List[Callable[[], Dict[str, Any]]] = [
+        lambda: run("stragglers", straggly(), None, args.resumes, args.workers),
+        lambda: run("stragglers+hedge", straggly(), fake_chain(0.3, seed=2), args.resumes, args.workers),
+        lambda: run("hangs", fake_chain(0.2, hang_rate=0.03, seed=3), None, args.resumes, args.workers),
+        lambda: run("hangs+hedge", fake_chain(0.2, hang_rate=0.03, seed=3), fake_chain(0.3, seed=4), args.resumes, args.workers),
+        lambda: run("outage", fake_chain(0.2, fail_after=30, seed=5), None, args.resumes, args.workers),
+        lambda: run("outage+hedge", fake_chain(0.2, fail_after=30, seed=5), fake_chain(0.3, seed=6), args.resumes, args.workers),
+    ]
+    rows = []
+    try:
+        for scenario in scenarios:
+            rows.append(scenario())
+            if not args.json:
+                row = rows[-1]
+                print(f"{row['scenario']:<18} batch {row['batch_s']:>6.2f}s  p50 {row['p50_s']:>5.2f}s  p99 {row['p99_s']:>5.2f}s  "
+                      f"errors {row['errors']:>3}  hedged {row['hedged']:>3}  backup answers {row['answered_by_backup']:>3}  "
+                      f"breaker {row['providers'].get('primary', {}).get('state')}")
+    finally:
+        for model in _models:
+            model.release_hung()
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
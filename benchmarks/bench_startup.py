@@ -0,0 +1,97 @@
+"""Startup benchmark: cold import time per module and Streamlit rerun time.
+
+Cold imports run in fresh interpreters (median of --repeat runs) and report
+which provider SDKs each import dragged in. Reruns drive ``app.py`` through
+Streamlit's ``AppTest`` harness: the first run pays schema setup, later runs
+should only re-render widgets.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 5 --reruns 10 --json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["database.db_manager", "llm.llm_handler", "llm.async_engine", "utils.resume_parser", "streamlit"]
+PROVIDER_SDKS = ["langchain_openai", "langchain_anthropic", "langchain_google_genai", "google.generativeai"]
+
+_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t
+print(json.dumps({{"ms": elapsed * 1000, "sdks": [m for m in {sdks!r} if m in sys.modules]}}))
+"""
+
+
+def cold_import(module: str, repeat: int) -> Dict[str, Any]:
+    times: List[float] = []
+    sdks: List[str] = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, sdks=PROVIDER_SDKS)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        probe = json.loads(out.stdout.strip().splitlines()[-1])
+        times.append(probe["ms"])
+        sdks = probe["sdks"]
+    return {"module": module, "median_ms": round(statistics.median(times), 1), "provider_sdks_loaded": sdks}
+
+
+def app_reruns(reruns: int) -> Dict[str, Any]:
+    from streamlit.testing.v1 import AppTest
+
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='ats-bench-'), 'bench.db')}")
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60)
+    started = time.perf_counter()
+    at.run()
+    first = (time.perf_counter() - started) * 1000
+    times = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        at.run()
+        times.append((time.perf_counter() - started) * 1000)
+    return {
+        "first_run_ms": round(first, 1),
+        "rerun_median_ms": round(statistics.median(times), 1) if times else None,
+        "rerun_max_ms": round(max(times), 1) if times else None,
+        "errors": [str(e.value) for e in at.exception],
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure cold import and Streamlit rerun times.")
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per module")
+    parser.add_argument("--reruns", type=int, default=5, help="app reruns after the first run (0 skips the app)")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    report: Dict[str, Any] = {"imports": [cold_import(m, args.repeat) for m in args.modules]}
+    if args.reruns:
+        report["app"] = app_reruns(args.reruns)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return 0
+    for r in report["imports"]:
+        sdks = ", ".join(r["provider_sdks_loaded"]) or "none"
+        print(f"import {r['module']:<22} {r['median_ms']:>8.1f} ms   provider SDKs: {sdks}")
+    if "app" in report:
+        app = report["app"]
+        print(f"app.py first run {app['first_run_ms']:.1f} ms, rerun median {app['rerun_median_ms']} ms (max {app['rerun_max_ms']})")
+        for err in app["errors"]:
+            print(f"  app error: {err}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""Synthetic resume corpus: deterministic PDF and DOCX files of varying size.
+
+PDFs are written directly (uncompressed text streams, Helvetica, one text
+line per row) so no PDF library is needed; DOCX files use python-docx. The
+same seed always yields the same text (and byte-identical PDFs), so parse
+timings compare across commits.
+
+    python benchmarks/corpus.py --out /tmp/corpus --count 50
+"""
+import argparse
+import io
+import os
+import random
+import sys
+from typing import Dict, List, Tuple
+
+from docx import Document
+
+SIZES: Dict[str, int] = {"small": 1, "medium": 3, "large": 10}  # pages
+LINES_PER_PAGE = 55
+
+_FIRST = ["Alex", "Sam", "Priya", "Chen", "Maria", "Omar", "Ivana", "Kofi", "Lena", "Diego", "Aiko", "Noah"]
+_LAST = ["Smith", "Patel", "Garcia", "Kim", "Okafor", "Novak", "Haddad", "Larsen", "Silva", "Tanaka"]
+_ROLES = ["Backend Engineer", "Data Engineer", "Frontend Developer", "DevOps Engineer", "ML Engineer",
+          "QA Analyst", "Product Manager", "Registered Nurse", "Financial Analyst", "Site Reliability Engineer"]
+_SKILLS = ["Python", "Django", "FastAPI", "PostgreSQL", "AWS", "Docker", "Kubernetes", "Terraform", "React",
+           "TypeScript", "Spark", "Airflow", "pandas", "scikit-learn", "Java", "Spring", "Go", "Kafka", "Redis",
+           "GraphQL", "Excel", "SQL", "Tableau", "Jira", "Linux", "CI/CD", "gRPC", "Snowflake", "dbt", "PyTorch"]
+_VERBS = ["Built", "Led", "Designed", "Migrated", "Automated", "Optimised", "Maintained", "Launched", "Scaled", "Reduced"]
+_OBJECTS = ["a payments API", "the data warehouse", "CI pipelines", "a customer dashboard", "search indexing",
+            "the on-call runbook", "ETL jobs", "a recommendation model", "billing reconciliation", "mobile backend"]
+_RESULTS = ["cutting latency by {n}%", "serving {n}k daily users", "saving {n} engineer-hours a month",
+            "raising test coverage to {n}%", "with {n}% fewer incidents", "across {n} teams"]
+
+
+def resume_text(rng: random.Random, pages: int) -> List[str]:
+    """Lines of a plausible resume filling roughly ``pages`` pages."""
+    name = f"{rng.choice(_FIRST)} {rng.choice(_LAST)}"
+    role = rng.choice(_ROLES)
+    skills = rng.sample(_SKILLS, 8)
+    lines = [name, role, f"{name.split()[0].lower()}@example.com | +1 555 {rng.randint(1000, 9999)}", "",
+             "SUMMARY", f"{role} with {rng.randint(2, 15)} years of experience in {', '.join(skills[:3])}.", "",
+             "SKILLS", ", ".join(skills), "", "EXPERIENCE"]
+    year = 2024
+    while len(lines) < pages * LINES_PER_PAGE - 6:
+        start = year - rng.randint(1, 4)
+        lines += ["", f"{rng.choice(_ROLES)} - Company {rng.randint(1, 999)} ({start}-{year})"]
+        for _ in range(rng.randint(3, 7)):
+            result = rng.choice(_RESULTS).format(n=rng.randint(5, 95))
+            lines.append(f"- {rng.choice(_VERBS)} {rng.choice(_OBJECTS)} using {rng.choice(skills)}, {result}.")
+        year = start
+    lines += ["", "EDUCATION", f"B.Sc. Computer Science, University {rng.randint(1, 200)} ({year - 4})"]
+    return lines
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)").encode("latin-1", "replace").decode("latin-1")
+
+
+def make_pdf(lines: List[str]) -> bytes:
+    """Minimal multi-page PDF with extractable text."""
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+    objects: List[bytes] = []
+    n_pages = len(pages)
+    page_ids = [4 + 2 * i for i in range(n_pages)]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {n_pages} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for i, page_lines in enumerate(pages):
+        body = "BT /F1 10 Tf 12 TL 50 790 Td " + " ".join(f"({_pdf_escape(line)}) '" for line in page_lines) + " ET"
+        stream = body.encode("latin-1")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /Resources << /Font << /F1 3 0 R >> >> "
+                       f"/Contents {page_ids[i] + 1} 0 R >>".encode())
+        objects.append(b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream")
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for num, obj in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{num} 0 obj\n".encode() + obj + b"\nendobj\n")
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for off in offsets:
+        out.write(f"{off:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def make_docx(lines: List[str]) -> bytes:
+    doc = Document()
+    for line in lines:
+        doc.add_paragraph(line)
+    out = io.BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def generate_corpus(count: int, seed: int = 7, sizes: Dict[str, int] | None = None,
+                    formats: Tuple[str, ...] = ("pdf", "docx")) -> List[Tuple[str, bytes]]:
+    """``count`` (filename, bytes) pairs cycling through sizes and formats; filenames name both."""
+    rng = random.Random(seed)
+    sizes = sizes or SIZES
+    files = []
+    for i in range(count):
+        size = list(sizes)[i % len(sizes)]
+        fmt = formats[(i // len(sizes)) % len(formats)]
+        lines = resume_text(rng, sizes[size])
+        data = make_pdf(lines) if fmt == "pdf" else make_docx(lines)
+        files.append((f"cv_{i:05d}_{size}.{fmt}", data))
+    return files
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Write a synthetic PDF/DOCX resume corpus to a directory.")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--count", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+    os.makedirs(args.out, exist_ok=True)
+    for filename, data in generate_corpus(args.count, args.seed):
+        with open(os.path.join(args.out, filename), "wb") as fh:
+            fh.write(data)
+    print(f"Wrote {args.count} resumes to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""Offline benchmark suite: parsing, review throughput, decision parsing and DB writes.
+
+Runs without API keys or network: resumes come from ``benchmarks/corpus.py``
+and reviews go to the fake provider (``llm/fake_models.py``) through the normal
+``get_reviewer_chain`` / ``review_resumes`` path. Results are written as flat
+``suite.metric`` keys to ``benchmarks/results/<commit>.json``. Pass
+``--compare`` to diff the results against an earlier run and exit 1 when a
+metric regresses by more than ``--max-regression``.
+
+    python benchmarks/run_suite.py                                   # all suites
+    python benchmarks/run_suite.py --suites parse json --quick
+    python benchmarks/run_suite.py --compare benchmarks/results/abc1234.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Measure the code paths, not the caches or usage rows in the configured database
+os.environ["DECISION_CACHE_ENABLED"] = "0"
+os.environ["USAGE_TRACKING_ENABLED"] = "0"
+
+import numpy as np  # noqa: E402
+
+from config.settings import settings  # noqa: E402
+
+# Metrics where a lower value is better; everything else (throughput) is higher-is-better
+_LOWER_IS_BETTER = ("_us", "_ms", "_s")
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def bench_parse(args) -> Dict[str, float]:
+    from corpus import SIZES, generate_corpus
+    from utils.parse_pool import parse_files
+    from utils.resume_parser import parse_resume_file
+
+    per_kind = 3 if args.quick else 10
+    files = generate_corpus(per_kind * len(SIZES) * 2, seed=args.seed)
+    out: Dict[str, float] = {}
+    for fmt in ("pdf", "docx"):
+        for size in SIZES:
+            subset = [(fn, data) for fn, data in files if fn.endswith(f"_{size}.{fmt}")]
+            started = time.perf_counter()
+            for fn, data in subset:
+                upload = io.BytesIO(data)
+                upload.name = fn  # what parse_resume_file reads from a Streamlit upload
+                parse_resume_file(upload)
+            elapsed = time.perf_counter() - started
+            out[f"{fmt}.{size}.files_per_s"] = round(len(subset) / elapsed, 2)
+            out[f"{fmt}.{size}.mb_per_s"] = round(sum(len(d) for _, d in subset) / 1e6 / elapsed, 3)
+    started = time.perf_counter()
+    parse_files(files, max_workers=args.parse_workers)
+    out["pool.files_per_s"] = round(len(files) / (time.perf_counter() - started), 2)
+    return out
+
+
+def bench_review(args) -> Dict[str, float]:
+    from llm.async_engine import iter_review_resumes_async
+    from llm.llm_handler import get_batch_reviewer_chain, get_reviewer_chain, iter_review_resumes, iter_review_resumes_packed
+
+    settings.fake_llm_latency_ms = args.latency_ms
+    settings.fake_llm_jitter_ms = args.jitter_ms
+    settings.fake_llm_error_rate = args.error_rate
+    chain = get_reviewer_chain("fake")
+    n = 40 if args.quick else args.resumes
+    resumes = [(i, f"Candidate {i}\nPython, SQL, AWS. " + "Experience line. " * 150) for i in range(1, n + 1)]
+
+    def measure(label: str, stream: Callable[[], Any]) -> Dict[str, float]:
+        started = time.perf_counter()
+        done_at, errors = [], 0
+        for r in stream():
+            done_at.append(time.perf_counter() - started)
+            errors += r.get("decision") == "error"
+        elapsed = time.perf_counter() - started
+        return {
+            f"{label}.resumes_per_s": round(n / elapsed, 2),
+            f"{label}.p50_s": round(float(np.percentile(done_at, 50)), 3),
+            f"{label}.p99_s": round(float(np.percentile(done_at, 99)), 3),
+            f"{label}.errors": errors,
+        }
+
+    out: Dict[str, float] = {}
+    for workers in args.concurrency:
+        out.update(measure(f"threads_w{workers}", lambda: iter_review_resumes(
+            chain, "Backend engineer", "", resumes, max_workers=workers, provider_name="fake", use_cache=False)))
+    out.update(measure("async", lambda: iter_review_resumes_async(
+        chain, "Backend engineer", "", resumes, provider_name="fake", use_cache=False)))
+    batch_chain = get_batch_reviewer_chain("fake")
+    out.update(measure("packed_w5", lambda: iter_review_resumes_packed(
+        chain, "Backend engineer", "", resumes, batch_chain=batch_chain, provider_name="fake", use_cache=False)))
+    return out
+
+
+def bench_json(args) -> Dict[str, float]:
+    from llm.llm_handler import _to_json_decision
+
+    body = '{"decision": "approved", "category": "A", "match_score": 86, "rationale": "Strong Python and AWS; led migrations."}'
+    samples = {
+        "clean": body,
+        "fenced": f"Here is my assessment:\n```json\n{body}\n```\nLet me know if you need more.",
+        "invalid": "I think this candidate is a good fit overall, score around 80.",
+    }
+    number = 2000 if args.quick else 20000
+    return {
+        f"{name}_us": round(min(timeit.repeat(lambda t=text: _to_json_decision(t), number=number, repeat=3)) / number * 1e6, 3)
+        for name, text in samples.items()
+    }
+
+
+def bench_db(args) -> Dict[str, float]:
+    import bench_db_writes
+
+    rows = 500 if args.quick else args.db_rows
+    out: Dict[str, float] = {}
+    for strategy in ("orm_batch", "bulk"):
+        out[f"{strategy}.rows_per_s"] = bench_db_writes.run(strategy, rows, None, True)["rows_per_sec"]
+    return out
+
+
+SUITES: Dict[str, Callable[[Any], Dict[str, float]]] = {
+    "parse": bench_parse,
+    "review": bench_review,
+    "json": bench_json,
+    "db": bench_db,
+}
+
+
+def compare(current: Dict[str, float], baseline: Dict[str, float], max_regression: float) -> List[Dict[str, Any]]:
+    """Per-metric change against ``baseline``; ``regressed`` when worse by more than ``max_regression``."""
+    rows = []
+    for key in sorted(set(current) & set(baseline)):
+        old, new = baseline[key], current[key]
+        if not old or key.endswith(".errors"):
+            continue
+        change = (new - old) / old
+        lower_better = key.endswith(_LOWER_IS_BETTER)
+        worse = change if lower_better else -change
+        rows.append({"metric": key, "baseline": old, "current": new, "change": round(change, 3),
+                     "regressed": worse > max_regression})
+    return rows
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite.")
+    parser.add_argument("--suites", nargs="+", choices=sorted(SUITES), default=list(SUITES))
+    parser.add_argument("--quick", action="store_true", help="smaller inputs for a fast smoke run")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--resumes", type=int, default=200, help="resumes per review run")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 10, 20], help="thread-engine worker counts")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="fake model latency")
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--parse-workers", type=int, default=0, help="parse pool workers (0 = PARSE_WORKERS / CPU count)")
+    parser.add_argument("--db-rows", type=int, default=2000)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.15, help="allowed relative slowdown per metric")
+    args = parser.parse_args(argv)
+
+    commit = _git_commit()
+    metrics: Dict[str, float] = {}
+    for name in args.suites:
+        started = time.perf_counter()
+        for key, value in SUITES[name](args).items():
+            metrics[f"{name}.{key}"] = value
+        print(f"[{name}] done in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        },
+        "metrics": metrics,
+    }
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"{commit or 'working-tree'}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    width = max(len(k) for k in metrics) if metrics else 0
+    for key, value in metrics.items():
+        print(f"{key:<{width}}  {value}")
+    print(f"Results written to {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        if baseline.get("meta", {}).get("args", {}).get("quick") != args.quick:
+            print("Warning: baseline was run with a different --quick setting", file=sys.stderr)
+        rows = compare(metrics, baseline.get("metrics", {}), args.max_regression)
+        print(f"\nCompared with {baseline.get('meta', {}).get('commit')}:")
+        for row in rows:
+            flag = "  REGRESSED" if row["regressed"] else ""
+            print(f"{row['metric']:<{width}}  {row['baseline']:>12} -> {row['current']:<12} {row['change']:+.1%}{flag}")
+        if any(row["regressed"] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,12 +4,112 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() not in ("0", "false", "no", "off", "")
+
+
 class Settings(BaseModel):
     database_url: str = os.getenv("DATABASE_URL", "sqlite:///./ats.db")
     default_llm_provider: str = os.getenv("DEFAULT_LLM_PROVIDER", "openai")
 
+    # Connection pooling (server databases) and SQLite write tuning
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    sqlite_wal: bool = _env_bool("SQLITE_WAL", "1")
+    sqlite_synchronous: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    sqlite_busy_timeout_ms: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    bulk_insert_chunk_size: int = int(os.getenv("BULK_INSERT_CHUNK_SIZE", "500"))
+
     openai_api_key: str | None = os.getenv("OPENAI_API_KEY")
     anthropic_api_key: str | None = os.getenv("ANTHROPIC_API_KEY")
     google_api_key: str | None = os.getenv("GOOGLE_API_KEY")
 
+    # Decision cache (re-screening identical JD/resume pairs skips the LLM)
+    decision_cache_enabled: bool = _env_bool("DECISION_CACHE_ENABLED", "1")
+    decision_cache_max_entries: int = int(os.getenv("DECISION_CACHE_MAX_ENTRIES", "50000"))
+    decision_cache_max_age_days: int = int(os.getenv("DECISION_CACHE_MAX_AGE_DAYS", "30"))
+
+    # Async review engine: per-provider rate limits (0 disables a limit) and concurrency bounds
+    openai_rpm: int = int(os.getenv("OPENAI_RPM", "500"))
+    openai_tpm: int = int(os.getenv("OPENAI_TPM", "200000"))
+    anthropic_rpm: int = int(os.getenv("ANTHROPIC_RPM", "50"))
+    anthropic_tpm: int = int(os.getenv("ANTHROPIC_TPM", "40000"))
+    google_rpm: int = int(os.getenv("GOOGLE_RPM", "150"))
+    google_tpm: int = int(os.getenv("GOOGLE_TPM", "2000000"))
+    llm_initial_concurrency: int = int(os.getenv("LLM_INITIAL_CONCURRENCY", "5"))
+    llm_max_concurrency: int = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+    llm_max_retries: int = int(os.getenv("LLM_MAX_RETRIES", "4"))
+    llm_request_timeout: float = float(os.getenv("LLM_REQUEST_TIMEOUT", "120"))
+    # Shared keep-alive HTTP pool per provider (see llm/clients.py)
+    http_max_connections: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    http_max_keepalive: int = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+    http_keepalive_expiry: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+    review_engine: str = os.getenv("REVIEW_ENGINE", "threads")  # threads | async | packed | cascade
+    # Cascade engine: cheap screening tier (empty = review provider / its cheaper model) and escalation band
+    cascade_screen_provider: str = os.getenv("CASCADE_SCREEN_PROVIDER", "")
+    cascade_screen_model: str = os.getenv("CASCADE_SCREEN_MODEL", "")
+    cascade_screen_hedge_provider: str = os.getenv("CASCADE_SCREEN_HEDGE_PROVIDER", "")  # empty = screening is not hedged
+    # OpenAI's review model is already a small one, so its screening tier needs a smaller model still
+    openai_screen_model: str = os.getenv("OPENAI_SCREEN_MODEL", "gpt-4.1-nano")
+    cascade_band_low: int = int(os.getenv("CASCADE_BAND_LOW", "40"))
+    cascade_band_high: int = int(os.getenv("CASCADE_BAND_HIGH", "85"))
+    # Hedging and circuit breakers (see llm/resilience.py); empty HEDGE_PROVIDER disables hedging
+    hedge_provider: str = os.getenv("HEDGE_PROVIDER", "")
+    hedge_quantile: float = float(os.getenv("HEDGE_QUANTILE", "95"))
+    hedge_initial_delay: float = float(os.getenv("HEDGE_INITIAL_DELAY", "20"))  # until enough latencies are observed
+    hedge_min_delay: float = float(os.getenv("HEDGE_MIN_DELAY", "1"))
+    latency_window: int = int(os.getenv("LATENCY_WINDOW", "200"))
+    circuit_failure_threshold: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    circuit_reset_seconds: float = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+    # Calls still running after LLM_REQUEST_TIMEOUT, per provider; beyond this new calls fail fast
+    llm_max_abandoned_calls: int = int(os.getenv("LLM_MAX_ABANDONED_CALLS", "16"))
+
+    # Background job queue (database/job_queue.py, worker.py)
+    job_queue_enabled: bool = _env_bool("JOB_QUEUE_ENABLED", "0")  # UI default for "Run in background"
+    worker_processes: int = int(os.getenv("WORKER_PROCESSES", "2"))
+    worker_batch_size: int = int(os.getenv("WORKER_BATCH_SIZE", "20"))  # items leased per claim
+    worker_lease_seconds: float = float(os.getenv("WORKER_LEASE_SECONDS", "120"))  # renewed while a batch runs
+    worker_max_attempts: int = int(os.getenv("WORKER_MAX_ATTEMPTS", "3"))
+    worker_poll_interval: float = float(os.getenv("WORKER_POLL_INTERVAL", "2"))
+    # Largest export the History view builds in memory; bigger ones go through `history.py export`
+    history_export_max_rows: int = int(os.getenv("HISTORY_EXPORT_MAX_ROWS", "10000"))
+
+    # Resume parsing process pool (0 workers = os.cpu_count())
+    parse_workers: int = int(os.getenv("PARSE_WORKERS", "0"))
+    parse_timeout: float = float(os.getenv("PARSE_TIMEOUT", "30"))
+    parse_memory_mb: int = int(os.getenv("PARSE_MEMORY_MB", "1024"))
+
+    # Lexical (BM25) prescreen ahead of the LLM; 0 disables top-K / threshold
+    prescreen_enabled: bool = _env_bool("PRESCREEN_ENABLED", "0")
+    prescreen_top_k: int = int(os.getenv("PRESCREEN_TOP_K", "0"))
+    prescreen_threshold: int = int(os.getenv("PRESCREEN_THRESHOLD", "0"))
+    prescreen_shadow: bool = _env_bool("PRESCREEN_SHADOW", "0")
+
+    # Packed reviews: resume-text token budget and resume count per LLM call
+    pack_token_budget: int = int(os.getenv("PACK_TOKEN_BUDGET", "12000"))
+    pack_max_resumes: int = int(os.getenv("PACK_MAX_RESUMES", "8"))
+
+    # Provider-side prompt caching of the shared system prompt + JD prefix
+    prompt_cache_enabled: bool = _env_bool("PROMPT_CACHE_ENABLED", "1")
+    gemini_cache_ttl_minutes: int = int(os.getenv("GEMINI_CACHE_TTL_MINUTES", "60"))
+
+    # Resume compaction before review: per-resume token budget (0 = normalise only, never truncate)
+    resume_token_budget: int = int(os.getenv("RESUME_TOKEN_BUDGET", "4000"))
+
+    # Offline fake provider (provider="fake", llm/fake_models.py): simulated latency, jitter and error rate
+    fake_llm_latency_ms: float = float(os.getenv("FAKE_LLM_LATENCY_MS", "800"))
+    fake_llm_jitter_ms: float = float(os.getenv("FAKE_LLM_JITTER_MS", "400"))
+    fake_llm_error_rate: float = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+
+    # Hashed n-gram index over all stored resumes (archive search)
+    resume_index_dir: str = os.getenv("RESUME_INDEX_DIR", "data/resume_index")
+    resume_index_terms: int = int(os.getenv("RESUME_INDEX_TERMS", "200"))  # keyword signature size per resume
+
+    # Per-call usage instrumentation (llm_usage table, written in background batches)
+    usage_tracking_enabled: bool = _env_bool("USAGE_TRACKING_ENABLED", "1")
+    usage_batch_size: int = int(os.getenv("USAGE_BATCH_SIZE", "200"))
+    usage_flush_interval: float = float(os.getenv("USAGE_FLUSH_INTERVAL", "2"))
+
 settings = Settings()
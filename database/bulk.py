@@ -0,0 +1,115 @@
+"""Bulk persistence: batched executemany INSERTs that return primary keys.
+
+The ORM path (``session.add`` per object, a commit or refresh per row) costs a
+round trip and an identity-map entry for every resume and decision. These
+helpers send one multi-row INSERT per chunk inside the caller's transaction
+and return the new ids in input order, using ``RETURNING`` where the dialect
+supports it (SQLite 3.35+, Postgres, MariaDB) and per-row ``lastrowid``
+otherwise (MySQL).
+"""
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+from sqlalchemy import delete, insert
+
+from config.settings import settings
+from .models import Decision, Resume
+
+
+def _chunks(rows: Sequence[Dict[str, Any]], size: int) -> Iterable[Sequence[Dict[str, Any]]]:
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def bulk_insert(session, model, rows: Sequence[Dict[str, Any]], return_ids: bool = True,
+                chunk_size: int | None = None) -> List[int]:
+    """INSERT ``rows`` (dicts of column values) into ``model``'s table; ids in input order.
+
+    Runs in the session's current transaction; the caller commits.
+    """
+    rows = list(rows)
+    if not rows:
+        return []
+    chunk_size = chunk_size or settings.bulk_insert_chunk_size
+    table = model.__table__
+    dialect = session.get_bind().dialect
+    ids: List[int] = []
+    for chunk in _chunks(rows, chunk_size):
+        if not return_ids:
+            session.execute(insert(table), chunk)
+        elif dialect.insert_executemany_returning_sort_by_parameter_order:
+            stmt = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+            ids.extend(session.execute(stmt, chunk).scalars().all())
+        else:
+            for row in chunk:
+                ids.append(session.execute(insert(table).values(**row)).inserted_primary_key[0])
+    return ids
+
+
+def insert_resumes(session, rows: Sequence[Dict[str, Any]]) -> List[int]:
+    """Rows carry filename, content and content_hash."""
+    return bulk_insert(session, Resume, rows)
+
+
+def save_decisions(session, job_id: int, results: Sequence[Dict[str, Any]], commit: bool = True,
+                   replace_errors: bool = False) -> List[int]:
+    """Persist review results for a job in one transaction and return the new ``Decision`` ids.
+
+    With ``replace_errors`` an earlier ``error`` row for the same (job, resume) is deleted first, so
+    retrying a failed review leaves one row per resume instead of piling up errors.
+    """
+    rows = [
+        {
+            "job_id": job_id,
+            "resume_id": r["resume_id"],
+            "decision": r["decision"],
+            "rationale": r.get("rationale") or "",
+            "category": r.get("category"),
+            "match_score": r.get("match_score"),
+            # Cascade results also carry the screening verdict (every row needs every key for executemany)
+            "escalated": r.get("escalated"),
+            **{f"screen_{k}": (r.get("screen") or {}).get(k) for k in ("model", "decision", "category", "match_score", "rationale")},
+        }
+        for r in results
+    ]
+    try:
+        if replace_errors and rows:
+            resume_ids = list({row["resume_id"] for row in rows})
+            for chunk in _chunks(resume_ids, settings.bulk_insert_chunk_size):
+                session.execute(delete(Decision).where(Decision.job_id == job_id, Decision.decision == "error",
+                                                       Decision.resume_id.in_(chunk)))
+        ids = bulk_insert(session, Decision, rows)
+        if commit:
+            session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return ids
+
+
+def stream_save_decisions(session, job_id: int, results: Iterable[Dict[str, Any]], batch_size: int = 20,
+                          max_delay: float = 1.0) -> Iterator[Dict[str, Any]]:
+    """Pass ``results`` through while saving them as ``Decision`` rows in small batches.
+
+    A batch is committed once it holds ``batch_size`` results or its oldest result is
+    ``max_delay`` seconds old. Whatever is buffered is saved when the stream ends, fails
+    or is closed early, so a cancelled run keeps every verdict it already produced.
+    """
+    buffer: List[Dict[str, Any]] = []
+    oldest = 0.0
+    try:
+        for result in results:
+            if not buffer:
+                oldest = time.monotonic()
+            buffer.append(result)
+            if len(buffer) >= batch_size or time.monotonic() - oldest >= max_delay:
+                save_decisions(session, job_id, buffer)
+                buffer = []
+            yield result
+    finally:
+        # Stop the producer first (cancels queued reviews) so nothing more arrives, then save the rest
+        close = getattr(results, "close", None)
+        if close is not None:
+            close()
+        if buffer:
+            save_decisions(session, job_id, buffer)
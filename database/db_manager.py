@@ -1,30 +1,104 @@
-from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker
 from config.settings import settings
 
 _engine = None
 _Session = None
 
+def _engine_kwargs(url: str) -> dict:
+    if url.startswith("sqlite"):
+        return {}
+    # Server databases: keep a warm pool and drop connections the server has timed out
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": True,
+    }
+
+def _tune_sqlite(dbapi_conn, _record):
+    """WAL lets readers proceed during a write; NORMAL sync is durable across app crashes in WAL mode."""
+    cur = dbapi_conn.cursor()
+    try:
+        cur.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        if settings.sqlite_wal:
+            cur.execute("PRAGMA journal_mode=WAL")
+        if settings.sqlite_synchronous.upper() in ("OFF", "NORMAL", "FULL", "EXTRA"):
+            cur.execute(f"PRAGMA synchronous={settings.sqlite_synchronous.upper()}")
+    finally:
+        cur.close()
+
 def init_db():
     global _engine, _Session
     if _engine is None:
-        _engine = create_engine(settings.database_url, echo=False, future=True)
+        _engine = create_engine(settings.database_url, echo=False, future=True, **_engine_kwargs(settings.database_url))
+        if _engine.dialect.name == "sqlite" and ":memory:" not in settings.database_url:
+            event.listen(_engine, "connect", _tune_sqlite)
         _Session = sessionmaker(autocommit=False, autoflush=False, bind=_engine)
     return _engine, _Session
 
+# Cascade columns on decisions (added after the first release)
+_DECISION_COLUMNS = {
+    "escalated": "BOOLEAN",
+    "screen_model": "VARCHAR(128)",
+    "screen_decision": "VARCHAR(16)",
+    "screen_category": "VARCHAR(1)",
+    "screen_match_score": "INTEGER",
+    "screen_rationale": "TEXT",
+}
+
+# Background queue columns on jobs (see database/job_queue.py)
+_JOB_COLUMNS = {
+    "status": "VARCHAR(16)",
+    "provider": "VARCHAR(32)",
+    "temperature": "FLOAT",
+    "engine": "VARCHAR(16)",
+    "options": "TEXT",
+    "finished_at": "TIMESTAMP",
+}
+
+# Indexes added after the first release; created here for databases built before them
+_DECISION_INDEXES = {
+    "ix_decisions_job_category_score": "decisions (job_id, category, match_score)",
+    "ix_decisions_resume_id": "decisions (resume_id)",
+    "ix_decisions_job_score": "decisions (job_id, match_score)",
+    "ix_decisions_score": "decisions (match_score)",
+}
+
 def migrate_schema(engine):
     """Ensure new columns exist (lightweight auto-migration for SQLite)."""
     try:
         insp = inspect(engine)
+        if insp.has_table('resumes'):
+            resume_cols = {c['name'] for c in insp.get_columns('resumes')}
+            if 'content_hash' not in resume_cols:
+                with engine.begin() as conn:
+                    conn.execute(text('ALTER TABLE resumes ADD COLUMN content_hash VARCHAR(64)'))
+                    conn.execute(text('CREATE UNIQUE INDEX IF NOT EXISTS ix_resumes_content_hash ON resumes (content_hash)'))
+        if insp.has_table('jobs'):
+            job_cols = {c['name'] for c in insp.get_columns('jobs')}
+            with engine.begin() as conn:
+                for name, ddl in _JOB_COLUMNS.items():
+                    if name not in job_cols:
+                        conn.execute(text(f'ALTER TABLE jobs ADD COLUMN {name} {ddl}'))
+                if 'status' not in job_cols:
+                    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status)'))
         if not insp.has_table('decisions'):
             return
         cols = {c['name'] for c in insp.get_columns('decisions')}
+        indexes = {ix['name'] for ix in insp.get_indexes('decisions')}
         with engine.begin() as conn:
             if 'category' not in cols:
                 conn.execute(text('ALTER TABLE decisions ADD COLUMN category VARCHAR(1)'))
             if 'match_score' not in cols:
                 conn.execute(text('ALTER TABLE decisions ADD COLUMN match_score INTEGER'))
-            # Usage table creation removed (token tracking disabled)
+            for name, ddl in _DECISION_COLUMNS.items():
+                if name not in cols:
+                    conn.execute(text(f'ALTER TABLE decisions ADD COLUMN {name} {ddl}'))
+            for name, target in _DECISION_INDEXES.items():
+                if name not in indexes:
+                    conn.execute(text(f'CREATE INDEX {name} ON {target}'))
+            # New tables (llm_usage, work_items, decision_cache) come from Base.metadata.create_all
     except Exception as e:
         # Silent log fallback; in a larger app we would log properly
         print(f"[migrate_schema] Warning: {e}")
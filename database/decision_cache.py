@@ -0,0 +1,121 @@
+"""Persistent cache of LLM screening decisions.
+
+Entries are keyed by a sha256 over everything that can change the verdict
+(JD, HR instructions, resume text, provider, model, temperature and prompt
+version), so a hit can be returned without calling the model again.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy import delete, func, select, update
+
+from config.settings import settings
+from .models import CachedDecision
+
+_table_ready = False
+
+
+def make_cache_key(job_desc: str, hr_prompt: str, resume_text: str, provider: str | None,
+                   model: str | None, temperature: float | None, prompt_version: str) -> str:
+    payload = json.dumps(
+        [job_desc or "", hr_prompt or "", resume_text or "", (provider or "").lower(), model or "",
+         None if temperature is None else round(float(temperature), 4), prompt_version],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def ensure_cache_table(engine) -> None:
+    global _table_ready
+    if not _table_ready:
+        CachedDecision.__table__.create(bind=engine, checkfirst=True)
+        _table_ready = True
+
+
+def get_cached_decisions(session, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Return {cache_key: result fields} for every key present, bumping hit counters."""
+    keys = list(set(keys))
+    found: Dict[str, Dict[str, Any]] = {}
+    # Chunk to stay under SQLite's bound-parameter limit on large batches
+    for i in range(0, len(keys), 500):
+        chunk = keys[i:i + 500]
+        rows = session.execute(select(CachedDecision).where(CachedDecision.cache_key.in_(chunk))).scalars().all()
+        for row in rows:
+            found[row.cache_key] = {
+                "decision": row.decision,
+                "rationale": row.rationale,
+                "category": row.category,
+                "match_score": row.match_score,
+            }
+    if found:
+        hit_keys = list(found)
+        for i in range(0, len(hit_keys), 500):
+            session.execute(
+                update(CachedDecision)
+                .where(CachedDecision.cache_key.in_(hit_keys[i:i + 500]))
+                .values(hits=CachedDecision.hits + 1, last_used_at=func.now())
+            )
+        session.commit()
+    return found
+
+
+def store_decisions(session, entries: List[Dict[str, Any]], provider: str | None, model: str | None) -> None:
+    """Insert new cache entries; entries need cache_key, decision, rationale, category, match_score."""
+    if not entries:
+        return
+    existing = set()
+    keys = [e["cache_key"] for e in entries]
+    for i in range(0, len(keys), 500):
+        existing.update(session.execute(
+            select(CachedDecision.cache_key).where(CachedDecision.cache_key.in_(keys[i:i + 500]))
+        ).scalars().all())
+    seen = set()
+    for e in entries:
+        key = e["cache_key"]
+        if key in existing or key in seen:
+            continue
+        seen.add(key)
+        session.add(CachedDecision(
+            cache_key=key,
+            provider=provider,
+            model=model,
+            decision=e["decision"],
+            rationale=e["rationale"],
+            category=e.get("category"),
+            match_score=e.get("match_score"),
+            hits=0,
+        ))
+    session.commit()
+
+
+def evict_decisions(session, max_entries: int | None = None, max_age_days: int | None = None) -> int:
+    """Drop entries older than max_age_days, then least-recently-used ones beyond max_entries."""
+    max_entries = settings.decision_cache_max_entries if max_entries is None else max_entries
+    max_age_days = settings.decision_cache_max_age_days if max_age_days is None else max_age_days
+    removed = 0
+    if max_age_days and max_age_days > 0:
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=max_age_days)
+        removed += session.execute(delete(CachedDecision).where(CachedDecision.created_at < cutoff)).rowcount or 0
+    if max_entries and max_entries > 0:
+        total = session.execute(select(func.count(CachedDecision.id))).scalar_one()
+        overflow = total - max_entries
+        if overflow > 0:
+            stale_ids = session.execute(
+                select(CachedDecision.id)
+                .order_by(CachedDecision.last_used_at.asc(), CachedDecision.id.asc())
+                .limit(overflow)
+            ).scalars().all()
+            for i in range(0, len(stale_ids), 500):
+                removed += session.execute(
+                    delete(CachedDecision).where(CachedDecision.id.in_(stale_ids[i:i + 500]))
+                ).rowcount or 0
+    session.commit()
+    return removed
+
+
+def clear_decision_cache(session) -> int:
+    removed = session.execute(delete(CachedDecision)).rowcount or 0
+    session.commit()
+    return removed
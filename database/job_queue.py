@@ -0,0 +1,294 @@
+"""Durable screening queue: a job's resumes become ``WorkItem`` rows that ``worker.py`` processes review.
+
+The UI enqueues a job (``enqueue_job``) and polls ``job_progress``. Workers
+``claim_items``: they lease a batch of one job's pending items for
+``WORKER_LEASE_SECONDS`` and keep renewing the lease while they review.
+``complete_items`` stores each verdict as a ``Decision`` in the same
+transaction that marks its item done, and only if the caller still holds
+the lease. A crashed worker's items come back once the lease expires, and
+finished resumes are never reviewed twice. A failed review is retried until
+an item has used ``WORKER_MAX_ATTEMPTS`` leases. After that it is stored as
+an ``error`` decision.
+
+Claims are a compare-and-set UPDATE on (status, lease), so any number of
+processes can share one database. Postgres also uses ``SKIP LOCKED``.
+"""
+import json
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy import and_, func, or_, select, update
+
+from config.settings import settings
+from .bulk import bulk_insert, save_decisions
+from .models import Decision, Job, WorkItem
+
+ACTIVE_JOB_STATES = ("queued", "running")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_job(session, job: Job, resume_ids: Iterable[int], provider: str, temperature: float = 0.2,
+                engine: str = "threads", options: Dict[str, Any] | None = None,
+                decided: Sequence[Dict[str, Any]] = ()) -> int:
+    """Queue ``resume_ids`` of an existing ``job`` for the workers; returns the number of items queued.
+
+    ``decided`` holds results already known at submit time (e.g. prescreened-out resumes); they are
+    stored as decisions directly. Everything is committed together.
+    """
+    decided_ids = {r["resume_id"] for r in decided}
+    ids = [rid for rid in dict.fromkeys(resume_ids) if rid not in decided_ids]
+    job.provider = provider
+    job.temperature = temperature
+    job.engine = engine
+    job.options = json.dumps(options or {})
+    job.status = "queued" if ids else "done"
+    if not ids:
+        job.finished_at = _now()
+    session.flush()
+    try:
+        bulk_insert(session, WorkItem, [
+            {"job_id": job.id, "resume_id": rid, "status": "pending", "attempts": 0} for rid in ids
+        ], return_ids=False)
+        if decided:
+            save_decisions(session, job.id, decided, commit=False)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return len(ids)
+
+
+def _error_result(resume_id: int, message: str) -> Dict[str, Any]:
+    return {"resume_id": resume_id, "decision": "error", "category": None, "match_score": None, "rationale": message}
+
+
+def _finish_if_drained(session, job_ids: Iterable[int]) -> None:
+    """Mark running jobs done once none of their items is pending or leased (caller commits)."""
+    for job_id in set(job_ids):
+        open_items = session.execute(
+            select(func.count(WorkItem.id)).where(WorkItem.job_id == job_id, WorkItem.status.in_(("pending", "leased")))
+        ).scalar_one()
+        if not open_items:
+            session.execute(update(Job).where(Job.id == job_id, Job.status.in_(ACTIVE_JOB_STATES))
+                            .values(status="done", finished_at=_now()))
+
+
+def _fail_exhausted(session, now: datetime, max_attempts: int) -> None:
+    """Expired leases that used their last attempt: store an error decision instead of retrying again."""
+    rows = session.execute(
+        select(WorkItem.id, WorkItem.job_id, WorkItem.resume_id, WorkItem.attempts)
+        .where(WorkItem.status == "leased", WorkItem.lease_expires_at < now, WorkItem.attempts >= max_attempts)
+    ).all()
+    failed: Dict[int, List[Dict[str, Any]]] = {}
+    for item_id, job_id, resume_id, attempts in rows:
+        message = f"Review abandoned: lease expired on all {attempts} attempt(s) (worker stopped or stalled)."
+        changed = session.execute(
+            update(WorkItem).where(WorkItem.id == item_id, WorkItem.status == "leased", WorkItem.lease_expires_at < now)
+            .values(status="failed", lease_owner=None, lease_expires_at=None, last_error=message, updated_at=now)
+        ).rowcount
+        if changed:  # another worker may have failed it first
+            failed.setdefault(job_id, []).append(_error_result(resume_id, message))
+    for job_id, results in failed.items():
+        save_decisions(session, job_id, results, commit=False)
+    _finish_if_drained(session, failed)
+
+
+def claim_items(session, worker: str | None = None, limit: int | None = None, lease_seconds: float | None = None,
+                max_attempts: int | None = None) -> Tuple[str, int, List[int]] | None:
+    """Lease up to ``limit`` claimable items of the oldest runnable job.
+
+    Returns (lease owner token, job id, resume ids), or None when nothing is claimable.
+    """
+    limit = limit or settings.worker_batch_size
+    lease_seconds = lease_seconds or settings.worker_lease_seconds
+    max_attempts = max_attempts or settings.worker_max_attempts
+    now = _now()
+    try:
+        _fail_exhausted(session, now, max_attempts)
+        claimable = or_(
+            WorkItem.status == "pending",
+            and_(WorkItem.status == "leased", WorkItem.lease_expires_at < now, WorkItem.attempts < max_attempts),
+        )
+        runnable = select(Job.id).where(Job.status.in_(ACTIVE_JOB_STATES))
+        job_id = session.execute(
+            select(WorkItem.job_id).where(claimable, WorkItem.job_id.in_(runnable)).order_by(WorkItem.id).limit(1)
+        ).scalar()
+        if job_id is None:
+            session.commit()
+            return None
+        query = select(WorkItem.id).where(claimable, WorkItem.job_id == job_id).order_by(WorkItem.id).limit(limit)
+        if session.get_bind().dialect.name == "postgresql":
+            query = query.with_for_update(skip_locked=True)
+        ids = session.execute(query).scalars().all()
+        owner = f"{worker or worker_name()}/{uuid.uuid4().hex[:12]}"
+        # Re-check claimability in the UPDATE itself: a concurrent worker may have taken some of these
+        session.execute(
+            update(WorkItem).where(WorkItem.id.in_(ids), claimable)
+            .values(status="leased", lease_owner=owner, lease_expires_at=now + timedelta(seconds=lease_seconds),
+                    attempts=WorkItem.attempts + 1, updated_at=now)
+        )
+        session.execute(update(Job).where(Job.id == job_id, Job.status == "queued").values(status="running"))
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    resume_ids = session.execute(
+        select(WorkItem.resume_id).where(WorkItem.lease_owner == owner, WorkItem.status == "leased")
+    ).scalars().all()
+    return (owner, job_id, list(resume_ids)) if resume_ids else None
+
+
+def renew_lease(session, owner: str, lease_seconds: float | None = None) -> int:
+    """Extend every item still leased by ``owner``; 0 means the lease was lost (expired and reclaimed, or cancelled)."""
+    lease_seconds = lease_seconds or settings.worker_lease_seconds
+    now = _now()
+    try:
+        renewed = session.execute(
+            update(WorkItem).where(WorkItem.lease_owner == owner, WorkItem.status == "leased")
+            .values(lease_expires_at=now + timedelta(seconds=lease_seconds), updated_at=now)
+        ).rowcount
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return renewed
+
+
+def complete_items(session, owner: str, job_id: int, results: Sequence[Dict[str, Any]],
+                   max_attempts: int | None = None) -> int:
+    """Store results for items ``owner`` still holds; returns how many were accepted.
+
+    A failed review (``decision == "error"``) goes back to pending while attempts remain.
+    Results for items whose lease was lost are dropped: another worker owns them now.
+    """
+    max_attempts = max_attempts or settings.worker_max_attempts
+    if not results:
+        return 0
+    now = _now()
+    by_resume = {r["resume_id"]: r for r in results}
+    try:
+        attempts = dict(session.execute(
+            select(WorkItem.resume_id, WorkItem.attempts)
+            .where(WorkItem.job_id == job_id, WorkItem.lease_owner == owner, WorkItem.status == "leased",
+                   WorkItem.resume_id.in_(list(by_resume)))
+        ).all())
+        to_save = []
+        for resume_id, result in by_resume.items():
+            if resume_id not in attempts:
+                continue
+            retry = result.get("decision") == "error" and attempts[resume_id] < max_attempts
+            if retry:
+                values = {"status": "pending", "lease_owner": None, "lease_expires_at": None}
+            else:
+                values = {"status": "failed" if result.get("decision") == "error" else "done"}
+            if result.get("decision") == "error":
+                values["last_error"] = (result.get("rationale") or "")[:2000]
+            changed = session.execute(
+                update(WorkItem).where(WorkItem.job_id == job_id, WorkItem.resume_id == resume_id,
+                                       WorkItem.lease_owner == owner, WorkItem.status == "leased")
+                .values(updated_at=now, **values)
+            ).rowcount
+            if changed and not retry:
+                to_save.append(result)
+        save_decisions(session, job_id, to_save, commit=False)
+        _finish_if_drained(session, [job_id])
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return len(to_save)
+
+
+def release_items(session, owner: str, error: str | None = None, max_attempts: int | None = None) -> int:
+    """Hand back items ``owner`` has not finished; returns how many were released.
+
+    Without ``error`` (graceful shutdown or cancellation) the unused attempt is refunded. With ``error``
+    (the batch crashed) the attempt counts: items that used their last one are stored as error decisions,
+    the rest go back to pending.
+    """
+    now = _now()
+    leased = and_(WorkItem.lease_owner == owner, WorkItem.status == "leased")
+    try:
+        if error is None:
+            released = session.execute(
+                update(WorkItem).where(leased)
+                .values(status="pending", lease_owner=None, lease_expires_at=None, attempts=WorkItem.attempts - 1,
+                        updated_at=now)
+            ).rowcount
+        else:
+            max_attempts = max_attempts or settings.worker_max_attempts
+            message = error[:2000]
+            rows = session.execute(select(WorkItem.job_id, WorkItem.resume_id, WorkItem.attempts).where(leased)).all()
+            exhausted = [(job_id, resume_id) for job_id, resume_id, attempts in rows if attempts >= max_attempts]
+            released = session.execute(
+                update(WorkItem).where(leased, WorkItem.attempts < max_attempts)
+                .values(status="pending", lease_owner=None, lease_expires_at=None, last_error=message, updated_at=now)
+            ).rowcount
+            failed: Dict[int, List[Dict[str, Any]]] = {}
+            for job_id, resume_id in exhausted:
+                changed = session.execute(
+                    update(WorkItem).where(leased, WorkItem.job_id == job_id, WorkItem.resume_id == resume_id)
+                    .values(status="failed", lease_owner=None, lease_expires_at=None, last_error=message,
+                            updated_at=now)
+                ).rowcount
+                if changed:
+                    failed.setdefault(job_id, []).append(_error_result(resume_id, message))
+            for job_id, results in failed.items():
+                save_decisions(session, job_id, results, commit=False)
+            _finish_if_drained(session, failed)
+            released += sum(len(results) for results in failed.values())
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return released
+
+
+def cancel_job(session, job_id: int) -> int:
+    """Stop a queued or running job; unfinished items are cancelled and in-flight verdicts are discarded."""
+    now = _now()
+    try:
+        cancelled = session.execute(
+            update(WorkItem).where(WorkItem.job_id == job_id, WorkItem.status.in_(("pending", "leased")))
+            .values(status="cancelled", lease_owner=None, lease_expires_at=None, updated_at=now)
+        ).rowcount
+        session.execute(update(Job).where(Job.id == job_id, Job.status.in_(ACTIVE_JOB_STATES))
+                        .values(status="cancelled", finished_at=now))
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return cancelled
+
+
+def job_progress(session, job_id: int) -> Dict[str, Any]:
+    """Job status plus item counts per status and the number of stored decisions."""
+    status = session.execute(select(Job.status).where(Job.id == job_id)).scalar()
+    counts = dict(session.execute(
+        select(WorkItem.status, func.count(WorkItem.id)).where(WorkItem.job_id == job_id).group_by(WorkItem.status)
+    ).all())
+    decisions = session.execute(select(func.count(Decision.id)).where(Decision.job_id == job_id)).scalar_one()
+    progress = {"job_id": job_id, "status": status, "decisions": decisions, "total": sum(counts.values())}
+    for state in ("pending", "leased", "done", "failed", "cancelled"):
+        progress[state] = counts.get(state, 0)
+    return progress
+
+
+def queue_stats(session) -> Dict[str, int]:
+    """Item counts per status across active jobs (for worker logs and ``--once`` draining)."""
+    return dict(session.execute(
+        select(WorkItem.status, func.count(WorkItem.id))
+        .join(Job, Job.id == WorkItem.job_id)
+        .where(Job.status.in_(ACTIVE_JOB_STATES))
+        .group_by(WorkItem.status)
+    ).all())
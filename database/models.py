@@ -1,5 +1,5 @@
 from sqlalchemy.orm import declarative_base, relationship, Mapped, mapped_column
-from sqlalchemy import Integer, String, Text, ForeignKey, DateTime, func
+from sqlalchemy import Boolean, Float, Index, Integer, String, Text, ForeignKey, DateTime, UniqueConstraint, func
 
 Base = declarative_base()
 
@@ -8,6 +8,8 @@ class Resume(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     filename: Mapped[str] = mapped_column(String(255), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
+    # sha256 of the uploaded file bytes; identical uploads reuse this row (nullable for legacy rows)
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True, unique=True, index=True)
     decisions = relationship("Decision", back_populates="resume")
 
 class Job(Base):
@@ -16,24 +18,102 @@ class Job(Base):
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=False)
     hr_prompt: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Background runs (database/job_queue.py): "queued" | "running" | "done" | "cancelled"; NULL = reviewed inline
+    status: Mapped[str | None] = mapped_column(String(16), nullable=True, index=True)
+    provider: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    temperature: Mapped[float | None] = mapped_column(Float, nullable=True)
+    engine: Mapped[str | None] = mapped_column(String(16), nullable=True)  # threads | async | packed | cascade
+    options: Mapped[str | None] = mapped_column(Text, nullable=True)  # JSON review options for workers
+    finished_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     decisions = relationship("Decision", back_populates="job")
 
 class Decision(Base):
     __tablename__ = "decisions"
+    __table_args__ = (
+        # Per-job A/B/C listings ordered by score, and "which jobs saw this resume" lookups
+        Index("ix_decisions_job_category_score", "job_id", "category", "match_score"),
+        # History pages and exports (database/queries.py), best score first: per job and across jobs
+        Index("ix_decisions_job_score", "job_id", "match_score"),
+        Index("ix_decisions_score", "match_score"),
+        Index("ix_decisions_resume_id", "resume_id"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     job_id: Mapped[int] = mapped_column(ForeignKey("jobs.id"))
     resume_id: Mapped[int] = mapped_column(ForeignKey("resumes.id"))
-    decision: Mapped[str] = mapped_column(String(16))  # "approved" | "rejected"
+    decision: Mapped[str] = mapped_column(String(16))  # "approved" | "rejected" | "error" (review failed)
     rationale: Mapped[str] = mapped_column(Text)
     # New categorization fields (nullable for backward compatibility)
     category: Mapped[str | None] = mapped_column(String(1), nullable=True)  # 'A' | 'B' | 'C'
     match_score: Mapped[int | None] = mapped_column(Integer, nullable=True)  # 0-100
+    # Cascade engine: the screening model's verdict, and whether the strong model re-reviewed it (NULL = no cascade)
+    escalated: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
+    screen_model: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    screen_decision: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    screen_category: Mapped[str | None] = mapped_column(String(1), nullable=True)
+    screen_match_score: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    screen_rationale: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     job = relationship("Job", back_populates="decisions")
     resume = relationship("Resume", back_populates="decisions")
 
 
-## Usage model removed (token tracking disabled)
+class WorkItem(Base):
+    """One resume of a queued job; workers lease items, review them and store a Decision."""
+    __tablename__ = "work_items"
+    __table_args__ = (
+        UniqueConstraint("job_id", "resume_id", name="uq_work_items_job_resume"),
+        # Claim scans: pending items, and leased items whose lease has expired
+        Index("ix_work_items_status_lease", "status", "lease_expires_at"),
+        Index("ix_work_items_job_status", "job_id", "status"),
+    )
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    job_id: Mapped[int] = mapped_column(ForeignKey("jobs.id"))
+    resume_id: Mapped[int] = mapped_column(ForeignKey("resumes.id"))
+    status: Mapped[str] = mapped_column(String(16), default="pending")  # pending | leased | done | failed | cancelled
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    lease_owner: Mapped[str | None] = mapped_column(String(128), nullable=True)  # "<host>:<pid>/<claim token>"
+    lease_expires_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class CachedDecision(Base):
+    """Verdict reused when the same JD/HR prompt/resume/model combination is screened again."""
+    __tablename__ = "decision_cache"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    cache_key: Mapped[str] = mapped_column(String(64), unique=True, index=True)  # sha256 hex
+    provider: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    model: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    decision: Mapped[str] = mapped_column(String(16))
+    rationale: Mapped[str] = mapped_column(Text)
+    category: Mapped[str | None] = mapped_column(String(1), nullable=True)
+    match_score: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    hits: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
+    last_used_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+
+class Usage(Base):
+    """One row per review call (or decision-cache hit): latency, retries and token counts."""
+    __tablename__ = "llm_usage"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    job_id: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+    resume_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    provider: Mapped[str | None] = mapped_column(String(32), nullable=True, index=True)
+    model: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    engine: Mapped[str | None] = mapped_column(String(16), nullable=True)  # threads | async | packed | cascade
+    resumes: Mapped[int] = mapped_column(Integer, default=1)  # >1 for packed calls
+    wall_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    queue_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    retries: Mapped[int] = mapped_column(Integer, default=0)
+    input_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    output_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    cached_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    tokens_estimated: Mapped[bool] = mapped_column(Boolean, default=False)  # provider returned no usage
+    cache_hit: Mapped[bool] = mapped_column(Boolean, default=False)  # served from the decision cache
+    error: Mapped[bool] = mapped_column(Boolean, default=False)
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
 
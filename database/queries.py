@@ -0,0 +1,204 @@
+"""Read-side queries over jobs and decisions: keyset pages, SQL aggregates and streamed exports.
+
+Every query selects plain columns rather than ORM entities, so
+``Resume.content`` is never loaded through a relationship. The only resume
+column read is ``filename``.
+
+Pages use keyset pagination. ``list_jobs`` and ``list_decisions`` return
+``(rows, next_cursor)``. Pass the cursor back as ``after`` to get the next
+page. It costs the same on page 1,000 as on page 1, where an OFFSET query
+would rescan every earlier row. Decisions come highest score first (NULL
+scores last), then newest first. That order is served by
+``ix_decisions_job_score`` within a job and ``ix_decisions_score`` across jobs.
+
+``iter_decisions`` streams rows with a server-side cursor (``stream_results``
+plus ``yield_per``). ``export_decisions`` writes them as CSV or JSON Lines
+without holding a job in memory.
+"""
+import csv
+import json
+from typing import Any, Dict, IO, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import and_, case, func, or_, select
+
+from .models import Decision, Job, Resume
+
+DECISION_COLUMNS = ("id", "job_id", "resume_id", "filename", "decision", "category", "match_score", "rationale",
+                    "escalated", "screen_category", "screen_match_score", "created_at")
+
+_SELECT_DECISION = (Decision.id, Decision.job_id, Decision.resume_id, Resume.filename, Decision.decision,
+                    Decision.category, Decision.match_score, Decision.rationale, Decision.escalated,
+                    Decision.screen_category, Decision.screen_match_score, Decision.created_at)
+
+
+def _decision_filters(job_id: int | None = None, categories: Sequence[str] | None = None,
+                      min_score: int | None = None, max_score: int | None = None,
+                      decision: str | None = None, filename: str | None = None) -> List[Any]:
+    """WHERE clauses shared by listing, stats and export.
+
+    ``categories`` may include "error"; "C" also matches legacy rows without a category, as in the app.
+    """
+    clauses = []
+    if job_id is not None:
+        clauses.append(Decision.job_id == job_id)
+    if categories:
+        wanted = [c for c in categories if c != "error"]
+        parts = [and_(_category_clause(wanted), Decision.decision != "error")] if wanted else []
+        if "error" in categories:
+            parts.append(Decision.decision == "error")
+        clauses.append(or_(*parts))
+    if min_score is not None:
+        clauses.append(Decision.match_score >= min_score)
+    if max_score is not None:
+        clauses.append(Decision.match_score <= max_score)
+    if decision:
+        clauses.append(Decision.decision == decision)
+    if filename:
+        clauses.append(Resume.filename.ilike(f"%{filename}%"))
+    return clauses
+
+
+def _category_clause(categories: Sequence[str]):
+    clause = Decision.category.in_(list(categories))
+    return or_(clause, Decision.category.is_(None)) if "C" in categories else clause
+
+
+def _decision_query(**filters):
+    return (select(*_SELECT_DECISION)
+            .join(Resume, Resume.id == Decision.resume_id)
+            .where(*_decision_filters(**filters)))
+
+
+def _ordered(stmt):
+    return stmt.order_by(Decision.match_score.desc().nulls_last(), Decision.id.desc())
+
+
+def _row(row) -> Dict[str, Any]:
+    return dict(zip(DECISION_COLUMNS, row))
+
+
+def list_decisions(session, after: Tuple[int | None, int] | None = None, limit: int = 50,
+                   **filters) -> Tuple[List[Dict[str, Any]], Tuple[int | None, int] | None]:
+    """One page of decisions, best score first; ``after`` is the previous page's ``(match_score, id)`` cursor.
+
+    Filters: ``job_id``, ``categories``, ``min_score``, ``max_score``, ``decision``, ``filename``.
+    """
+    stmt = _decision_query(**filters)
+    null_tail = stmt.where(Decision.match_score.is_(None)).order_by(Decision.id.desc())
+    if after is None:
+        rows = session.execute(_ordered(stmt).limit(limit + 1)).all()
+    elif after[0] is None:  # already into the NULL-score tail
+        rows = session.execute(null_tail.where(Decision.id < after[1]).limit(limit + 1)).all()
+    else:
+        score, last_id = after
+        # "score <= s" is an index range; the OR only filters rows inside it
+        rows = session.execute(_ordered(stmt.where(
+            Decision.match_score <= score, or_(Decision.match_score < score, Decision.id < last_id),
+        )).limit(limit + 1)).all()
+        if len(rows) <= limit:
+            rows += session.execute(null_tail.limit(limit + 1 - len(rows))).all()
+    rows = [_row(r) for r in rows]
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1]["match_score"], rows[-1]["id"])
+
+
+def _iter_rows(session, batch_size: int, limit: int | None = None, **filters) -> Iterator[Tuple[Any, ...]]:
+    stmt = _ordered(_decision_query(**filters))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    stmt = stmt.execution_options(stream_results=True, yield_per=batch_size)
+    for row in session.execute(stmt):
+        yield tuple(row)
+
+
+def iter_decisions(session, batch_size: int = 1000, **filters) -> Iterator[Dict[str, Any]]:
+    """Every matching decision in ``list_decisions`` order, fetched ``batch_size`` rows at a time."""
+    for row in _iter_rows(session, batch_size, **filters):
+        yield _row(row)
+
+
+def export_decisions(session, fh: IO[str], fmt: str = "csv", batch_size: int = 1000, limit: int | None = None,
+                     **filters) -> int:
+    """Write matching decisions (at most ``limit``) to ``fh`` as ``csv`` or ``jsonl``; returns the row count."""
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(fh)
+        writer.writerow(DECISION_COLUMNS)
+        for row in _iter_rows(session, batch_size, limit, **filters):
+            writer.writerow(row)
+            count += 1
+    elif fmt == "jsonl":
+        for row in _iter_rows(session, batch_size, limit, **filters):
+            fh.write(json.dumps(_row(row), default=str) + "\n")
+            count += 1
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    return count
+
+
+def list_jobs(session, after: int | None = None, limit: int = 20, status: str | None = None,
+              title: str | None = None) -> Tuple[List[Dict[str, Any]], int | None]:
+    """One page of jobs, newest first, with per-category decision counts; ``after`` is the last job id seen."""
+    stmt = select(Job.id, Job.title, Job.status, Job.provider, Job.engine, Job.created_at, Job.finished_at)
+    if after is not None:
+        stmt = stmt.where(Job.id < after)
+    if status:
+        stmt = stmt.where(Job.status == status)
+    if title:
+        stmt = stmt.where(Job.title.ilike(f"%{title}%"))
+    rows = session.execute(stmt.order_by(Job.id.desc()).limit(limit + 1)).all()
+    jobs = [dict(r._mapping) for r in rows[:limit]]
+    counts = job_counts(session, [j["id"] for j in jobs])
+    for j in jobs:
+        j.update(counts.get(j["id"], _empty_counts()))
+    return jobs, (jobs[-1]["id"] if len(rows) > limit else None)
+
+
+def _empty_counts() -> Dict[str, int]:
+    return {"decisions": 0, "A": 0, "B": 0, "C": 0, "errors": 0}
+
+
+def _count_columns():
+    is_error = Decision.decision == "error"
+    return (
+        func.count(Decision.id),
+        *(func.sum(case((and_(_category_clause([cat]), ~is_error), 1), else_=0)) for cat in ("A", "B", "C")),
+        func.sum(case((is_error, 1), else_=0)),
+    )
+
+
+def job_counts(session, job_ids: Sequence[int]) -> Dict[int, Dict[str, int]]:
+    """Decision counts per category for several jobs in one GROUP BY."""
+    if not job_ids:
+        return {}
+    rows = session.execute(
+        select(Decision.job_id, *_count_columns()).where(Decision.job_id.in_(list(job_ids))).group_by(Decision.job_id)
+    ).all()
+    return {job_id: dict(zip(("decisions", "A", "B", "C", "errors"), (int(v or 0) for v in values)))
+            for job_id, *values in rows}
+
+
+def decision_stats(session, **filters) -> Dict[str, Any]:
+    """Counts, score summary and a 10-point score histogram for the matching decisions, all computed in SQL."""
+    where = _decision_filters(**filters)
+    base = select(*_count_columns(), func.avg(Decision.match_score), func.min(Decision.match_score),
+                  func.max(Decision.match_score), func.sum(case((Decision.escalated.is_(True), 1), else_=0)))
+    if filters.get("filename"):
+        base = base.join(Resume, Resume.id == Decision.resume_id)
+    total, a, b, c, errors, avg, lo, hi, escalated = session.execute(base.where(*where)).one()
+    bucket = case((Decision.match_score >= 100, 90), else_=(Decision.match_score // 10) * 10)
+    hist = select(bucket, func.count(Decision.id)).where(Decision.match_score.isnot(None), *where)
+    if filters.get("filename"):
+        hist = hist.join(Resume, Resume.id == Decision.resume_id)
+    histogram = {f"{int(start)}-{int(start) + 9 if start < 90 else 100}": n
+                 for start, n in session.execute(hist.group_by(bucket).order_by(bucket))}
+    return {
+        "decisions": int(total or 0),
+        "A": int(a or 0), "B": int(b or 0), "C": int(c or 0), "errors": int(errors or 0),
+        "avg_score": round(float(avg), 1) if avg is not None else None,
+        "min_score": lo, "max_score": hi,
+        "escalated": int(escalated or 0),
+        "histogram": histogram,
+    }
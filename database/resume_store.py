@@ -0,0 +1,95 @@
+"""Content-addressed resume storage.
+
+Resumes are keyed by the sha256 of their file bytes. An upload whose hash is
+already stored reuses the existing ``Resume`` row and its parsed text, so the
+same CV submitted for many jobs is parsed and stored once. New files are
+parsed in parallel by ``utils.parse_pool``.
+"""
+import hashlib
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import make_transient_to_detached
+
+from utils.parse_pool import parse_files
+from .bulk import insert_resumes
+from .models import Resume
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def find_resumes_by_hash(session, hashes: Sequence[str]) -> Dict[str, Resume]:
+    found: Dict[str, Resume] = {}
+    hashes = list(set(hashes))
+    for i in range(0, len(hashes), 500):
+        rows = session.execute(select(Resume).where(Resume.content_hash.in_(hashes[i:i + 500]))).scalars().all()
+        found.update({r.content_hash: r for r in rows})
+    return found
+
+
+def get_or_create_resumes(
+    session,
+    files: Sequence[Tuple[str, bytes]],
+    parser: Callable[..., List[Dict[str, Any]]] = parse_files,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> Tuple[List[Resume], Dict[str, Any]]:
+    """Return one ``Resume`` per (filename, bytes) input, parsing only unseen content.
+
+    Duplicates within ``files`` and against the database map to the same row.
+    Stats dict has counts parsed, reused (hash already stored), duplicates (repeated
+    in this batch) and failed, plus ``reports``: the parse report of every file parsed.
+    Files that failed transiently (timeout, memory cap) are stored without a hash so
+    the next upload parses them again.
+    """
+    hashes = [content_hash(data) for _, data in files]
+    known = find_resumes_by_hash(session, hashes)
+    stats: Dict[str, Any] = {"parsed": 0, "reused": 0, "duplicates": 0, "failed": 0, "reports": []}
+    to_parse: Dict[str, Tuple[str, bytes]] = {}
+    for (filename, data), digest in zip(files, hashes):
+        if digest in known:
+            stats["reused"] += 1
+        elif digest in to_parse:
+            stats["duplicates"] += 1
+        else:
+            to_parse[digest] = (filename, data)
+
+    new_rows: Dict[str, Dict[str, Any]] = {}
+    if to_parse:
+        reports = parser(list(to_parse.values()), on_progress=on_progress)
+        for digest, report in zip(to_parse, reports):
+            stats["reports"].append({k: v for k, v in report.items() if k != "text"})
+            stats["parsed"] += 1
+            if report.get("error"):
+                stats["failed"] += 1
+            new_rows[digest] = {
+                "filename": report["filename"],
+                "content": report.get("text") or "",
+                "content_hash": None if report.get("retryable") else digest,
+            }
+    elif on_progress:
+        on_progress(len(files), len(files))
+
+    created: Dict[str, Resume] = {}
+    if new_rows:
+        pending = dict(new_rows)
+        try:
+            ids = insert_resumes(session, list(pending.values()))
+            session.commit()
+        except IntegrityError:
+            # Another session stored some of the same files meanwhile; keep theirs and insert the rest.
+            session.rollback()
+            winners = find_resumes_by_hash(session, list(pending))
+            created.update({d: winners[d] for d in pending if d in winners})
+            pending = {d: row for d, row in pending.items() if d not in winners}
+            ids = insert_resumes(session, list(pending.values()))
+            session.commit()
+        for (digest, row), resume_id in zip(pending.items(), ids):
+            # Attach as if loaded: no second INSERT and no reload of the text we already hold
+            resume = Resume(id=resume_id, **row)
+            make_transient_to_detached(resume)
+            session.add(resume)
+            created[digest] = resume
+    return [known.get(d) or created[d] for d in hashes], stats
@@ -0,0 +1,124 @@
+"""Browse past jobs and decisions, and export them, without loading resume text.
+
+Examples:
+    python history.py jobs --status done                            # newest jobs with A/B/C counts
+    python history.py decisions --job-id 42 --category A B --min-score 70
+    python history.py decisions --job-id 42 --after 81,1234         # next page (cursor printed by the last one)
+    python history.py stats --job-id 42 --json
+    python history.py export --job-id 42 --format jsonl --output job42.jsonl
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, List
+
+from database.db_manager import init_db, migrate_schema
+from database.models import Base
+from database.queries import decision_stats, export_decisions, list_decisions, list_jobs
+
+
+def _filters(args) -> Dict[str, Any]:
+    return {
+        "job_id": args.job_id,
+        "categories": args.category,
+        "min_score": args.min_score,
+        "max_score": args.max_score,
+        "decision": args.decision,
+        "filename": args.filename,
+    }
+
+
+def _cursor(value: str | None):
+    if not value:
+        return None
+    score, last_id = value.split(",")
+    return (None if score in ("", "none") else int(score)), int(last_id)
+
+
+def _print_table(rows: List[Dict[str, Any]], columns: List[str]) -> None:
+    if not rows:
+        print("(no rows)")
+        return
+    cells = [[("" if r.get(c) is None else str(r.get(c)))[:60] for c in columns] for r in rows]
+    widths = [max(len(c), *(len(row[i]) for row in cells)) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for row in cells:
+        print("  ".join(v.ljust(w) for v, w in zip(row, widths)))
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Query screening history (keyset pages, SQL aggregates, streamed export).")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    jobs = sub.add_parser("jobs", help="list jobs, newest first")
+    jobs.add_argument("--status", choices=["queued", "running", "done", "cancelled"])
+    jobs.add_argument("--title", help="substring of the job title")
+    jobs.add_argument("--after", type=int, help="last job id of the previous page")
+    jobs.add_argument("--limit", type=int, default=20)
+    jobs.add_argument("--json", action="store_true")
+
+    for name, help_text in (("decisions", "list decisions, best score first"),
+                            ("stats", "counts and score histogram computed in SQL"),
+                            ("export", "stream decisions to CSV or JSON Lines")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--job-id", type=int)
+        p.add_argument("--category", nargs="+", choices=["A", "B", "C", "error"])
+        p.add_argument("--min-score", type=int)
+        p.add_argument("--max-score", type=int)
+        p.add_argument("--decision", choices=["approved", "rejected", "error"])
+        p.add_argument("--filename", help="substring of the resume filename")
+        if name == "decisions":
+            p.add_argument("--after", help="cursor printed by the previous page (score,id)")
+            p.add_argument("--limit", type=int, default=50)
+            p.add_argument("--json", action="store_true")
+        elif name == "stats":
+            p.add_argument("--json", action="store_true")
+        else:
+            p.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+            p.add_argument("--output", help="file to write (default: stdout)")
+            p.add_argument("--batch-size", type=int, default=1000, help="rows fetched per round trip")
+    args = parser.parse_args(argv)
+
+    engine, Session = init_db()
+    Base.metadata.create_all(bind=engine)
+    migrate_schema(engine)
+    session = Session()
+    try:
+        if args.command == "jobs":
+            rows, cursor = list_jobs(session, after=args.after, limit=args.limit, status=args.status, title=args.title)
+            if args.json:
+                print(json.dumps({"jobs": rows, "next": cursor}, default=str, indent=2))
+            else:
+                _print_table(rows, ["id", "title", "status", "provider", "engine", "created_at", "decisions", "A", "B", "C", "errors"])
+                if cursor is not None:
+                    print(f"\nNext page: --after {cursor}")
+        elif args.command == "decisions":
+            rows, cursor = list_decisions(session, after=_cursor(args.after), limit=args.limit, **_filters(args))
+            if args.json:
+                print(json.dumps({"decisions": rows, "next": cursor}, default=str, indent=2))
+            else:
+                _print_table(rows, ["id", "job_id", "filename", "decision", "category", "match_score", "rationale"])
+                if cursor is not None:
+                    print(f"\nNext page: --after {'none' if cursor[0] is None else cursor[0]},{cursor[1]}")
+        elif args.command == "stats":
+            stats = decision_stats(session, **_filters(args))
+            if args.json:
+                print(json.dumps(stats, indent=2))
+            else:
+                for key, value in stats.items():
+                    print(f"{key:<12} {value}")
+        else:
+            fh = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+            try:
+                count = export_decisions(session, fh, fmt=args.format, batch_size=args.batch_size, **_filters(args))
+            finally:
+                if args.output:
+                    fh.close()
+            print(f"Exported {count} decision(s)", file=sys.stderr)
+    finally:
+        session.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,342 @@
+"""Asyncio review engine with per-provider rate limiting and adaptive concurrency.
+
+Drop-in alternative to ``review_resumes``: same inputs, same result dicts,
+same decision cache. Calls go through ``chain.ainvoke`` and are shaped by
+
+* a sliding-window budget per provider (requests/min and tokens/min, shared process-wide),
+* an AIMD concurrency limit that halves on 429s/timeouts and grows by one
+  slot per window of successful calls,
+* retries with exponential backoff and full jitter (honouring Retry-After),
+* the provider's circuit breaker (``llm.resilience``): calls fail fast while it is open.
+"""
+import asyncio
+import queue
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Tuple
+
+from config.settings import settings
+from utils.token_counter import count_tokens
+from .clients import run_on_shared_loop, submit_on_shared_loop
+from .llm_handler import _cache_lookup, _cache_store, _chain_model_info, _decision_result, _error_result, _record_review
+from .prompts import SYSTEM_PROMPT
+from .resilience import CircuitOpenError, get_provider_health
+from .usage_tracker import current_usage_context, record_cache_hits
+
+
+class RateWindow:
+    """Thread-safe sliding-window budget: at most ``limit`` units in any ``window`` seconds.
+
+    ``reserve`` always succeeds: it books the capacity at the earliest moment the
+    window allows (never before earlier bookings, so callers are served in order)
+    and returns how long the caller must wait before using it, so it works from
+    any thread or event loop. Unlike a token bucket, a burst cannot borrow from the
+    next window: the limit holds over every window, not just on average.
+    """
+
+    def __init__(self, limit: float, window: float = 60.0):
+        self.limit = float(limit)
+        self.window = float(window)
+        self._booked: deque = deque()  # (start time, amount), in time order
+        self._used = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        if self.limit <= 0:
+            return 0.0
+        amount = min(float(amount), self.limit)
+        with self._lock:
+            now = time.monotonic()
+            at = max(now, self._booked[-1][0]) if self._booked else now
+            while True:
+                # Bookings that left the window before ``at`` no longer count, nor will they for later bookings
+                while self._booked and self._booked[0][0] <= at - self.window:
+                    self._used -= self._booked.popleft()[1]
+                if self._used + amount <= self.limit + 1e-9:
+                    break
+                at = self._booked[0][0] + self.window
+            self._booked.append((at, amount))
+            self._used += amount
+            return at - now
+
+
+class ProviderLimiter:
+    """Requests/min plus tokens/min budget for one provider."""
+
+    def __init__(self, rpm: int, tpm: int, window: float = 60.0):
+        self.requests = RateWindow(rpm, window) if rpm > 0 else None
+        self.tokens = RateWindow(tpm, window) if tpm > 0 else None
+
+    async def acquire(self, tokens: int) -> float:
+        wait = max(
+            self.requests.reserve(1) if self.requests else 0.0,
+            self.tokens.reserve(tokens) if self.tokens else 0.0,
+        )
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+_limiters: Dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+# Concurrency limit learned by previous runs, so the next batch starts where the last one settled
+_learned_limits: Dict[str, float] = {}
+
+
+def get_provider_limiter(provider: str) -> ProviderLimiter:
+    key = (provider or "").lower()
+    with _limiters_lock:
+        if key not in _limiters:
+            rpm = getattr(settings, f"{key}_rpm", 0)
+            tpm = getattr(settings, f"{key}_tpm", 0)
+            _limiters[key] = ProviderLimiter(rpm, tpm)
+        return _limiters[key]
+
+
+class AdaptiveConcurrency:
+    """AIMD gate: at most ``limit`` calls in flight, halved on overload, +1 per window of successes."""
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: int = 32, cooldown: float = 1.0):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.overloads = 0
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self) -> None:
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self) -> None:
+        self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+    def on_overload(self, sent_at: float | None = None) -> None:
+        """Halve the limit once per burst of 429s/timeouts.
+
+        With ``sent_at`` (the failed call's ``time.monotonic()`` start), only calls sent
+        after the last decrease count, i.e. one decrease per round trip; without it,
+        at most one decrease per ``cooldown`` seconds.
+        """
+        self.overloads += 1
+        now = time.monotonic()
+        if sent_at is not None and sent_at < self._last_decrease:
+            return  # sent under the old, higher limit: already accounted for
+        if sent_at is None and now - self._last_decrease < self.cooldown:
+            return
+        self.limit = max(self.minimum, self.limit / 2)
+        self._last_decrease = now
+
+
+def _status_code(exc: BaseException) -> int | None:
+    code = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    if code is None:
+        code = getattr(getattr(exc, "response", None), "status_code", None)
+    try:
+        return int(code) if code is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    if _status_code(exc) == 429:
+        return True
+    name = type(exc).__name__.lower()
+    msg = str(exc).lower()
+    return "ratelimit" in name or "resourceexhausted" in name or "429" in msg or "rate limit" in msg
+
+
+def is_timeout_error(exc: BaseException) -> bool:
+    return isinstance(exc, (asyncio.TimeoutError, TimeoutError)) or "timeout" in type(exc).__name__.lower()
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    code = _status_code(exc)
+    return (
+        is_rate_limit_error(exc)
+        or is_timeout_error(exc)
+        or (code is not None and code >= 500)
+        or "connection" in type(exc).__name__.lower()
+    )
+
+
+def _retry_after(exc: BaseException) -> float | None:
+    value = getattr(exc, "retry_after", None)
+    if value is None:
+        headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+        value = headers.get("retry-after") if hasattr(headers, "get") else None
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+async def aiter_review_resumes(chain, job_desc: str, hr_prompt: str, resumes: Iterable[Tuple[int, str]],
+                               provider_name: str | None = None, use_cache: bool | None = None,
+                               initial_concurrency: int | None = None, max_concurrency: int | None = None,
+                               max_retries: int | None = None, timeout: float | None = None,
+                               limiter: ProviderLimiter | None = None) -> AsyncIterator[Dict[str, Any]]:
+    """Async iterator over results as they complete (cache hits first).
+
+    Closing the iterator (or cancelling the task consuming it) cancels every call
+    still queued or in flight; verdicts yielded so far go to the decision cache.
+    """
+    resumes_list = list(resumes)
+    provider = provider_name or getattr(chain, "__class__", type(chain)).__name__
+    model_name, temperature = _chain_model_info(chain)
+    cache_keys, cached, pending = await asyncio.to_thread(
+        _cache_lookup, job_desc, hr_prompt, resumes_list, provider, model_name, temperature, use_cache
+    )
+    record_cache_hits(cached, provider, model_name, "async", current_usage_context())
+    for result in cached:
+        yield result
+    if not pending:
+        return
+
+    limiter = limiter or get_provider_limiter(provider)
+    max_retries = settings.llm_max_retries if max_retries is None else max_retries
+    timeout = settings.llm_request_timeout if timeout is None else timeout
+    gate = AdaptiveConcurrency(
+        initial=int(_learned_limits.get(provider, initial_concurrency or settings.llm_initial_concurrency)),
+        maximum=max_concurrency or settings.llm_max_concurrency,
+    )
+
+    usage_ctx = current_usage_context()
+    prefix_tokens = count_tokens(f"{SYSTEM_PROMPT}{job_desc}{hr_prompt or ''}")
+    health = get_provider_health(provider)
+
+    async def process_single_resume(resume_id: int, text: str) -> Dict[str, Any]:
+        payload = {
+            "job_description": job_desc,
+            "hr_prompt": hr_prompt or "",
+            "resume_id": resume_id,
+            "resume_text": text,
+        }
+        est_tokens = prefix_tokens + count_tokens(text) + 300  # room for the JSON answer
+        queued = time.perf_counter()
+        started: float | None = None
+        attempt = 0
+        while True:
+            if not health.breaker.allow():
+                health.bump("short_circuited")
+                result = {**_error_result(resume_id, CircuitOpenError(f"{provider}: circuit open after repeated failures")), "retries": attempt}
+                started = started or time.perf_counter()
+                break
+            await limiter.acquire(est_tokens)
+            await gate.acquire()
+            if started is None:
+                started = time.perf_counter()
+            call_started = time.perf_counter()
+            sent_at = time.monotonic()
+            try:
+                out = await asyncio.wait_for(chain.ainvoke(payload), timeout)
+                result = {**_decision_result(resume_id, out), "retries": attempt}
+            except Exception as e:
+                await gate.release()
+                if not is_rate_limit_error(e):  # 429s are throttling, handled by the limiter, not an outage
+                    health.record(time.perf_counter() - call_started, ok=False)
+                if is_rate_limit_error(e) or is_timeout_error(e):
+                    gate.on_overload(sent_at)
+                if attempt >= max_retries or not _is_retryable(e):
+                    result = {**_error_result(resume_id, e), "retries": attempt}
+                    break
+                await asyncio.sleep(max(_retry_after(e) or 0.0, backoff_delay(attempt)))
+                attempt += 1
+                continue
+            except BaseException:  # cancelled: free the slot for other batches
+                await asyncio.shield(gate.release())
+                raise
+            await gate.release()
+            health.record(time.perf_counter() - call_started, ok=True)
+            gate.on_success()
+            break
+        # wall time spans all attempts (including backoff); queue time is the wait before the first one
+        _record_review("async", provider, model_name, result, started, queued, usage_ctx, prefix_tokens, text, retries=attempt)
+        return result
+
+    tasks = [asyncio.ensure_future(process_single_resume(rid, text)) for rid, text in pending]
+    fresh: List[Dict[str, Any]] = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            fresh.append(result)
+            yield result
+    finally:
+        for task in tasks:
+            task.cancel()
+        _learned_limits[provider] = gate.limit
+        await asyncio.shield(asyncio.to_thread(_cache_store, cache_keys, list(fresh), provider, model_name))
+
+
+async def areview_resumes(chain, job_desc: str, hr_prompt: str, resumes: Iterable[Tuple[int, str]],
+                          **kwargs) -> List[Dict[str, Any]]:
+    """Async counterpart of ``review_resumes``; results carry an extra ``retries`` count.
+
+    Keyword arguments are those of ``aiter_review_resumes`` (limits, retries, timeout, limiter).
+    """
+    results = [r async for r in aiter_review_resumes(chain, job_desc, hr_prompt, resumes, **kwargs)]
+    results.sort(key=lambda x: x["resume_id"])
+    return results
+
+
+def review_resumes_async(chain, job_desc: str, hr_prompt: str, resumes: Iterable[Tuple[int, str]], **kwargs):
+    """Blocking wrapper around ``areview_resumes`` for sync callers such as the Streamlit app.
+
+    Runs on the process-wide event loop so the shared async HTTP pools stay bound
+    to one loop (and keep their connections) across batches.
+    """
+    return run_on_shared_loop(areview_resumes(chain, job_desc, hr_prompt, resumes, **kwargs))
+
+
+_END = object()
+
+
+def iter_review_resumes_async(chain, job_desc: str, hr_prompt: str, resumes: Iterable[Tuple[int, str]],
+                              cancel_event: threading.Event | None = None, **kwargs) -> Iterator[Dict[str, Any]]:
+    """Sync generator over ``aiter_review_resumes`` for callers such as the Streamlit app.
+
+    Setting ``cancel_event`` or closing the generator cancels the remaining calls.
+    """
+    out: "queue.Queue[Any]" = queue.Queue()
+
+    async def pump() -> None:
+        try:
+            async for result in aiter_review_resumes(chain, job_desc, hr_prompt, resumes, **kwargs):
+                out.put(result)
+        except BaseException as e:
+            out.put(e)
+            raise
+        finally:
+            out.put(_END)
+
+    future = submit_on_shared_loop(pump())
+    try:
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            try:
+                item = out.get(timeout=0.25)
+            except queue.Empty:
+                continue
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        future.cancel()
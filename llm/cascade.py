@@ -0,0 +1,179 @@
+"""Two-tier review cascade: a cheap model screens every resume, the strong model sees only close calls.
+
+Most resumes are clear A or C cases that a small model judges as well as a
+large one. The screening tier (``CASCADE_SCREEN_PROVIDER`` /
+``CASCADE_SCREEN_MODEL``, by default the review provider's cheaper model)
+reviews everything. Its verdicts are yielded as they complete unless they
+need escalation: category B, a ``match_score`` inside
+[``CASCADE_BAND_LOW``, ``CASCADE_BAND_HIGH``], or a failed screening call.
+Each of those goes to the normal reviewer chain as soon as its screening
+call returns, so the strong model works while screening continues.
+Screening calls are hedged only to ``CASCADE_SCREEN_HEDGE_PROVIDER``, never
+to the review tier's hedge provider.
+
+Every result carries ``escalated`` and the screening verdict under
+``screen``, so both verdicts are stored on the ``Decision``. When both tiers
+resolve to the same model the run is a plain review; its results carry
+``single_tier`` instead, and ``cascade_stats`` reports it.
+"""
+import contextvars
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from sqlalchemy import case, func, select
+
+from config.settings import settings
+from database.models import Decision
+from .llm_handler import (
+    MODEL_NAMES,
+    SCREEN_MODEL_NAMES,
+    _chain_model_info,
+    _completed,
+    get_reviewer_chain,
+    iter_review_resumes,
+)
+
+_SCREEN_FIELDS = ("decision", "category", "match_score", "rationale")
+
+
+def needs_escalation(result: Dict[str, Any], band: Tuple[int, int]) -> bool:
+    if result.get("decision") == "error" or result.get("category") == "B":
+        return True
+    score = result.get("match_score")
+    return score is not None and band[0] <= score <= band[1]
+
+
+def get_screen_chain(provider: str, temperature: float = 0.2) -> Tuple[Any, str]:
+    """(chain, provider) for the screening tier of a run whose strong model is ``provider``'s default."""
+    screen_provider = settings.cascade_screen_provider or provider
+    model = settings.cascade_screen_model or SCREEN_MODEL_NAMES[screen_provider]
+    return get_reviewer_chain(provider=screen_provider, temperature=temperature, model=model), screen_provider
+
+
+def is_single_tier(provider: str, screen_provider: str | None = None, screen_model: str | None = None) -> bool:
+    """Whether a cascade over ``provider``'s default model would screen with that same model."""
+    screen_provider = screen_provider or settings.cascade_screen_provider or provider
+    screen_model = screen_model or settings.cascade_screen_model or SCREEN_MODEL_NAMES.get(screen_provider)
+    return screen_provider == provider and screen_model == MODEL_NAMES.get(provider)
+
+
+def iter_review_resumes_cascade(chain, job_desc: str, hr_prompt: str, resumes: Iterable[Tuple[int, str]],
+                                screen_chain=None, screen_provider: str | None = None,
+                                band: Tuple[int, int] | None = None, max_workers: int = 5,
+                                provider_name: str | None = None, use_cache: bool | None = None,
+                                cancel_event: threading.Event | None = None,
+                                hedge_provider: str | None = None) -> Iterator[Dict[str, Any]]:
+    """Yield cascade results as they complete: settled screening verdicts and the strong model's escalations.
+
+    ``chain`` is the strong reviewer; ``screen_chain`` defaults to ``get_screen_chain``.
+    When both tiers would use the same model, this is a plain single-tier review.
+    """
+    resumes_list = list(resumes)
+    band = band or (settings.cascade_band_low, settings.cascade_band_high)
+    if screen_chain is None:
+        screen_chain, screen_provider = get_screen_chain(provider_name or settings.default_llm_provider,
+                                                         _chain_model_info(chain)[1] or 0.2)
+    screen_provider = screen_provider or provider_name
+    screen_model = _chain_model_info(screen_chain)[0]
+    if screen_provider == provider_name and screen_model is not None and screen_model == _chain_model_info(chain)[0]:
+        print(f"[cascade] Warning: screening model {screen_model} is the review model; running a single tier")
+        for result in iter_review_resumes(chain, job_desc, hr_prompt, resumes_list, max_workers=max_workers,
+                                          provider_name=provider_name, use_cache=use_cache, cancel_event=cancel_event,
+                                          hedge_provider=hedge_provider):
+            yield {**result, "single_tier": True}
+        return
+
+    texts = dict(resumes_list)
+
+    def escalate(resume_id: int, screen: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [{**result, "escalated": True, "screen": screen}
+                for result in iter_review_resumes(chain, job_desc, hr_prompt, [(resume_id, texts[resume_id])],
+                                                  max_workers=1, provider_name=provider_name, use_cache=use_cache,
+                                                  cancel_event=cancel_event, hedge_provider=hedge_provider)]
+
+    # Escalations start while screening is still running; finished ones are yielded between screening results
+    strong = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cascade-strong")
+    escalations: List[Future] = []
+    try:
+        for result in iter_review_resumes(screen_chain, job_desc, hr_prompt, resumes_list, max_workers=max_workers,
+                                          provider_name=screen_provider, use_cache=use_cache, cancel_event=cancel_event,
+                                          hedge_provider=settings.cascade_screen_hedge_provider):
+            screen = {k: result.get(k) for k in _SCREEN_FIELDS}
+            screen["model"] = screen_model
+            if needs_escalation(result, band):
+                escalations.append(strong.submit(contextvars.copy_context().run, escalate, result["resume_id"], screen))
+            else:
+                yield {**result, "escalated": False, "screen": screen}
+            for fut in [f for f in escalations if f.done()]:
+                escalations.remove(fut)
+                yield from fut.result()
+        for fut in _completed(escalations, cancel_event):
+            yield from fut.result()
+    finally:
+        strong.shutdown(wait=False, cancel_futures=True)
+
+
+def review_resumes_cascade(chain, job_desc: str, hr_prompt: str, resumes: Iterable[Tuple[int, str]], **kwargs) -> List[Dict[str, Any]]:
+    """List form of ``iter_review_resumes_cascade``, sorted by resume id."""
+    results = list(iter_review_resumes_cascade(chain, job_desc, hr_prompt, resumes, **kwargs))
+    results.sort(key=lambda x: x["resume_id"])
+    return results
+
+
+def cascade_stats(results: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Escalation rate and tier agreement for a batch of cascade results.
+
+    ``single_tier`` is True when the run fell back to one model because both tiers were the same.
+    """
+    total = escalated = compared = agreed = single = 0
+    flips: Counter = Counter()
+    for r in results:
+        single += int(bool(r.get("single_tier")))
+        screen = r.get("screen")
+        if screen is None:
+            continue
+        total += 1
+        if not r.get("escalated"):
+            continue
+        escalated += 1
+        if screen.get("category") and r.get("category"):
+            compared += 1
+            agreed += int(screen["category"] == r["category"])
+            flips[f"{screen['category']}->{r['category']}"] += 1
+    return {
+        "screened": total,
+        "escalated": escalated,
+        "escalation_rate": round(escalated / total, 3) if total else None,
+        "agreement": round(agreed / compared, 3) if compared else None,
+        "category_changes": dict(flips),
+        "single_tier": bool(single) and not total,
+    }
+
+
+def job_cascade_stats(session, job_id: int) -> Dict[str, Any]:
+    """``cascade_stats`` for a stored job, computed in SQL from the Decision columns."""
+    escalated = Decision.escalated.is_(True)
+    comparable = escalated & Decision.screen_category.isnot(None) & Decision.category.isnot(None)
+    row = session.execute(
+        select(
+            func.count(Decision.id),
+            func.sum(case((escalated, 1), else_=0)),
+            func.sum(case((comparable, 1), else_=0)),
+            func.sum(case((comparable & (Decision.screen_category == Decision.category), 1), else_=0)),
+        ).where(Decision.job_id == job_id, Decision.escalated.isnot(None))
+    ).one()
+    total, n_escalated, compared, agreed = (int(v or 0) for v in row)
+    flips = session.execute(
+        select(Decision.screen_category, Decision.category, func.count())
+        .where(Decision.job_id == job_id, escalated)
+        .group_by(Decision.screen_category, Decision.category)
+    ).all()
+    return {
+        "screened": total,
+        "escalated": n_escalated,
+        "escalation_rate": round(n_escalated / total, 3) if total else None,
+        "agreement": round(agreed / compared, 3) if compared else None,
+        "category_changes": {f"{a}->{b}": n for a, b, n in flips if a and b},
+    }
@@ -0,0 +1,208 @@
+"""Process-wide registry of provider clients and shared HTTP connection pools.
+
+Chat models are built once per (provider, model, temperature) and reused by
+every thread, Streamlit session and CLI run in the process. OpenAI and
+Anthropic models send their requests through one keep-alive ``httpx`` pool
+per provider, so TLS handshakes are paid once rather than per call.
+
+Async clients are bound to the event loop they first run on, so all async
+reviews run on one long-lived background loop (``run_on_shared_loop``)
+instead of a fresh ``asyncio.run`` loop per batch.
+"""
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Coroutine, Dict, Tuple
+
+import httpx
+
+from config.settings import settings
+
+_lock = threading.RLock()
+_models: Dict[Tuple[str, str, float], Dict[str, Any]] = {}
+_http_clients: Dict[str, httpx.Client] = {}
+_async_http_clients: Dict[str, httpx.AsyncClient] = {}
+_request_counts: Dict[str, int] = {}
+# One GenerativeModel per cached JD prefix: keep the most recently used ones only
+_GEMINI_MAX_MODELS = 64
+_gemini: Dict[str, Any] = {"configured": False, "models": OrderedDict()}
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive,
+        keepalive_expiry=settings.http_keepalive_expiry,
+    )
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _request_counts[name] = _request_counts.get(name, 0) + 1
+
+
+def get_http_client(provider: str) -> httpx.Client:
+    """Shared sync pool for ``provider``."""
+    with _lock:
+        client = _http_clients.get(provider)
+        if client is None or client.is_closed:
+            client = httpx.Client(
+                limits=_limits(),
+                timeout=settings.llm_request_timeout,
+                event_hooks={"request": [lambda _req: _count(provider)]},
+            )
+            _http_clients[provider] = client
+        return client
+
+
+def get_async_http_client(provider: str) -> httpx.AsyncClient:
+    """Shared async pool for ``provider``; only use it from ``run_on_shared_loop``."""
+    async def hook(_req):
+        _count(f"{provider}:async")
+
+    with _lock:
+        client = _async_http_clients.get(provider)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(limits=_limits(), timeout=settings.llm_request_timeout,
+                                       event_hooks={"request": [hook]})
+            _async_http_clients[provider] = client
+        return client
+
+
+def get_or_create_model(provider: str, model: str, temperature: float, factory: Callable[[], Any]) -> Any:
+    """Return the cached chat model for this key, building it with ``factory`` on first use."""
+    key = (provider, model, round(float(temperature), 4))
+    with _lock:
+        entry = _models.get(key)
+        if entry is None:
+            entry = {"model": factory(), "created_at": time.time(), "hits": 0}
+            _models[key] = entry
+        else:
+            entry["hits"] += 1
+        return entry["model"]
+
+
+def get_gemini_model(genai, model_name: str, cached_content: Any = None):
+    """``genai.configure`` once per process and one ``GenerativeModel`` per model / cached prefix (LRU-bounded)."""
+    key = f"{model_name}|{getattr(cached_content, 'name', '')}"
+    with _lock:
+        if not _gemini["configured"]:
+            genai.configure(api_key=settings.google_api_key)
+            _gemini["configured"] = True
+        models = _gemini["models"]
+        model = models.get(key)
+        if model is not None:
+            models.move_to_end(key)
+            return model
+        if cached_content is not None:
+            model = genai.GenerativeModel.from_cached_content(cached_content=cached_content)
+        else:
+            model = genai.GenerativeModel(model_name)
+        models[key] = model
+        while len(models) > _GEMINI_MAX_MODELS:
+            models.popitem(last=False)
+        return model
+
+
+def _pool_info(client: httpx.Client | httpx.AsyncClient) -> Dict[str, Any]:
+    # httpx exposes no public pool API; read the httpcore pool best-effort
+    try:
+        conns = list(client._transport._pool.connections)  # type: ignore[attr-defined]
+    except Exception:
+        return {}
+    idle = sum(1 for c in conns if c.is_idle())
+    return {"connections": len(conns), "idle": idle, "active": len(conns) - idle}
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Cached models (with reuse counts) and per-provider HTTP pool state."""
+    with _lock:
+        models = {
+            f"{p}/{m}/{t}": {"hits": e["hits"], "age_s": round(time.time() - e["created_at"], 1)}
+            for (p, m, t), e in _models.items()
+        }
+        http = {}
+        for name, client in list(_http_clients.items()) + [(f"{n}:async", c) for n, c in _async_http_clients.items()]:
+            http[name] = {"requests": _request_counts.get(name, 0), "closed": client.is_closed, **_pool_info(client)}
+        return {
+            "models": models,
+            "http": http,
+            "gemini_models": len(_gemini["models"]),
+            "limits": {
+                "max_connections": settings.http_max_connections,
+                "max_keepalive": settings.http_max_keepalive,
+                "keepalive_expiry": settings.http_keepalive_expiry,
+            },
+        }
+
+
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+
+def _shared_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="llm-event-loop", daemon=True).start()
+        return _loop
+
+
+def submit_on_shared_loop(coro: Coroutine[Any, Any, Any]) -> concurrent.futures.Future:
+    """Schedule ``coro`` on the process-wide event loop; cancelling the returned future cancels the task.
+
+    The caller's context variables (e.g. ``usage_context``) are carried over.
+    """
+    loop = _shared_loop()
+    ctx = contextvars.copy_context()
+    fut: concurrent.futures.Future = concurrent.futures.Future()
+
+    def start() -> None:
+        if fut.cancelled():
+            coro.close()
+            return
+        task = loop.create_task(coro, context=ctx)
+
+        def done(t: asyncio.Task) -> None:
+            if fut.cancelled():
+                return
+            if t.cancelled():
+                fut.cancel()
+            elif t.exception() is not None:
+                fut.set_exception(t.exception())
+            else:
+                fut.set_result(t.result())
+
+        task.add_done_callback(done)
+        fut.add_done_callback(lambda f: f.cancelled() and loop.call_soon_threadsafe(task.cancel))
+
+    loop.call_soon_threadsafe(start)
+    return fut
+
+
+def run_on_shared_loop(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run ``coro`` on the process-wide event loop and block for its result.
+
+    Must not be called from the shared loop itself.
+    """
+    return submit_on_shared_loop(coro).result()
+
+
+def close_clients() -> None:
+    """Drop cached models and close the shared pools (tests, or after a key rotation)."""
+    with _lock:
+        _models.clear()
+        _gemini["models"].clear()
+        _gemini["configured"] = False
+        for client in _http_clients.values():
+            client.close()
+        _http_clients.clear()
+        async_clients = list(_async_http_clients.values())
+        _async_http_clients.clear()
+    if async_clients and _loop is not None and not _loop.is_closed():
+        for client in async_clients:
+            asyncio.run_coroutine_threadsafe(client.aclose(), _loop).result(timeout=10)
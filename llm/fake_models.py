@@ -0,0 +1,177 @@
+"""Offline stand-in for the provider chat models (``provider="fake"``).
+
+``FakeChatModel`` behaves like a LangChain chat model (sync and async) and
+answers with a deterministic JSON verdict derived from the resume text;
+packed prompts get one verdict per ``Resume (id=N)`` header. It can inject
+latency, jitter, stragglers, hung calls, outages, simulated HTTP 429s and
+generic failures, so the review engines, hedging and the benchmarks run
+without API keys or network access. ``get_model("fake")`` builds one from
+the ``FAKE_LLM_*`` settings.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+
+class FakeRateLimitError(Exception):
+    """Mimics the provider SDK rate-limit errors (HTTP 429), optionally with a Retry-After hint."""
+    status_code = 429
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class FakeProviderError(Exception):
+    status_code = 500
+
+
+_RESUME_RE = re.compile(r"Resume \(id=(\d+)\):\n(.*?)(?=\n\nResume \(id=\d+\):|\n\nReturn JSON only|\Z)", re.S)
+
+
+def fake_verdict(resume_id: int, resume_text: str) -> dict:
+    """Deterministic pseudo-verdict: the score is a stable hash of the resume text."""
+    score = int(hashlib.sha256(resume_text.encode("utf-8")).hexdigest()[:8], 16) % 101
+    category = "A" if score >= 80 else "B" if score >= 50 else "C"
+    return {
+        "decision": "approved" if category == "A" else "rejected",
+        "category": category,
+        "match_score": score,
+        "rationale": f"Synthetic verdict for resume {resume_id}.",
+    }
+
+
+class FakeChatModel(BaseChatModel):
+    model_name: str = "fake-reviewer"
+    temperature: float | None = 0.0
+    latency: float = 0.0  # seconds per call
+    jitter: float = 0.0  # +/- uniform seconds added to latency
+    rate_limit_rate: float = 0.0  # probability of raising FakeRateLimitError
+    error_rate: float = 0.0  # probability of raising FakeProviderError
+    straggle_rate: float = 0.0  # probability of a call taking ``straggle`` seconds longer
+    straggle: float = 3.0
+    hang_rate: float = 0.0  # probability of a call blocking until ``release_hung()`` (or ``hang`` seconds)
+    hang: float = 600.0
+    fail_after: int | None = None  # every call after the first N fails (an outage)
+    max_concurrency: int | None = None  # calls beyond this many in flight get a 429
+    retry_after: float | None = None  # Retry-After seconds sent with each 429
+    seed: int | None = None
+
+    _rng: Any = PrivateAttr(default=None)
+    _lock: Any = PrivateAttr(default=None)
+    _release: Any = PrivateAttr(default=None)
+    _in_flight: int = PrivateAttr(default=0)
+    calls: int = 0
+    rate_limited: int = 0
+    failures: int = 0
+    peak_in_flight: int = 0
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+        self._release = threading.Event()
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-reviewer"
+
+    def release_hung(self) -> None:
+        """Let every hung call return (with an error), e.g. before the process exits."""
+        self._release.set()
+
+    def _enter(self) -> Tuple[float, str | None]:
+        """Count the call and draw its fate: (delay in seconds, "fail" / "hang" / None)."""
+        with self._lock:
+            self.calls += 1
+            self._in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+            over_limit = self.max_concurrency is not None and self._in_flight > self.max_concurrency
+            outage = self.fail_after is not None and self.calls > self.fail_after
+            roll = self._rng.random()
+            offset = self._rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        delay = max(0.0, self.latency + offset)
+        if over_limit or roll < self.rate_limit_rate:
+            self._exit(rate_limited=True)
+            raise FakeRateLimitError("429 Too Many Requests (simulated)", retry_after=self.retry_after)
+        roll -= self.rate_limit_rate
+        if outage or roll < self.error_rate:
+            return delay / 4, "fail"  # errors come back faster than answers
+        roll -= self.error_rate
+        if roll < self.hang_rate:
+            return self.hang, "hang"
+        if roll - self.hang_rate < self.straggle_rate:
+            delay += self.straggle
+        return delay, None
+
+    def _finish(self, fate: str | None, messages: List[BaseMessage]) -> ChatResult:
+        if fate == "hang":
+            raise FakeProviderError("503 Service Unavailable (simulated hung connection)")
+        if fate == "fail":
+            raise FakeProviderError("500 Internal Server Error (simulated)")
+        return self._respond(messages)
+
+    def _exit(self, rate_limited: bool = False, failed: bool = False) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self.rate_limited += int(rate_limited)
+            self.failures += int(failed)
+
+    def _respond(self, messages: List[BaseMessage]) -> ChatResult:
+        text = "\n".join(m.content if isinstance(m.content, str) else json.dumps(m.content) for m in messages)
+        # Packed prompts carry several resumes; answer each of them
+        found = _RESUME_RE.findall(text)
+        if len(found) > 1 or (found and "JSON array" in text):
+            content = json.dumps([{"resume_id": int(rid), **fake_verdict(int(rid), body)} for rid, body in found])
+        elif found:
+            rid, body = found[0]
+            content = json.dumps(fake_verdict(int(rid), body))
+        else:
+            content = json.dumps(fake_verdict(0, text))
+        prompt_tokens = max(1, len(text) // 4)
+        completion_tokens = max(1, len(content) // 4)
+        message = AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        delay, fate = self._enter()
+        try:
+            if fate == "hang":
+                self._release.wait(delay)
+            else:
+                time.sleep(delay)
+        finally:
+            self._exit(failed=fate is not None)
+        return self._finish(fate, messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        delay, fate = self._enter()
+        try:
+            if fate == "hang":
+                deadline = time.monotonic() + delay
+                while not self._release.is_set() and time.monotonic() < deadline:
+                    await asyncio.sleep(0.05)
+            else:
+                await asyncio.sleep(delay)
+        finally:
+            self._exit(failed=fate is not None)
+        return self._finish(fate, messages)
@@ -1,21 +1,71 @@
 import json
-from typing import Iterable, List, Tuple, Dict, Any
-from database.db_manager import init_db, migrate_schema
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+import threading
+from typing import Iterable, Iterator, List, Tuple, Dict, Any
+from database.db_manager import init_db
+from database.decision_cache import (
+    ensure_cache_table,
+    evict_decisions,
+    get_cached_decisions,
+    make_cache_key,
+    store_decisions,
+)
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from config.settings import settings
+from utils.token_counter import count_tokens
+from functools import partial
+from langchain_core.messages import BaseMessage
 from langchain_core.output_parsers import StrOutputParser
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
-from langchain_google_genai import ChatGoogleGenerativeAI
-from .prompts import prompt, SYSTEM_PROMPT
+from langchain_core.runnables import RunnableLambda
+from .clients import get_async_http_client, get_gemini_model, get_http_client, get_or_create_model
+from .prompt_cache import (
+    build_batch_review_messages,
+    build_review_messages,
+    extract_usage,
+    gemini_usage,
+    get_gemini_cached_content,
+)
+from .resilience import call_with_hedging
+from .usage_tracker import current_usage_context, record_cache_hits, record_call
+from .prompts import (
+    BATCH_PROMPT_VERSION,
+    BATCH_SYSTEM_PROMPT,
+    HUMAN_PREFIX,
+    HUMAN_SUFFIX,
+    PROMPT_VERSION,
+    SYSTEM_PROMPT,
+    batch_prompt,
+    format_resumes_block,
+    prompt,
+)
 
-try:  # Optional import; only needed for direct usage metadata
-    import google.generativeai as genai
-except ImportError:  # pragma: no cover - environment without google lib
-    genai = None  # type: ignore
+# Provider SDKs are imported on first use of that provider; each costs hundreds of ms
+# of import time that the app and CLIs should not pay for providers they never call.
+_genai: Any = None
+_genai_loaded = False
 
 
-def _to_json_decision(text: str) -> Tuple[str, str, str | None, int | None]:
+def _load_genai():
+    """google.generativeai, or None when it is not installed (optional: direct usage metadata)."""
+    global _genai, _genai_loaded
+    if not _genai_loaded:
+        _genai_loaded = True
+        try:
+            import google.generativeai as genai
+            _genai = genai
+        except ImportError:  # pragma: no cover - environment without google lib
+            _genai = None
+    return _genai
+
+GEMINI_MODEL = "gemini-2.5-pro"
+
+
+class InvalidModelOutput(ValueError):
+    """The model answered, but not with a parsable decision."""
+
+
+def _to_json_decision(text: str, strict: bool = False) -> Tuple[str, str, str | None, int | None]:
+    """Parse a decision; unparsable output becomes a rejection, or raises ``InvalidModelOutput`` when ``strict``."""
     # Try to extract JSON from text
     try:
         data = json.loads(text)
@@ -27,10 +77,22 @@ def _to_json_decision(text: str) -> Tuple[str, str, str | None, int | None]:
             try:
                 data = json.loads(text[start:end+1])
             except Exception:
+                if strict:
+                    raise InvalidModelOutput("Invalid JSON from model")
                 data = {"decision": "rejected", "rationale": "Invalid JSON from model"}
         else:
+            if strict:
+                raise InvalidModelOutput("No JSON found in model output")
             data = {"decision": "rejected", "rationale": "No JSON found in model output"}
+    if not isinstance(data, dict):
+        if strict:
+            raise InvalidModelOutput("Model output is not a JSON object")
+        data = {"decision": "rejected", "rationale": "Model output is not a JSON object"}
+
+    return _normalize_decision(data)
 
+
+def _normalize_decision(data: Dict[str, Any]) -> Tuple[str, str, str | None, int | None]:
     decision = str(data.get("decision", "rejected")).lower()
     if decision not in ("approved", "rejected"):
         decision = "rejected"
@@ -52,139 +114,530 @@ def _to_json_decision(text: str) -> Tuple[str, str, str | None, int | None]:
     return decision, rationale, category, match_score
 
 
-def get_model(provider: str, temperature: float = 0.2):
-    provider = provider or settings.default_llm_provider
+def _to_json_decisions(text: str) -> Dict[int, Tuple[str, str, str | None, int | None]]:
+    """Parse a packed (multi-resume) answer into {resume_id: decision tuple}.
+
+    Accepts a bare JSON array, an object wrapping one (e.g. {"results": [...]}),
+    an array buried in prose or code fences, or as a last resort any standalone
+    objects carrying a resume_id. Entries without a usable resume_id are dropped,
+    so callers can detect missing resumes and retry them individually.
+    """
+    items: List[Any] = []
+    data: Any = None
+    try:
+        data = json.loads(text)
+    except Exception:
+        start = text.find('[')
+        end = text.rfind(']')
+        if start != -1 and end > start:
+            try:
+                data = json.loads(text[start:end+1])
+            except Exception:
+                data = None
+    if isinstance(data, dict):
+        nested = next((v for v in data.values() if isinstance(v, list) and v and all(isinstance(x, dict) for x in v)), None)
+        data = nested if nested is not None else [data]
+    if isinstance(data, list):
+        items = data
+    else:
+        # Salvage whatever complete objects the model did emit (e.g. truncated output)
+        decoder = json.JSONDecoder()
+        pos = text.find('{')
+        while pos != -1:
+            try:
+                obj, end = decoder.raw_decode(text, pos)
+            except ValueError:
+                pos = text.find('{', pos + 1)
+                continue
+            items.append(obj)
+            pos = text.find('{', end)
+
+    decisions: Dict[int, Tuple[str, str, str | None, int | None]] = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        try:
+            resume_id = int(item.get("resume_id"))
+        except (TypeError, ValueError):
+            continue
+        decisions.setdefault(resume_id, _normalize_decision(item))
+    return decisions
+
+
+OPENAI_MODEL = "gpt-4o-mini"
+ANTHROPIC_MODEL = "claude-3-5-sonnet-20240620"
+
+
+def _build_model(provider: str, temperature: float, model: str):
+    if provider == "fake":
+        from .fake_models import FakeChatModel
+        return FakeChatModel(model_name=model, temperature=temperature, latency=settings.fake_llm_latency_ms / 1000,
+                             jitter=settings.fake_llm_jitter_ms / 1000, error_rate=settings.fake_llm_error_rate)
     if provider == "openai":
-        if not settings.openai_api_key:
-            raise RuntimeError("OPENAI_API_KEY is not set")
-        return ChatOpenAI(model="gpt-4o-mini", temperature=temperature, api_key=settings.openai_api_key)
-    elif provider == "anthropic":
-        if not settings.anthropic_api_key:
-            raise RuntimeError("ANTHROPIC_API_KEY is not set")
-        return ChatAnthropic(model="claude-3-5-sonnet-20240620", temperature=temperature, api_key=settings.anthropic_api_key)
-    elif provider == "google":
-        if not settings.google_api_key:
-            raise RuntimeError("GOOGLE_API_KEY is not set")
-        # Use a broadly supported model to avoid v1beta 404s on some client versions
-        return ChatGoogleGenerativeAI(
-            model="gemini-2.5-pro",
-            api_key=settings.google_api_key,
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(
+            model=model,
             temperature=temperature,
+            api_key=settings.openai_api_key,
+            timeout=settings.llm_request_timeout,
+            http_client=get_http_client("openai"),
+            http_async_client=get_async_http_client("openai"),
         )
-    else:
+    elif provider == "anthropic":
+        from langchain_anthropic import ChatAnthropic
+        # Beta header enables cache_control blocks on this model/SDK generation
+        headers = {"anthropic-beta": "prompt-caching-2024-07-31"} if settings.prompt_cache_enabled else None
+        llm = ChatAnthropic(model=model, temperature=temperature, api_key=settings.anthropic_api_key, default_headers=headers,
+                            default_request_timeout=settings.llm_request_timeout)
+        # ChatAnthropic takes no http_client argument; point its SDK clients at the shared pools
+        try:
+            llm._client = llm._client.with_options(http_client=get_http_client("anthropic"))
+            llm._async_client = llm._async_client.with_options(http_client=get_async_http_client("anthropic"))
+        except Exception as e:
+            print(f"[llm_handler] Warning: could not share the Anthropic connection pool: {e}")
+        return llm
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    # Use a broadly supported model to avoid v1beta 404s on some client versions
+    return ChatGoogleGenerativeAI(
+        model=model,
+        api_key=settings.google_api_key,
+        temperature=temperature,
+        timeout=settings.llm_request_timeout,
+    )
+
+
+# Default model per provider, and the cheaper model the cascade engine screens with
+# ("fake" is the offline stand-in in llm/fake_models.py, for benchmarks and local runs)
+MODEL_NAMES = {"openai": OPENAI_MODEL, "anthropic": ANTHROPIC_MODEL, "google": GEMINI_MODEL, "fake": "fake-reviewer"}
+SCREEN_MODEL_NAMES = {"openai": settings.openai_screen_model, "anthropic": "claude-3-haiku-20240307", "google": "gemini-2.5-flash",
+                      "fake": "fake-screener"}
+
+
+def get_model(provider: str, temperature: float = 0.2, model: str | None = None):
+    """Chat model for ``provider`` (its default model unless ``model`` is given), created once and shared."""
+    provider = provider or settings.default_llm_provider
+    if provider not in MODEL_NAMES:
         raise ValueError(f"Unknown provider: {provider}")
+    if provider != "fake" and not getattr(settings, f"{provider}_api_key"):
+        raise RuntimeError(f"{provider.upper()}_API_KEY is not set")
+    model = model or MODEL_NAMES[provider]
+    return get_or_create_model(provider, model, temperature, partial(_build_model, provider, temperature, model))
 
 
-def get_reviewer_chain(provider: str, temperature: float = 0.2):
-    llm = get_model(provider, temperature)
+def get_reviewer_chain(provider: str, temperature: float = 0.2, prompt_cache: bool | None = None, model: str | None = None):
+    """Single-resume reviewer chain.
+
+    With prompt caching (default, see PROMPT_CACHE_ENABLED) the chain builds a
+    cache-friendly message layout and returns the AIMessage so token usage,
+    including cached input tokens, reaches the caller. Without it the chain
+    returns plain text. Review functions accept either.
+    """
+    llm = get_model(provider, temperature, model=model)
+    if settings.prompt_cache_enabled if prompt_cache is None else prompt_cache:
+        return RunnableLambda(partial(build_review_messages, provider=provider)) | llm
     # NOTE: Using StrOutputParser means we lose provider native response metadata.
     # For Google token usage we call the native SDK separately (see below).
     chain = prompt | llm | StrOutputParser()
     return chain
 
 
-def _log_usage(*_args, **_kwargs):
-    # Token usage tracking removed from system.
-    return None
+def get_batch_reviewer_chain(provider: str, temperature: float = 0.2, prompt_cache: bool | None = None):
+    """Chain for packed reviews: several resumes per call sharing one JD prefix."""
+    llm = get_model(provider, temperature)
+    if settings.prompt_cache_enabled if prompt_cache is None else prompt_cache:
+        return RunnableLambda(partial(build_batch_review_messages, provider=provider)) | llm
+    return batch_prompt | llm | StrOutputParser()
+
+
+def _output_text_and_usage(out: Any) -> Tuple[str, Dict[str, int] | None]:
+    """Text and normalised usage from a chain result (plain string or AIMessage)."""
+    if isinstance(out, BaseMessage):
+        content = out.content
+        if isinstance(content, list):
+            content = "".join(b.get("text", "") if isinstance(b, dict) else str(b) for b in content)
+        return str(content), extract_usage(out)
+    return str(out), None
+
+
+def _chain_model_info(chain) -> Tuple[str | None, float | None]:
+    """Best-effort (model name, temperature) of the chat model inside a reviewer chain."""
+    for step in getattr(chain, "steps", None) or [chain]:
+        model = getattr(step, "model_name", None) or getattr(step, "model", None)
+        if isinstance(model, str):
+            return model, getattr(step, "temperature", None)
+    return None, None
+
+
+def _record_review(engine: str, provider: str, model_name: str | None, result: Dict[str, Any], started: float,
+                   queued: float | None, context: Dict[str, Any], prefix_tokens: int, text: str, retries: int = 0) -> None:
+    """Usage row for one single-resume call; tokens are estimated locally if the provider sent none."""
+    if not settings.usage_tracking_enabled:
+        return
+    est = None if result.get("usage") else prefix_tokens + count_tokens(text)
+    record_call(provider, model_name, engine, result, wall_s=time.perf_counter() - started,
+                queue_s=None if queued is None else started - queued, retries=retries, context=context,
+                est_input_tokens=est)
 
 
 def _google_invoke_with_usage(job_desc: str, hr_prompt: str, resume_id: int, resume_text: str) -> Tuple[str, Dict[str, int] | None]:
-    """Call Gemini directly to obtain real usage metadata (prompt/response/total tokens).
+    """Call Gemini directly to obtain real usage metadata (prompt/response/total/cached tokens).
+
+    The system prompt + JD prefix is served from a Gemini CachedContent when the provider accepts one.
 
     Returns tuple (text_output, usage_dict or None).
     """
-    if not genai or not settings.google_api_key:
+    genai = _load_genai() if settings.google_api_key else None
+    if not genai:
         return "", None
     try:
-        genai.configure(api_key=settings.google_api_key)
         # Compose a single text prompt replicating the chat structure.
-        human_section = (
-            f"Job Description:\n{job_desc}\n\n"
-            f"HR Instructions:\n{hr_prompt}\n\n"
-            f"Resume (id={resume_id}):\n{resume_text}\n\n"
-            "Return JSON only with keys decision, category, match_score, rationale."
-        )
-        full_prompt = f"{SYSTEM_PROMPT}\n\n{human_section}"
-        model = genai.GenerativeModel("gemini-2.5-pro")
-        response = model.generate_content(full_prompt)
+        prefix = HUMAN_PREFIX.format(job_description=job_desc, hr_prompt=hr_prompt)
+        suffix = HUMAN_SUFFIX.format(resume_id=resume_id, resume_text=resume_text)
+        cached = get_gemini_cached_content(genai, GEMINI_MODEL, SYSTEM_PROMPT, prefix)
+        # Without a deadline a hung request would keep its (abandoned) call thread forever
+        request_options = {"timeout": settings.llm_request_timeout}
+        if cached is not None:
+            # System prompt + JD live in the server-side cache; only the resume is sent
+            model = get_gemini_model(genai, GEMINI_MODEL, cached)
+            response = model.generate_content(suffix, request_options=request_options)
+        else:
+            full_prompt = f"{SYSTEM_PROMPT}\n\n{prefix}{suffix}"
+            model = get_gemini_model(genai, GEMINI_MODEL)
+            response = model.generate_content(full_prompt, request_options=request_options)
         text_out = getattr(response, "text", "") or ""
-        usage_meta = getattr(response, "usage_metadata", None)
-        if usage_meta:
-            usage = {
-                "prompt_tokens": getattr(usage_meta, "prompt_token_count", None) or usage_meta.get("prompt_token_count"),
-                "response_tokens": getattr(usage_meta, "candidates_token_count", None) or usage_meta.get("candidates_token_count"),
-                "total_tokens": getattr(usage_meta, "total_token_count", None) or usage_meta.get("total_token_count"),
-            }
+        return text_out, gemini_usage(response)
+    except Exception:  # Empty output makes the caller fall back to the LangChain chain
+        return "", None
+
+
+def _decision_result(resume_id: int, out: Any, usage: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    """Result dict for a model answer; raises ``InvalidModelOutput`` if it holds no decision."""
+    text, chain_usage = _output_text_and_usage(out)
+    usage = usage or chain_usage
+    decision, rationale, category, match_score = _to_json_decision(text, strict=True)
+    return {
+        "resume_id": resume_id,
+        "decision": decision,
+        "rationale": rationale,
+        "category": category,
+        "match_score": match_score,
+        "cached": False,
+        **({"usage": usage} if usage else {}),
+    }
+
+
+def _error_result(resume_id: int, exc: BaseException) -> Dict[str, Any]:
+    """A failed review: stored as decision "error" with no category, never as a rejection."""
+    return {
+        "resume_id": resume_id,
+        "decision": "error",
+        "rationale": f"Error processing resume: {type(exc).__name__}: {exc}",
+        "category": None,
+        "match_score": None,
+        "cached": False,
+        "error": True,
+    }
+
+
+def _cache_lookup(job_desc: str, hr_prompt: str, resumes_list: List[Tuple[int, str]], provider: str,
+                  model_name: str | None, temperature: float | None, use_cache: bool | None,
+                  prompt_version: str = PROMPT_VERSION):
+    """Split resumes into cached results and pending work.
+
+    Returns (cache_keys, cached_results, pending); cache_keys is empty when the cache is disabled.
+    """
+    if not settings.decision_cache_enabled or not resumes_list:
+        return {}, [], resumes_list
+    engine, SessionLocal = init_db()
+    ensure_cache_table(engine)
+    cache_keys = {
+        resume_id: make_cache_key(job_desc, hr_prompt or "", text, provider, model_name, temperature, prompt_version)
+        for resume_id, text in resumes_list
+    }
+    if use_cache is not None and not use_cache:
+        return cache_keys, [], resumes_list
+    session = SessionLocal()
+    try:
+        hits = get_cached_decisions(session, cache_keys.values())
+    except Exception as e:  # A broken cache must never block screening
+        print(f"[review_resumes] Decision cache lookup failed: {e}")
+        hits = {}
+    finally:
+        session.close()
+    cached_results: List[Dict[str, Any]] = []
+    pending: List[Tuple[int, str]] = []
+    for resume_id, text in resumes_list:
+        hit = hits.get(cache_keys[resume_id])
+        if hit is not None:
+            cached_results.append({"resume_id": resume_id, **hit, "cached": True})
         else:
-            usage = None
-        return text_out, usage
-    except Exception as e:  # Fallback to no usage on error
-        return f"{{\"decision\": \"rejected\", \"rationale\": \"Gemini error: {str(e)}\"}}", None
+            pending.append((resume_id, text))
+    return cache_keys, cached_results, pending
 
 
-def review_resumes(chain, job_desc: str, hr_prompt: str, resumes: Iterable[Tuple[int, str]], max_workers: int = 5, provider_name: str | None = None):
-    """Review resumes in parallel for faster processing with categorization.
+def _cache_store(cache_keys: Dict[int, str], fresh: List[Dict[str, Any]], provider: str, model_name: str | None) -> None:
+    # Errors are never cached so they get retried next run; neither are answers from a hedge
+    # provider, since the cache key names the primary provider's model
+    to_store = [
+        {**r, "cache_key": cache_keys[r["resume_id"]]}
+        for r in fresh
+        if r["resume_id"] in cache_keys and not r.get("error") and not r.get("answered_by")
+    ]
+    if not to_store:
+        return
+    _, SessionLocal = init_db()
+    session = SessionLocal()
+    try:
+        store_decisions(session, to_store, provider, model_name)
+        evict_decisions(session)
+    except Exception as e:
+        session.rollback()
+        print(f"[review_resumes] Decision cache store failed: {e}")
+    finally:
+        session.close()
+
 
-    Returns list of dicts with keys: resume_id, decision, rationale, category, match_score.
-    Older callers expecting tuple should adapt (app updated separately).
+def _completed(futures: Iterable[Future], cancel_event: threading.Event | None) -> Iterator[Future]:
+    """Like ``as_completed``, but stops early once ``cancel_event`` is set."""
+    not_done = set(futures)
+    while not_done:
+        if cancel_event is not None and cancel_event.is_set():
+            return
+        done, not_done = wait(not_done, timeout=0.25, return_when=FIRST_COMPLETED)
+        yield from done
+
+
+def iter_review_resumes(chain, job_desc: str, hr_prompt: str, resumes: Iterable[Tuple[int, str]], max_workers: int = 5,
+                        provider_name: str | None = None, use_cache: bool | None = None,
+                        cancel_event: threading.Event | None = None, hedge_provider: str | None = None,
+                        hedge_chain=None) -> Iterator[Dict[str, Any]]:
+    """Yield review results as they become available: cache hits first, then fresh verdicts in completion order.
+
+    Setting ``cancel_event`` or closing the generator stops the batch: resumes not yet
+    sent to the model are dropped, calls already in flight finish in the background
+    and are discarded. Verdicts yielded so far are still written to the decision cache.
+
+    A call still running past the provider's p95 latency is also sent to ``hedge_provider``
+    (``None`` = ``HEDGE_PROVIDER``, ``""`` = no hedging; pass ``hedge_chain`` to supply its chain directly) and
+    the first valid answer wins. Providers with an open circuit breaker are skipped.
+    Calls that fail on every provider yield a result with ``decision="error"``.
     """
     resumes_list = list(resumes)
-    results: List[Dict[str, Any]] = []
-    
-    engine, SessionLocal = init_db()
-    migrate_schema(engine)
     provider = provider_name or getattr(chain, "__class__", type(chain)).__name__
-    model_name = getattr(getattr(chain, "lc_attributes", None), "get", lambda *_: None)("model_name") if hasattr(chain, "lc_attributes") else "unknown"
+    model_name, temperature = _chain_model_info(chain)
+    cache_keys, cached, pending = _cache_lookup(job_desc, hr_prompt, resumes_list, provider, model_name, temperature, use_cache)
+    usage_ctx = current_usage_context()
+    record_cache_hits(cached, provider, model_name, "threads", usage_ctx)
+    yield from cached
+    prefix_tokens = count_tokens(f"{SYSTEM_PROMPT}{job_desc}{hr_prompt or ''}") if pending else 0
 
-    def process_single_resume(resume_id: int, text: str) -> Dict[str, Any]:
-        """Process a single resume and return structured result."""
+    hedge_provider = (settings.hedge_provider if hedge_provider is None else hedge_provider) or None
+    if hedge_provider == provider:
+        hedge_provider = None
+    if hedge_provider and hedge_chain is None and pending:
         try:
-            prompt_payload = {
-                "job_description": job_desc,
-                "hr_prompt": hr_prompt or "",
-                "resume_id": resume_id,
-                "resume_text": text,
-            }
+            hedge_chain = get_reviewer_chain(provider=hedge_provider, temperature=0.2 if temperature is None else temperature)
+        except Exception as e:
+            print(f"[review_resumes] Warning: hedging disabled, cannot build {hedge_provider} chain: {e}")
+            hedge_provider = None
+    hedge_model_name = _chain_model_info(hedge_chain)[0] if hedge_provider else None
+
+    def process_single_resume(resume_id: int, text: str, submitted: float) -> Dict[str, Any]:
+        """Process a single resume and return structured result."""
+        started = time.perf_counter()
+        result = _review_one(resume_id, text)
+        answered_by = result.get("answered_by")
+        _record_review("threads", answered_by or provider, hedge_model_name if answered_by else model_name,
+                       result, started, submitted, usage_ctx, prefix_tokens, text)
+        return result
+
+    def _review_one(resume_id: int, text: str) -> Dict[str, Any]:
+        prompt_payload = {
+            "job_description": job_desc,
+            "hr_prompt": hr_prompt or "",
+            "resume_id": resume_id,
+            "resume_text": text,
+        }
+
+        def primary() -> Dict[str, Any]:
             # If provider is google, perform native call for usage; else use chain.
             usage_info = None
-            if (provider_name or "").lower() == "google":
+            if (provider_name or "").lower() == "google" and (model_name or GEMINI_MODEL).endswith(GEMINI_MODEL):
                 out, usage_info = _google_invoke_with_usage(job_desc, hr_prompt or "", resume_id, text)
                 if not out:  # if empty fallback to chain
                     out = chain.invoke(prompt_payload)
             else:
                 out = chain.invoke(prompt_payload)
-            decision, rationale, category, match_score = _to_json_decision(out)
-            # Usage logging removed.
-            return {
-                "resume_id": resume_id,
-                "decision": decision,
-                "rationale": rationale,
-                "category": category,
-                "match_score": match_score,
-                **({"usage": usage_info} if usage_info else {}),
-            }
+            return _decision_result(resume_id, out, usage_info)
+
+        attempts = [(provider, primary)]
+        if hedge_provider:
+            attempts.append((hedge_provider, lambda: _decision_result(resume_id, hedge_chain.invoke(prompt_payload))))
+        try:
+            result, answered_by, info = call_with_hedging(attempts)
         except Exception as e:
-            return {
-                "resume_id": resume_id,
-                "decision": "rejected",
-                "rationale": f"Error processing resume: {str(e)}",
-                "category": "C",
-                "match_score": None,
-            }
-    
-    # Process resumes in parallel
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all tasks
-        future_to_resume = {
-            executor.submit(process_single_resume, resume_id, text): resume_id
-            for resume_id, text in resumes_list
-        }
-        
-        # Collect results as they complete
-        for future in as_completed(future_to_resume):
+            return _error_result(resume_id, e)
+        if answered_by != provider:
+            result["answered_by"] = answered_by
+        if info["hedged"]:
+            result["hedged"] = True
+        return result
+
+    if not pending:
+        return
+    fresh: List[Dict[str, Any]] = []
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = [executor.submit(process_single_resume, resume_id, text, time.perf_counter()) for resume_id, text in pending]
+        for future in _completed(futures, cancel_event):
             result = future.result()
-            results.append(result)
-    
+            fresh.append(result)
+            yield result
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        _cache_store(cache_keys, fresh, provider, model_name)
+
+
+def review_resumes(chain, job_desc: str, hr_prompt: str, resumes: Iterable[Tuple[int, str]], max_workers: int = 5,
+                   provider_name: str | None = None, use_cache: bool | None = None, hedge_provider: str | None = None,
+                   hedge_chain=None):
+    """Review resumes in parallel for faster processing with categorization.
+
+    Returns list of dicts with keys: resume_id, decision, rationale, category, match_score, cached.
+    Decisions already in the decision cache are returned without calling the model
+    (``use_cache=False`` bypasses the lookup; new verdicts are still stored).
+    Use ``iter_review_resumes`` to receive results as they complete.
+    """
+    results = list(iter_review_resumes(chain, job_desc, hr_prompt, resumes, max_workers=max_workers,
+                                       provider_name=provider_name, use_cache=use_cache,
+                                       hedge_provider=hedge_provider, hedge_chain=hedge_chain))
     # Sort results by resume_id to maintain order
     results.sort(key=lambda x: x["resume_id"])
     return results
+
+
+def pack_resumes(resumes: List[Tuple[int, str]], token_budget: int, max_per_call: int) -> List[List[Tuple[int, str]]]:
+    """Greedily group resumes so each pack's resume text fits ``token_budget`` (a lone oversize resume gets its own pack)."""
+    packs: List[List[Tuple[int, str]]] = []
+    current: List[Tuple[int, str]] = []
+    used = 0
+    for resume_id, text in resumes:
+        cost = count_tokens(text) + 10  # header per resume
+        if current and (used + cost > token_budget or len(current) >= max_per_call):
+            packs.append(current)
+            current, used = [], 0
+        current.append((resume_id, text))
+        used += cost
+    if current:
+        packs.append(current)
+    return packs
+
+
+def iter_review_resumes_packed(chain, job_desc: str, hr_prompt: str, resumes: Iterable[Tuple[int, str]],
+                               batch_chain=None, token_budget: int | None = None, max_per_call: int | None = None,
+                               max_workers: int = 5, provider_name: str | None = None, use_cache: bool | None = None,
+                               cancel_event: threading.Event | None = None,
+                               hedge_provider: str | None = None) -> Iterator[Dict[str, Any]]:
+    """Streaming ``review_resumes_packed``: yields each pack's verdicts as soon as the pack returns.
+
+    ``hedge_provider`` applies to the single-resume fallback calls only.
+    """
+    resumes_list = list(resumes)
+    if batch_chain is None:
+        yield from iter_review_resumes(chain, job_desc, hr_prompt, resumes_list, max_workers=max_workers,
+                                       provider_name=provider_name, use_cache=use_cache, cancel_event=cancel_event,
+                                       hedge_provider=hedge_provider)
+        return
+    token_budget = token_budget or settings.pack_token_budget
+    max_per_call = max_per_call or settings.pack_max_resumes
+    provider = provider_name or getattr(chain, "__class__", type(chain)).__name__
+    model_name, temperature = _chain_model_info(batch_chain)
+    cache_keys, cached, pending = _cache_lookup(job_desc, hr_prompt, resumes_list, provider, model_name, temperature,
+                                                use_cache, prompt_version=BATCH_PROMPT_VERSION)
+
+    usage_ctx = current_usage_context()
+    record_cache_hits(cached, provider, model_name, "packed", usage_ctx)
+    yield from cached
+
+    packs = pack_resumes(pending, token_budget, max_per_call)
+    singles = [p[0] for p in packs if len(p) == 1]
+    packs = [p for p in packs if len(p) > 1]
+
+    def process_pack(pack: List[Tuple[int, str]], submitted: float) -> Tuple[List[Dict[str, Any]], List[Tuple[int, str]]]:
+        started = time.perf_counter()
+        done, missing, usage = _review_pack(pack)
+        if settings.usage_tracking_enabled:
+            est = None if usage else count_tokens(f"{BATCH_SYSTEM_PROMPT}{job_desc}{hr_prompt or ''}") + sum(count_tokens(t) for _, t in pack)
+            record_call(provider, model_name, "packed", {"usage": usage, "error": len(missing) == len(pack)},
+                        wall_s=time.perf_counter() - started, queue_s=started - submitted, context=usage_ctx,
+                        resumes=len(pack), est_input_tokens=est, resume_id=pack[0][0])
+        return done, missing
+
+    def _review_pack(pack: List[Tuple[int, str]]) -> Tuple[List[Dict[str, Any]], List[Tuple[int, str]], Dict[str, int] | None]:
+        try:
+            out = batch_chain.invoke({
+                "job_description": job_desc,
+                "hr_prompt": hr_prompt or "",
+                "resumes_block": format_resumes_block(pack),
+            })
+            text, usage = _output_text_and_usage(out)
+            parsed = _to_json_decisions(text)
+        except Exception:
+            return [], pack, None
+        done: List[Dict[str, Any]] = []
+        missing: List[Tuple[int, str]] = []
+        for resume_id, text in pack:
+            if resume_id in parsed:
+                decision, rationale, category, match_score = parsed[resume_id]
+                done.append({
+                    "resume_id": resume_id,
+                    "decision": decision,
+                    "rationale": rationale,
+                    "category": category,
+                    "match_score": match_score,
+                    "cached": False,
+                    "packed": True,
+                    # Whole-call usage is attributed to the first resume so totals still add up
+                    **({"usage": usage} if usage and not done else {}),
+                })
+            else:
+                missing.append((resume_id, text))
+        return done, missing, usage
+
+    fresh: List[Dict[str, Any]] = []
+    fallback: List[Tuple[int, str]] = list(singles)
+    if packs:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = [executor.submit(process_pack, p, time.perf_counter()) for p in packs]
+            for future in _completed(futures, cancel_event):
+                done, missing = future.result()
+                fresh.extend(done)
+                fallback.extend(missing)
+                yield from done
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            _cache_store(cache_keys, fresh, provider, model_name)
+    if fallback and not (cancel_event is not None and cancel_event.is_set()):
+        yield from iter_review_resumes(chain, job_desc, hr_prompt, fallback, max_workers=max_workers,
+                                       provider_name=provider_name, use_cache=use_cache, cancel_event=cancel_event,
+                                       hedge_provider=hedge_provider)
+
+
+def review_resumes_packed(chain, job_desc: str, hr_prompt: str, resumes: Iterable[Tuple[int, str]],
+                          batch_chain=None, token_budget: int | None = None, max_per_call: int | None = None,
+                          max_workers: int = 5, provider_name: str | None = None, use_cache: bool | None = None,
+                          hedge_provider: str | None = None):
+    """Review several resumes per LLM call so the JD and HR prompt are sent once per pack.
+
+    ``chain`` is the normal single-resume chain and ``batch_chain`` one built by
+    ``get_batch_reviewer_chain`` for the same provider. Resumes a packed answer
+    leaves out (or mangles) fall back to ``review_resumes`` with ``chain``.
+    Packed verdicts carry ``packed: True``; result shape otherwise matches ``review_resumes``.
+    """
+    results = list(iter_review_resumes_packed(chain, job_desc, hr_prompt, resumes, batch_chain=batch_chain,
+                                              token_budget=token_budget, max_per_call=max_per_call,
+                                              max_workers=max_workers, provider_name=provider_name, use_cache=use_cache,
+                                              hedge_provider=hedge_provider))
+    results.sort(key=lambda x: x["resume_id"])
+    return results
@@ -0,0 +1,173 @@
+"""Cache-aware request building for provider-side prompt caching.
+
+Every review call starts with the same system prompt, JD and HR instructions.
+The builders here keep that prefix byte-identical across calls and mark it for
+the provider's prompt cache:
+
+* OpenAI caches long identical prefixes automatically; a stable layout is all it needs.
+* Anthropic gets ``cache_control`` breakpoints on the system prompt and the JD block.
+* Gemini (native SDK path) reuses a ``CachedContent`` holding the prefix.
+
+``extract_usage`` normalises token usage, including cached vs uncached input
+tokens, from whatever the provider returned.
+"""
+import hashlib
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from config.settings import settings
+from .prompts import BATCH_HUMAN_SUFFIX, BATCH_SYSTEM_PROMPT, HUMAN_PREFIX, HUMAN_SUFFIX, SYSTEM_PROMPT
+
+_EPHEMERAL = {"type": "ephemeral"}
+
+
+def _messages(system: str, prefix: str, suffix: str, provider: str | None) -> list[BaseMessage]:
+    if (provider or "").lower() == "anthropic":
+        return [
+            SystemMessage(content=[{"type": "text", "text": system, "cache_control": _EPHEMERAL}]),
+            HumanMessage(content=[
+                {"type": "text", "text": prefix, "cache_control": _EPHEMERAL},
+                {"type": "text", "text": suffix},
+            ]),
+        ]
+    # Same text the plain ChatPromptTemplate would produce, so the cacheable prefix is stable
+    return [SystemMessage(content=system), HumanMessage(content=prefix + suffix)]
+
+
+def build_review_messages(payload: Dict[str, Any], provider: str | None = None) -> list[BaseMessage]:
+    prefix = HUMAN_PREFIX.format(job_description=payload["job_description"], hr_prompt=payload.get("hr_prompt") or "")
+    suffix = HUMAN_SUFFIX.format(resume_id=payload["resume_id"], resume_text=payload["resume_text"])
+    return _messages(SYSTEM_PROMPT, prefix, suffix, provider)
+
+
+def build_batch_review_messages(payload: Dict[str, Any], provider: str | None = None) -> list[BaseMessage]:
+    prefix = HUMAN_PREFIX.format(job_description=payload["job_description"], hr_prompt=payload.get("hr_prompt") or "")
+    suffix = BATCH_HUMAN_SUFFIX.format(resumes_block=payload["resumes_block"])
+    return _messages(BATCH_SYSTEM_PROMPT, prefix, suffix, provider)
+
+
+def _get(obj: Any, key: str) -> Any:
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(key)
+    return getattr(obj, key, None)
+
+
+def extract_usage(message: Any) -> Dict[str, int] | None:
+    """Token usage of an AIMessage as prompt/response/total/cached/cache_write/uncached counts."""
+    meta = getattr(message, "usage_metadata", None) or {}
+    raw = getattr(message, "response_metadata", None) or {}
+    prompt_tokens = _get(meta, "input_tokens")
+    response_tokens = _get(meta, "output_tokens")
+    details = _get(meta, "input_token_details") or {}
+    cached = _get(details, "cache_read")
+    cache_write = _get(details, "cache_creation")
+
+    anthropic_usage = raw.get("usage") if isinstance(raw.get("usage"), dict) else None
+    if anthropic_usage and "input_tokens" in anthropic_usage:
+        # Anthropic's input_tokens excludes cache reads/writes
+        cached = anthropic_usage.get("cache_read_input_tokens") or 0
+        cache_write = anthropic_usage.get("cache_creation_input_tokens") or 0
+        prompt_tokens = (anthropic_usage.get("input_tokens") or 0) + cached + cache_write
+        response_tokens = anthropic_usage.get("output_tokens", response_tokens)
+    openai_usage = raw.get("token_usage") if isinstance(raw.get("token_usage"), dict) else None
+    if openai_usage:
+        prompt_tokens = openai_usage.get("prompt_tokens", prompt_tokens)
+        response_tokens = openai_usage.get("completion_tokens", response_tokens)
+        if cached is None:
+            cached = _get(openai_usage.get("prompt_tokens_details"), "cached_tokens")
+
+    if prompt_tokens is None and response_tokens is None:
+        return None
+    prompt_tokens = int(prompt_tokens or 0)
+    response_tokens = int(response_tokens or 0)
+    cached = int(cached or 0)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "response_tokens": response_tokens,
+        "total_tokens": prompt_tokens + response_tokens,
+        "cached_tokens": cached,
+        "cache_write_tokens": int(cache_write or 0),
+        "uncached_tokens": max(0, prompt_tokens - cached),
+    }
+
+
+def gemini_usage(response: Any) -> Dict[str, int] | None:
+    """Usage dict (same keys as ``extract_usage``) from a native google.generativeai response."""
+    usage_meta = getattr(response, "usage_metadata", None)
+    if not usage_meta:
+        return None
+    prompt_tokens = int(_get(usage_meta, "prompt_token_count") or 0)
+    response_tokens = int(_get(usage_meta, "candidates_token_count") or 0)
+    cached = int(_get(usage_meta, "cached_content_token_count") or 0)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "response_tokens": response_tokens,
+        "total_tokens": int(_get(usage_meta, "total_token_count") or prompt_tokens + response_tokens),
+        "cached_tokens": cached,
+        "cache_write_tokens": 0,
+        "uncached_tokens": max(0, prompt_tokens - cached),
+    }
+
+
+# prefix sha256 -> (CachedContent or None when the provider refused it, expiry monotonic time)
+_gemini_caches: Dict[str, Tuple[Any, float]] = {}
+_gemini_key_locks: Dict[str, threading.Lock] = {}  # one create call per prefix at a time
+_gemini_lock = threading.Lock()  # guards the two dicts; never held across a network call
+
+
+def _is_too_small(exc: BaseException) -> bool:
+    """Gemini's refusal to cache a prompt below its minimum size (as opposed to a transient or auth error)."""
+    msg = str(exc).lower()
+    return "too small" in msg or "min_total_token_count" in msg
+
+
+def get_gemini_cached_content(genai, model_name: str, system: str, prefix: str):
+    """Return a CachedContent for (model, system, prefix), creating it once per TTL.
+
+    Gemini rejects caches below its minimum prompt size; that refusal is remembered
+    for the TTL too, so short JDs do not pay a failed create call per resume. Any
+    other failure (429, network, auth) returns None without being remembered, so
+    the next call tries again.
+    """
+    if not settings.prompt_cache_enabled:
+        return None
+    key = hashlib.sha256(f"{model_name}\n{system}\n{prefix}".encode("utf-8")).hexdigest()
+    ttl = max(1, settings.gemini_cache_ttl_minutes) * 60
+    with _gemini_lock:
+        entry = _gemini_caches.get(key)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+        key_lock = _gemini_key_locks.setdefault(key, threading.Lock())
+    with key_lock:
+        with _gemini_lock:  # another worker may have created it while this one waited
+            entry = _gemini_caches.get(key)
+            if entry and entry[1] > time.monotonic():
+                return entry[0]
+        try:
+            cached = genai.caching.CachedContent.create(
+                model=model_name,
+                system_instruction=system,
+                contents=[prefix],
+                ttl=timedelta(seconds=ttl),
+            )
+        except Exception as e:
+            if not _is_too_small(e):
+                with _gemini_lock:
+                    _gemini_key_locks.pop(key, None)
+                return None
+            cached = None
+        # Refresh a little before the server-side expiry; drop expired entries so one per JD does not pile up
+        with _gemini_lock:
+            now = time.monotonic()
+            for stale in [k for k, (_, expires) in _gemini_caches.items() if expires <= now]:
+                del _gemini_caches[stale]
+                if stale != key:
+                    _gemini_key_locks.pop(stale, None)
+            _gemini_caches[key] = (cached, now + ttl * 0.9)
+            return cached
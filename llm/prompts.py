@@ -1,3 +1,5 @@
+import hashlib
+
 from langchain_core.prompts import ChatPromptTemplate
 
 SYSTEM_PROMPT = (
@@ -9,7 +11,38 @@ SYSTEM_PROMPT = (
     "Output strictly as JSON with keys: decision ('approved'|'rejected'), category ('A'|'B'|'C'), match_score (int), rationale (string)."
 )
 
+# The human turn is split into a per-job prefix and a per-resume suffix so the
+# system prompt + JD + HR instructions form a stable, provider-cacheable prefix.
+HUMAN_PREFIX = "Job Description:\n{job_description}\n\nHR Instructions:\n{hr_prompt}\n\n"
+HUMAN_SUFFIX = "Resume (id={resume_id}):\n{resume_text}\n\nReturn JSON only with keys decision, category, match_score, rationale."
+HUMAN_PROMPT = HUMAN_PREFIX + HUMAN_SUFFIX
+
 prompt = ChatPromptTemplate.from_messages([
     ("system", SYSTEM_PROMPT),
-    ("human", "Job Description:\n{job_description}\n\nHR Instructions:\n{hr_prompt}\n\nResume (id={resume_id}):\n{resume_text}\n\nReturn JSON only with keys decision, category, match_score, rationale."),
+    ("human", HUMAN_PROMPT),
 ])
+
+# Changes whenever the prompt wording changes, so cached decisions from an older prompt are never reused.
+PROMPT_VERSION = hashlib.sha256(f"{SYSTEM_PROMPT}\n{HUMAN_PROMPT}".encode("utf-8")).hexdigest()[:12]
+
+BATCH_SYSTEM_PROMPT = (
+    SYSTEM_PROMPT
+    + " You will receive several resumes for the same job; judge each one independently. "
+    "Output strictly a JSON array with one object per resume, each with keys: resume_id (int, copied from the resume header), "
+    "decision, category, match_score, rationale."
+)
+
+BATCH_HUMAN_SUFFIX = "{resumes_block}\n\nReturn JSON only: an array with one object per resume, keyed by resume_id."
+BATCH_HUMAN_PROMPT = HUMAN_PREFIX + BATCH_HUMAN_SUFFIX
+
+batch_prompt = ChatPromptTemplate.from_messages([
+    ("system", BATCH_SYSTEM_PROMPT),
+    ("human", BATCH_HUMAN_PROMPT),
+])
+
+BATCH_PROMPT_VERSION = hashlib.sha256(f"{BATCH_SYSTEM_PROMPT}\n{BATCH_HUMAN_PROMPT}".encode("utf-8")).hexdigest()[:12]
+
+
+def format_resumes_block(resumes) -> str:
+    """Render (resume_id, text) pairs with the same header the single-resume prompt uses."""
+    return "\n\n".join(f"Resume (id={resume_id}):\n{text}" for resume_id, text in resumes)
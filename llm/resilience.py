@@ -0,0 +1,317 @@
+"""Per-provider latency tracking, circuit breakers and hedged calls.
+
+Every review call records its latency and outcome against its provider. A
+provider that fails ``CIRCUIT_FAILURE_THRESHOLD`` times in a row is skipped
+for ``CIRCUIT_RESET_SECONDS``; after that a single trial call decides whether
+it is healthy again.
+
+``call_with_hedging`` runs a call on the primary provider. If the call is
+still pending after that provider's observed p95 latency, the same request is
+sent to the backup provider and the first valid answer wins. If the primary
+fails outright or its circuit is open, the backup is called immediately. A
+call stuck on a hung connection no longer holds up the batch: the worker stops
+waiting for it after ``LLM_REQUEST_TIMEOUT`` and its outcome is counted once,
+as a timeout. Each call gets its own daemon thread, so it starts at once: the
+hedge delay and the timeout measure the call itself, never time spent queued
+behind other (possibly hung) calls. Provider clients carry the same timeout,
+so an abandoned call normally ends soon after; while a provider has
+``LLM_MAX_ABANDONED_CALLS`` of them still running, new calls to it fail fast
+with ``CallCapacityError`` instead of starting yet another thread.
+"""
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from config.settings import settings
+
+_MIN_SAMPLES = 20  # latencies needed before the observed quantile replaces HEDGE_INITIAL_DELAY
+
+
+class CircuitOpenError(RuntimeError):
+    """The provider's circuit breaker is open; the call was not attempted."""
+
+
+class CallCapacityError(RuntimeError):
+    """Too many abandoned calls to the provider are still running; the call was not attempted."""
+
+
+class CircuitBreaker:
+    """Closed → open after N consecutive failures → half-open (one trial) after the cooldown."""
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state == "open":  # a call issued before the trip; only the half-open trial may close it
+                return
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                if self.state != "open":
+                    self.trips += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+
+class ProviderHealth:
+    """Rolling latency window, breaker and hedge counters for one provider."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: deque = deque(maxlen=settings.latency_window)
+        self.breaker = CircuitBreaker(settings.circuit_failure_threshold, settings.circuit_reset_seconds)
+        self.counts = {"calls": 0, "failures": 0, "hedges": 0, "hedge_wins": 0, "short_circuited": 0, "timeouts": 0}
+        self.abandoned = 0  # abandoned calls whose thread is still running
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self.counts["calls"] += 1
+            if ok:
+                self.latencies.append(seconds)
+            else:
+                self.counts["failures"] += 1
+        if ok:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def bump(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] += 1
+
+    def track_abandoned(self, delta: int) -> None:
+        with self._lock:
+            self.abandoned += delta
+
+    def at_capacity(self) -> bool:
+        with self._lock:
+            return self.abandoned >= settings.llm_max_abandoned_calls
+
+    def quantile(self, q: float) -> float | None:
+        with self._lock:
+            samples = list(self.latencies)
+        return float(np.percentile(samples, q)) if len(samples) >= _MIN_SAMPLES else None
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait on this provider before sending a backup request."""
+        observed = self.quantile(settings.hedge_quantile)
+        if observed is None:
+            return settings.hedge_initial_delay
+        return max(settings.hedge_min_delay, observed)
+
+    def snapshot(self) -> Dict[str, Any]:
+        p50, p95 = self.quantile(50), self.quantile(95)
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "trips": self.breaker.trips,
+            "samples": len(self.latencies),
+            "p50_s": None if p50 is None else round(p50, 2),
+            "p95_s": None if p95 is None else round(p95, 2),
+            "hedge_delay_s": round(self.hedge_delay(), 2),
+            "abandoned_running": self.abandoned,
+            **self.counts,
+        }
+
+
+_health: Dict[str, ProviderHealth] = {}
+_health_lock = threading.Lock()
+
+
+def get_provider_health(provider: str) -> ProviderHealth:
+    with _health_lock:
+        health = _health.get(provider)
+        if health is None:
+            health = _health[provider] = ProviderHealth(provider)
+        return health
+
+
+def reset_provider_health() -> None:
+    """Forget all latency samples and breaker state (tests, benchmarks)."""
+    with _health_lock:
+        _health.clear()
+
+
+def resilience_stats() -> Dict[str, Dict[str, Any]]:
+    with _health_lock:
+        providers = list(_health.values())
+    return {h.name: h.snapshot() for h in providers}
+
+
+class _Attempt:
+    """One call in flight; its outcome is recorded once, either when it returns or when the caller gives up."""
+
+    def __init__(self, provider: str, health: ProviderHealth):
+        self.provider = provider
+        self.health = health
+        self._settled = False
+        self._abandoned = False
+        self._finished = False
+        self._lock = threading.Lock()
+
+    def settle(self) -> bool:
+        """True for the first caller only: the call's own result, or the abandonment at the deadline."""
+        with self._lock:
+            if self._settled:
+                return False
+            self._settled = True
+            return True
+
+    def abandon(self) -> bool:
+        """Give up on the call at the deadline; its thread counts against the provider until it returns."""
+        with self._lock:
+            if self._settled:
+                return False
+            self._settled = True
+            if not self._finished:
+                self._abandoned = True
+                self.health.track_abandoned(1)
+            return True
+
+    def finish(self) -> None:
+        """The call's thread is done (called once, from that thread)."""
+        with self._lock:
+            self._finished = True
+            if self._abandoned:
+                self.health.track_abandoned(-1)
+
+
+def _timed(attempt: _Attempt, fn: Callable[[], Any]) -> Any:
+    started = time.perf_counter()
+    try:
+        value = fn()
+    except BaseException:
+        if attempt.settle():
+            attempt.health.record(time.perf_counter() - started, ok=False)
+        raise
+    if attempt.settle():  # an abandoned call was already counted as a timeout
+        attempt.health.record(time.perf_counter() - started, ok=True)
+    return value
+
+
+def _start(attempt: _Attempt, fn: Callable[[], Any]) -> Future:
+    """Run ``fn`` on its own daemon thread (a hung call must not block other calls or interpreter exit)."""
+    future: Future = Future()
+    ctx = contextvars.copy_context()
+
+    def run() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(ctx.run(_timed, attempt, fn))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            attempt.finish()
+
+    threading.Thread(target=run, name=f"llm-call-{attempt.provider}", daemon=True).start()
+    return future
+
+
+def call_with_hedging(attempts: Sequence[Tuple[str, Callable[[], Any]]],
+                      timeout: float | None = None) -> Tuple[Any, str, Dict[str, Any]]:
+    """Run ``attempts`` [(provider, fn), ...] in order, hedging past the current provider's p95.
+
+    ``fn`` must raise on an unusable answer (exception, unparsable output) so the
+    next provider gets a chance. Returns (value, provider that answered, info).
+    ``info`` records whether a backup was sent. If no attempt succeeds, the
+    last error is raised: ``CircuitOpenError``, ``CallCapacityError``,
+    ``TimeoutError`` or the provider's own exception.
+    """
+    timeout = settings.llm_request_timeout if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    queue = list(attempts)
+    pending: Dict[Future, _Attempt] = {}
+    errors: List[BaseException] = []
+    info: Dict[str, Any] = {"hedged": False, "attempts": 0}
+    current: ProviderHealth | None = None
+    current_started = 0.0
+
+    def launch_next() -> bool:
+        nonlocal current, current_started
+        while queue:
+            provider, fn = queue.pop(0)
+            health = get_provider_health(provider)
+            if health.at_capacity():
+                health.bump("short_circuited")
+                errors.append(CallCapacityError(f"{provider}: {health.abandoned} timed-out calls still running"))
+                continue
+            if not health.breaker.allow():
+                health.bump("short_circuited")
+                errors.append(CircuitOpenError(f"{provider}: circuit open after repeated failures"))
+                continue
+            attempt = _Attempt(provider, health)
+            pending[_start(attempt, fn)] = attempt
+            current, current_started = health, time.monotonic()
+            info["attempts"] += 1
+            return True
+        return False
+
+    launch_next()
+    while pending:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        wait_for = remaining
+        if queue and current is not None:  # a backup is available: only wait out the current provider's p95
+            wait_for = min(remaining, max(0.0, current_started + current.hedge_delay() - time.monotonic()))
+        done, _ = wait(list(pending), timeout=wait_for, return_when=FIRST_COMPLETED)
+        for fut in done:
+            provider = pending.pop(fut).provider
+            exc = fut.exception()
+            if exc is None:
+                if info["hedged"] and provider != attempts[0][0]:
+                    get_provider_health(provider).bump("hedge_wins")
+                return fut.result(), provider, info
+            errors.append(exc)
+        if not done and queue:
+            slow = current
+            if launch_next():
+                info["hedged"] = True
+                if slow is not None:
+                    slow.bump("hedges")
+        elif not pending:
+            launch_next()  # failed fast: fail over without waiting
+    if pending:
+        # Abandoned calls keep their thread until they return; count them as failures now so a
+        # provider that hangs (and never returns) still trips its breaker. abandon() stops _timed
+        # from counting the same call again if it returns later.
+        for attempt in pending.values():
+            if attempt.abandon():
+                attempt.health.bump("timeouts")
+                attempt.health.breaker.record_failure()
+        providers = sorted({attempt.provider for attempt in pending.values()})
+        errors.append(TimeoutError(f"no answer from {', '.join(providers)} within {timeout:g}s"))
+    raise errors[-1] if errors else RuntimeError("no provider attempted")
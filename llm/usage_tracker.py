@@ -0,0 +1,167 @@
+"""Per-call latency and token instrumentation.
+
+Review engines call ``record_call`` once per LLM call (and once per decision
+cache hit). Records go onto an in-memory queue; a daemon thread writes them
+to the ``llm_usage`` table in batched executemany inserts, so the hot path
+never waits on the database.
+"""
+import atexit
+import contextlib
+import contextvars
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy import insert
+
+from config.settings import settings
+from database.db_manager import init_db
+from database.models import Usage
+from utils.token_counter import count_tokens
+
+_usage_context: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar("usage_context", default={})
+
+
+@contextlib.contextmanager
+def usage_context(**fields) -> Iterator[None]:
+    """Attach fields (e.g. job_id) to every usage record made inside the block."""
+    token = _usage_context.set({**_usage_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _usage_context.reset(token)
+
+
+def current_usage_context() -> Dict[str, Any]:
+    # Captured by the engines on the calling thread, since worker threads do not inherit context vars
+    return dict(_usage_context.get())
+
+
+class UsageRecorder:
+    def __init__(self, batch_size: int = 200, flush_interval: float = 2.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Dict[str, Any] | None]" = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._outstanding = 0
+        self._drained = threading.Condition()
+        self.written = 0
+        self.failed = 0
+
+    def _ensure_started(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    engine, _ = init_db()
+                    Usage.__table__.create(bind=engine, checkfirst=True)
+                    self._thread = threading.Thread(target=self._run, name="usage-recorder", daemon=True)
+                    self._thread.start()
+
+    def record(self, row: Dict[str, Any]) -> None:
+        self._ensure_started()
+        with self._drained:
+            self._outstanding += 1
+        self._queue.put(row)
+
+    def _write(self, rows: List[Dict[str, Any]]) -> None:
+        engine, _ = init_db()
+        try:
+            with engine.begin() as conn:
+                conn.execute(insert(Usage), rows)
+            self.written += len(rows)
+        except Exception as e:  # Instrumentation must never break screening
+            self.failed += len(rows)
+            print(f"[usage_tracker] Failed to write {len(rows)} usage row(s): {e}")
+        with self._drained:
+            self._outstanding -= len(rows)
+            self._drained.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            batch = [first] if first is not None else []
+            # Gather up to batch_size rows or flush_interval seconds, whichever comes first;
+            # a None sentinel (from flush) writes immediately.
+            deadline = time.monotonic() + self.flush_interval
+            while first is not None and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    break
+                batch.append(item)
+            if batch:
+                self._write(batch)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until queued records are written (used at exit and by CLIs)."""
+        if self._thread is None:
+            return True
+        self._queue.put(None)  # cut the current batching window short
+        with self._drained:
+            return self._drained.wait_for(lambda: self._outstanding <= 0, timeout)
+
+
+_recorder: UsageRecorder | None = None
+_recorder_lock = threading.Lock()
+
+
+def get_usage_recorder() -> UsageRecorder:
+    global _recorder
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = UsageRecorder(settings.usage_batch_size, settings.usage_flush_interval)
+            atexit.register(_recorder.flush)
+        return _recorder
+
+
+def record_call(provider: str | None, model: str | None, engine: str, result: Dict[str, Any] | None = None,
+                wall_s: float | None = None, queue_s: float | None = None, retries: int = 0,
+                context: Dict[str, Any] | None = None, resumes: int = 1, est_input_tokens: int | None = None,
+                resume_id: int | None = None) -> None:
+    """Queue one usage row. Token counts come from ``result['usage']``; when the provider
+    returned none, ``est_input_tokens`` and the rationale length stand in (flagged as estimated)."""
+    if not settings.usage_tracking_enabled:
+        return
+    result = result or {}
+    usage = result.get("usage") or {}
+    cache_hit = bool(result.get("cached"))
+    estimated = False
+    input_tokens = usage.get("prompt_tokens")
+    output_tokens = usage.get("response_tokens")
+    if not usage and not cache_hit and est_input_tokens is not None:
+        input_tokens = est_input_tokens
+        output_tokens = count_tokens(result.get("rationale") or "") + 20  # JSON keys around the rationale
+        estimated = True
+    context = context or {}
+    get_usage_recorder().record({
+        "job_id": context.get("job_id"),
+        "resume_id": resume_id if resume_id is not None else result.get("resume_id"),
+        "provider": provider,
+        "model": model,
+        "engine": engine,
+        "resumes": resumes,
+        "wall_ms": None if wall_s is None else wall_s * 1000.0,
+        "queue_ms": None if queue_s is None else queue_s * 1000.0,
+        "retries": retries,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "cached_tokens": usage.get("cached_tokens"),
+        "tokens_estimated": estimated,
+        "cache_hit": cache_hit,
+        "error": bool(result.get("error")),
+        "created_at": datetime.now(timezone.utc).replace(tzinfo=None),
+    })
+
+
+def record_cache_hits(results: List[Dict[str, Any]], provider: str | None, model: str | None, engine: str,
+                      context: Dict[str, Any] | None = None) -> None:
+    for r in results:
+        record_call(provider, model, engine, r, wall_s=0.0, queue_s=0.0, context=context)
@@ -0,0 +1,107 @@
+"""Search every stored resume for a job description, optionally reviewing the hits.
+
+The archive index (``utils.resume_index``) is synced with the resumes table
+first, so only resumes stored since the last run are embedded.
+
+Examples:
+    python resume_search.py --jd-file jd.txt --top 20
+    python resume_search.py --sync                                  # just bring the index up to date
+    python resume_search.py --jd-file jd.txt --top 50 --review --provider openai --job-title "Backend Engineer"
+"""
+import argparse
+import json
+import sys
+import time
+from typing import List
+
+from sqlalchemy import select
+
+from config.settings import settings
+from database.bulk import save_decisions
+from database.db_manager import init_db, migrate_schema
+from database.models import Base, Job, Resume
+from llm.llm_handler import get_reviewer_chain, review_resumes
+from llm.usage_tracker import get_usage_recorder, usage_context
+from utils.resume_index import get_resume_index, load_resume_texts
+from utils.token_counter import compact_resumes
+
+
+def _read_text(value: str | None, path: str | None) -> str:
+    if path:
+        with open(path, "r", encoding="utf-8") as fh:
+            return fh.read()
+    return value or ""
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Find the best-matching archived resumes for a job description.")
+    parser.add_argument("--jd", help="job description text")
+    parser.add_argument("--jd-file", help="file containing the job description")
+    parser.add_argument("--hr", help="extra HR instructions")
+    parser.add_argument("--hr-file", help="file containing extra HR instructions")
+    parser.add_argument("--top", type=int, default=50, help="number of candidates to return")
+    parser.add_argument("--min-score", type=float, help="drop hits below this cosine score")
+    parser.add_argument("--sync", action="store_true", help="only sync the index and print its stats")
+    parser.add_argument("--review", action="store_true", help="send the hits to the LLM and save the decisions as a new job")
+    parser.add_argument("--job-title", default="Archive search")
+    parser.add_argument("--provider", default=settings.default_llm_provider, choices=["openai", "anthropic", "google"])
+    parser.add_argument("--temperature", type=float, default=0.2)
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args(argv)
+
+    job_desc = _read_text(args.jd, args.jd_file)
+    hr_prompt = _read_text(args.hr, args.hr_file)
+    if not args.sync and not job_desc:
+        parser.error("a job description is required (--jd or --jd-file)")
+
+    engine, Session = init_db()
+    Base.metadata.create_all(bind=engine)
+    migrate_schema(engine)
+    index = get_resume_index()
+    session = Session()
+    try:
+        t0 = time.perf_counter()
+        added = index.sync(session)
+        print(f"Index synced: {added} new resume(s) in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+        if args.sync:
+            print(json.dumps(index.stats(), indent=2))
+            return 0
+
+        t0 = time.perf_counter()
+        hits = index.search(job_desc, hr_prompt, top_n=args.top, min_score=args.min_score)
+        search_ms = (time.perf_counter() - t0) * 1000
+        names = dict(session.execute(select(Resume.id, Resume.filename).where(Resume.id.in_([rid for rid, _ in hits]))).all()) if hits else {}
+        rows = [{"resume_id": rid, "filename": names.get(rid), "score": score} for rid, score in hits]
+
+        if args.review and rows:
+            job = Job(title=args.job_title, description=job_desc, hr_prompt=hr_prompt,
+                      provider=args.provider, temperature=args.temperature, engine="threads")
+            session.add(job)
+            session.commit()
+            to_review, _ = compact_resumes(load_resume_texts(session, [r["resume_id"] for r in rows]))
+            with usage_context(job_id=job.id):
+                chain = get_reviewer_chain(provider=args.provider, temperature=args.temperature)
+                results = review_resumes(chain, job_desc, hr_prompt, to_review, provider_name=args.provider)
+            save_decisions(session, job.id, results)
+            by_id = {r["resume_id"]: r for r in results}
+            for row in rows:
+                verdict = by_id.get(row["resume_id"], {})
+                row.update(category=verdict.get("category"), match_score=verdict.get("match_score"))
+            print(f"Saved {len(results)} decision(s) to job {job.id}", file=sys.stderr)
+    finally:
+        session.close()
+        get_usage_recorder().flush()
+
+    print(f"{len(rows)} hit(s) from {index.count} indexed resume(s) in {search_ms:.1f} ms", file=sys.stderr)
+    if args.json:
+        json.dump(rows, sys.stdout, indent=2)
+        print()
+    else:
+        for row in rows:
+            verdict = f"  {row['category']} {row['match_score']}" if "category" in row else ""
+            print(f"{row['score']:.4f}  #{row['resume_id']}  {row['filename']}{verdict}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from functools import partial
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+import llm.async_engine as async_engine
+from config.settings import settings
+from llm.async_engine import AdaptiveConcurrency, ProviderLimiter, areview_resumes
+from llm.fake_models import FakeChatModel
+from llm.prompt_cache import build_review_messages
+from llm.resilience import reset_provider_health
+
+RESUMES = [(i, f"Resume {i}: Python, SQL and {i} years of experience.") for i in range(1, 31)]
+
+
+@pytest.fixture(autouse=True)
+def _fresh(monkeypatch):
+    monkeypatch.setattr(settings, "decision_cache_enabled", False)
+    monkeypatch.setattr(settings, "usage_tracking_enabled", False)
+    monkeypatch.setattr(async_engine, "_learned_limits", {})
+    reset_provider_health()
+    yield
+    reset_provider_health()
+
+
+def _chain(model: FakeChatModel):
+    return RunnableLambda(partial(build_review_messages, provider="fake")) | model
+
+
+def _review(model: FakeChatModel, resumes=RESUMES, **kwargs):
+    kwargs.setdefault("limiter", ProviderLimiter(0, 0))
+    return asyncio.run(areview_resumes(_chain(model), "Python developer", "", resumes, provider_name="fake", **kwargs))
+
+
+def test_backs_off_on_429s_and_ramps_up_after_successes(monkeypatch):
+    monkeypatch.setattr(async_engine, "backoff_delay", lambda attempt: 0.01)
+    model = FakeChatModel(latency=0.02, max_concurrency=2)
+    results = _review(model, initial_concurrency=16, max_concurrency=16, max_retries=20)
+    assert all(r["decision"] != "error" for r in results)
+    assert model.rate_limited > 0
+    backed_off = async_engine._learned_limits["fake"]
+    assert backed_off < 8  # halved more than once from 16
+
+    # Next batch starts from the learned limit and grows again while calls succeed
+    _review(FakeChatModel(latency=0.01), resumes=RESUMES * 2, max_concurrency=16)
+    assert async_engine._learned_limits["fake"] > backed_off
+
+
+def test_aimd_halves_once_per_burst_and_grows_by_one_per_window():
+    async def run():
+        gate = AdaptiveConcurrency(initial=8, maximum=16, cooldown=60)
+        gate.on_overload()
+        gate.on_overload()
+        assert gate.limit == 4
+        for _ in range(4):
+            gate.on_success()
+        assert gate.limit == pytest.approx(5, abs=0.1)
+
+    asyncio.run(run())
+
+
+def test_retry_after_is_honoured(monkeypatch):
+    monkeypatch.setattr(async_engine, "backoff_delay", lambda attempt: 0.0)
+    model = FakeChatModel(rate_limit_rate=1.0, retry_after=0.3)
+    started = time.monotonic()
+    [result] = _review(model, resumes=RESUMES[:1], max_retries=1)
+    assert time.monotonic() - started >= 0.3
+    assert (model.calls, result["retries"]) == (2, 1)
+
+
+def test_retries_stop_at_max_retries_with_an_error_row(monkeypatch):
+    monkeypatch.setattr(async_engine, "backoff_delay", lambda attempt: 0.0)
+    monkeypatch.setattr(settings, "llm_max_retries", 2)
+    model = FakeChatModel(rate_limit_rate=1.0, retry_after=0.01)
+    [result] = _review(model, resumes=RESUMES[:1])
+    assert model.calls == 3
+    assert (result["decision"], result["category"], result["retries"]) == ("error", None, 2)
+    assert "FakeRateLimitError" in result["rationale"]
+
+
+class _RecordingLimiter(ProviderLimiter):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.grants = []
+
+    async def acquire(self, tokens: int) -> float:
+        wait = await super().acquire(tokens)
+        self.grants.append((time.monotonic(), tokens))
+        return wait
+
+
+def _max_in_window(grants, window: float, weight) -> float:
+    return max(sum(weight(g) for g in grants if t - window < g[0] <= t) for t, _ in grants)
+
+
+def test_rpm_and_tpm_are_never_exceeded():
+    tokens_per_call = async_engine.count_tokens(f"{async_engine.SYSTEM_PROMPT}Python developer") + 330
+    limiter = _RecordingLimiter(rpm=8, tpm=tokens_per_call * 6, window=0.5)
+    results = _review(FakeChatModel(latency=0.01), resumes=RESUMES[:20], limiter=limiter, initial_concurrency=16)
+    assert len(results) == 20 and len(limiter.grants) == 20
+    window = 0.5 - 0.05  # grants may land a little after their booked time
+    assert _max_in_window(limiter.grants, window, lambda g: 1) <= 8
+    assert _max_in_window(limiter.grants, window, lambda g: g[1]) <= limiter.tokens.limit
+    assert limiter.grants[-1][0] - limiter.grants[0][0] >= 0.5  # 20 calls at <= 6 per window span several windows
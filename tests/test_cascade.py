@@ -0,0 +1,54 @@
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from config.settings import settings
+from llm.cascade import cascade_stats, review_resumes_cascade
+from llm.fake_models import FakeChatModel
+from llm.prompt_cache import build_review_messages
+from llm.resilience import reset_provider_health
+
+RESUMES = [(i, f"Resume {i}: Python, SQL and {i} years of experience.") for i in range(1, 11)]
+
+
+@pytest.fixture(autouse=True)
+def _fresh(monkeypatch):
+    monkeypatch.setattr(settings, "decision_cache_enabled", False)
+    monkeypatch.setattr(settings, "usage_tracking_enabled", False)
+    monkeypatch.setattr(settings, "hedge_provider", "")
+    reset_provider_health()
+    yield
+    reset_provider_health()
+
+
+def _chain(model: FakeChatModel, before=None):
+    def build(payload):
+        if before is not None:
+            before()
+        return build_review_messages(payload, provider="fake")
+
+    return RunnableLambda(build) | model
+
+
+def test_escalations_run_while_screening_continues():
+    strong = FakeChatModel(model_name="strong", latency=0.01)
+    strong_calls_seen = []
+    screen_chain = _chain(FakeChatModel(model_name="screen", latency=0.05),
+                          before=lambda: strong_calls_seen.append(strong.calls))
+    results = review_resumes_cascade(_chain(strong), "Python developer", "", RESUMES, screen_chain=screen_chain,
+                                     screen_provider="screen", provider_name="strong", band=(0, 100), max_workers=1)
+    assert [r["resume_id"] for r in results] == [rid for rid, _ in RESUMES]
+    assert all(r["escalated"] for r in results)
+    assert strong_calls_seen[-1] > 0  # the strong model had started before the last screening call
+    assert cascade_stats(results)["escalated"] == len(RESUMES)
+
+
+def test_screening_is_not_hedged_to_the_review_hedge_provider(monkeypatch):
+    monkeypatch.setattr(settings, "hedge_provider", "fake")
+    monkeypatch.setattr(settings, "hedge_initial_delay", 0.0)
+    monkeypatch.setattr(settings, "hedge_min_delay", 0.0)
+    screen_chain = _chain(FakeChatModel(model_name="screen", latency=0.05))
+    results = review_resumes_cascade(_chain(FakeChatModel(model_name="strong")), "Python developer", "", RESUMES,
+                                     screen_chain=screen_chain, screen_provider="screen", provider_name="strong",
+                                     band=(101, 101), hedge_provider="")
+    screened_only = [r for r in results if not r["escalated"]]
+    assert screened_only and not any(r.get("hedged") for r in screened_only)
@@ -0,0 +1,134 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage
+
+import llm.prompt_cache as prompt_cache
+from config.settings import settings
+from llm.prompt_cache import extract_usage, gemini_usage, get_gemini_cached_content
+
+
+class _Clock:
+    now = 1000.0
+
+    @classmethod
+    def monotonic(cls) -> float:
+        return cls.now
+
+
+class _StubCachedContent:
+    """Stands in for ``genai.caching.CachedContent``; ``fail_with`` / ``block`` map a prefix to a behaviour."""
+
+    def __init__(self):
+        self.created = []
+        self.fail_with = {}
+        self.block = {}
+
+    def create(self, model, system_instruction, contents, ttl):
+        prefix = contents[0]
+        if prefix in self.block:
+            self.block[prefix].wait(5)
+        if prefix in self.fail_with:
+            raise self.fail_with[prefix]
+        self.created.append(prefix)
+        return SimpleNamespace(name=f"cachedContents/{len(self.created)}", prefix=prefix)
+
+
+@pytest.fixture
+def genai(monkeypatch):
+    monkeypatch.setattr(settings, "prompt_cache_enabled", True)
+    monkeypatch.setattr(settings, "gemini_cache_ttl_minutes", 60)
+    monkeypatch.setattr(prompt_cache, "time", _Clock)
+    monkeypatch.setattr(prompt_cache, "_gemini_caches", {})
+    monkeypatch.setattr(prompt_cache, "_gemini_key_locks", {})
+    _Clock.now = 1000.0
+    return SimpleNamespace(caching=SimpleNamespace(CachedContent=_StubCachedContent()))
+
+
+def _get(genai, prefix: str):
+    return get_gemini_cached_content(genai, "gemini-2.5-pro", "system", prefix)
+
+
+def test_cached_content_is_reused_until_it_expires(genai):
+    first = _get(genai, "JD one")
+    assert _get(genai, "JD one") is first
+    assert genai.caching.CachedContent.created == ["JD one"]
+    _Clock.now += 60 * 60 * 0.9  # refreshed a little before the server-side TTL
+    assert _get(genai, "JD one") is not first
+    assert genai.caching.CachedContent.created == ["JD one", "JD one"]
+
+
+def test_expired_entries_are_evicted_on_insert(genai):
+    _get(genai, "JD one")
+    _Clock.now += 60 * 60
+    _get(genai, "JD two")
+    assert len(prompt_cache._gemini_caches) == 1
+    assert set(prompt_cache._gemini_key_locks) == set(prompt_cache._gemini_caches)
+
+
+def test_minimum_size_refusal_is_remembered(genai):
+    stub = genai.caching.CachedContent
+    stub.fail_with["short JD"] = ValueError("400 Cached content is too small. total_token_count=900, "
+                                            "min_total_token_count=4096")
+    assert _get(genai, "short JD") is None
+    stub.fail_with.clear()
+    assert _get(genai, "short JD") is None  # not retried within the TTL
+    assert stub.created == []
+
+
+def test_transient_failure_is_not_remembered(genai):
+    stub = genai.caching.CachedContent
+    stub.fail_with["JD"] = RuntimeError("429 Resource has been exhausted")
+    assert _get(genai, "JD") is None
+    stub.fail_with.clear()
+    assert _get(genai, "JD") is not None
+    assert stub.created == ["JD"]
+
+
+def test_slow_create_does_not_block_other_prefixes(genai):
+    stub = genai.caching.CachedContent
+    release = stub.block["slow JD"] = threading.Event()
+    worker = threading.Thread(target=_get, args=(genai, "slow JD"))
+    worker.start()
+    try:
+        assert _get(genai, "other JD") is not None
+        assert stub.created == ["other JD"]
+    finally:
+        release.set()
+        worker.join(5)
+    assert stub.created == ["other JD", "slow JD"]
+
+
+def test_extract_usage_openai():
+    msg = AIMessage(content="{}", response_metadata={"token_usage": {
+        "prompt_tokens": 1200, "completion_tokens": 50, "prompt_tokens_details": {"cached_tokens": 1024}}})
+    usage = extract_usage(msg)
+    assert (usage["prompt_tokens"], usage["cached_tokens"], usage["uncached_tokens"], usage["total_tokens"]) == \
+        (1200, 1024, 176, 1250)
+
+
+def test_extract_usage_anthropic_counts_cache_reads_and_writes_as_input():
+    msg = AIMessage(content="{}", response_metadata={"usage": {
+        "input_tokens": 100, "output_tokens": 40, "cache_read_input_tokens": 1500, "cache_creation_input_tokens": 200}})
+    usage = extract_usage(msg)
+    assert (usage["prompt_tokens"], usage["cached_tokens"], usage["cache_write_tokens"], usage["uncached_tokens"]) == \
+        (1800, 1500, 200, 300)
+    assert usage["response_tokens"] == 40
+
+
+def test_extract_usage_langchain_usage_metadata():
+    msg = AIMessage(content="{}", usage_metadata={"input_tokens": 900, "output_tokens": 20, "total_tokens": 920,
+                                                  "input_token_details": {"cache_read": 512}})
+    usage = extract_usage(msg)
+    assert (usage["prompt_tokens"], usage["response_tokens"], usage["cached_tokens"]) == (900, 20, 512)
+    assert extract_usage(AIMessage(content="{}")) is None
+
+
+def test_gemini_usage_native_response():
+    response = SimpleNamespace(usage_metadata=SimpleNamespace(
+        prompt_token_count=2000, candidates_token_count=30, cached_content_token_count=1800, total_token_count=2030))
+    usage = gemini_usage(response)
+    assert (usage["prompt_tokens"], usage["cached_tokens"], usage["uncached_tokens"], usage["total_tokens"]) == \
+        (2000, 1800, 200, 2030)
+    assert gemini_usage(SimpleNamespace(usage_metadata=None)) is None
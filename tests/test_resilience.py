@@ -0,0 +1,122 @@
+import threading
+import time
+from functools import partial
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from config.settings import settings
+from llm.fake_models import FakeChatModel, FakeProviderError
+from llm.llm_handler import iter_review_resumes
+from llm.prompt_cache import build_review_messages
+from llm.resilience import (
+    CallCapacityError,
+    CircuitOpenError,
+    call_with_hedging,
+    get_provider_health,
+    reset_provider_health,
+)
+
+MESSAGES = build_review_messages({"job_description": "Python developer", "resume_id": 1,
+                                  "resume_text": "Ten years of Python."}, provider="fake")
+
+
+@pytest.fixture(autouse=True)
+def _fresh(monkeypatch):
+    monkeypatch.setattr(settings, "decision_cache_enabled", False)
+    monkeypatch.setattr(settings, "usage_tracking_enabled", False)
+    monkeypatch.setattr(settings, "hedge_provider", "")
+    monkeypatch.setattr(settings, "hedge_min_delay", 0.01)
+    monkeypatch.setattr(settings, "circuit_failure_threshold", 3)
+    monkeypatch.setattr(settings, "circuit_reset_seconds", 0.2)
+    reset_provider_health()
+    yield
+    reset_provider_health()
+
+
+def _call(model: FakeChatModel):
+    return lambda: model.invoke(MESSAGES)
+
+
+def _wait_for(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_hedge_fires_after_p95_and_first_answer_wins():
+    primary = get_provider_health("primary")
+    for _ in range(20):
+        primary.record(0.05, ok=True)
+    assert primary.hedge_delay() == pytest.approx(0.05)
+    slow = FakeChatModel(hang_rate=1.0, hang=2.0)
+    backup = FakeChatModel()
+    started = time.monotonic()
+    try:
+        _, provider, info = call_with_hedging([("primary", _call(slow)), ("backup", _call(backup))], timeout=5)
+    finally:
+        slow.release_hung()
+    assert time.monotonic() - started >= 0.05
+    assert (provider, info["hedged"]) == ("backup", True)
+    assert primary.counts["hedges"] == 1
+    assert get_provider_health("backup").counts["hedge_wins"] == 1
+
+
+def test_fast_primary_is_not_hedged():
+    backup = FakeChatModel()
+    _, provider, info = call_with_hedging([("primary", _call(FakeChatModel())), ("backup", _call(backup))], timeout=5)
+    assert (provider, info["hedged"], backup.calls) == ("primary", False, 0)
+
+
+def test_breaker_opens_after_threshold_and_half_opens_after_cooldown():
+    model = FakeChatModel(error_rate=1.0)
+    for _ in range(3):
+        with pytest.raises(FakeProviderError):
+            call_with_hedging([("flaky", _call(model))], timeout=5)
+    breaker = get_provider_health("flaky").breaker
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        call_with_hedging([("flaky", _call(model))], timeout=5)
+    assert model.calls == 3
+    time.sleep(0.25)
+    model.error_rate = 0.0
+    call_with_hedging([("flaky", _call(model))], timeout=5)  # the half-open trial succeeds
+    assert (breaker.state, model.calls) == ("closed", 4)
+
+
+def test_abandoned_call_is_counted_once():
+    model = FakeChatModel(hang_rate=1.0, hang=5.0)
+    with pytest.raises(TimeoutError):
+        call_with_hedging([("hung", _call(model))], timeout=0.1)
+    health = get_provider_health("hung")
+    assert health.counts["timeouts"] == 1 and health.abandoned == 1
+    model.release_hung()
+    _wait_for(lambda: health.abandoned == 0)
+    assert health.abandoned == 0
+    assert (health.counts["calls"], health.counts["failures"], health.counts["timeouts"]) == (0, 0, 1)
+    assert health.breaker.failures == 1
+
+
+def test_abandoned_calls_are_capped(monkeypatch):
+    monkeypatch.setattr(settings, "llm_max_abandoned_calls", 1)
+    model = FakeChatModel(hang_rate=1.0, hang=5.0)
+    try:
+        with pytest.raises(TimeoutError):
+            call_with_hedging([("hung", _call(model))], timeout=0.1)
+        with pytest.raises(CallCapacityError):
+            call_with_hedging([("hung", _call(model))], timeout=0.1)
+        assert model.calls == 1
+        _, provider, _ = call_with_hedging([("hung", _call(model)), ("backup", _call(FakeChatModel()))], timeout=5)
+        assert provider == "backup"
+    finally:
+        model.release_hung()
+
+
+def test_failed_reviews_are_errors_not_rejections():
+    chain = RunnableLambda(partial(build_review_messages, provider="fake")) | FakeChatModel(error_rate=1.0)
+    results = list(iter_review_resumes(chain, "Python developer", "", [(1, "Ten years of Python."), (2, "Chef.")],
+                                       provider_name="fake", cancel_event=threading.Event()))
+    assert sorted(r["resume_id"] for r in results) == [1, 2]
+    for r in results:
+        assert (r["decision"], r["category"], r["error"]) == ("error", None, True)
+        assert "FakeProviderError" in r["rationale"]
@@ -0,0 +1,46 @@
+from utils.token_counter import normalize_resume_text
+
+
+def _page(n: int, body: list[str]) -> str:
+    return "\n".join(["Jane Doe - Resume", *body, f"Page {n} of 3", "jane@example.com"])
+
+
+def test_drops_headers_and_footers_repeated_across_pages():
+    text = "\f".join(_page(n, ["Experience", f"Role {n}"]) for n in (1, 2, 3))
+    out = normalize_resume_text(text).split("\n")
+    assert out.count("Jane Doe - Resume") == 1
+    assert out.count("jane@example.com") == 1
+    assert not any(line.startswith("Page ") for line in out)
+    assert ["Role 1", "Role 2", "Role 3"] == [line for line in out if line.startswith("Role")]
+
+
+def test_keeps_body_lines_repeated_on_a_page():
+    body = ["Acme Corp", "Responsibilities:", "Built APIs.", "Globex", "Responsibilities:", "Ran on-call.",
+            "Initech", "Responsibilities:", "Led migrations.", "Skills", "Python"]
+    out = normalize_resume_text("\n".join(["Jane Doe", *body])).split("\n")
+    assert out.count("Responsibilities:") == 3
+
+
+def test_keeps_body_lines_repeated_across_pages():
+    pages = ["\n".join(["Jane Doe - Resume", f"Employer {n}", "Senior Engineer", "Responsibilities:",
+                        f"Shipped project {n}.", "More details.", "Even more details.", "jane@example.com"])
+             for n in (1, 2, 3)]
+    out = normalize_resume_text("\f".join(pages)).split("\n")
+    assert out.count("Responsibilities:") == 3
+    assert out.count("Senior Engineer") == 3
+    assert out.count("Jane Doe - Resume") == 1
+
+
+def test_keeps_number_only_body_lines():
+    pages = ["\n".join([str(n), "Jane Doe - Resume", "Skills", "Years of experience", "5", "Projects shipped",
+                        "120", "More details.", "jane@example.com", f"- {n} -"]) for n in (1, 2, 3)]
+    out = normalize_resume_text("\f".join(pages)).split("\n")
+    assert out.count("5") == 3 and out.count("120") == 3
+    assert not any(line in ("1", "2", "3") or line.startswith("- ") for line in out)
+    assert out.count("Jane Doe - Resume") == 1 and out.count("jane@example.com") == 1
+
+
+def test_drops_marked_page_numbers_anywhere():
+    text = "Jane Doe\nExperience\nPage 2\nAcme Corp\n3/5\nBuilt APIs.\n4 of 5\nEducation\nBSc"
+    out = normalize_resume_text(text).split("\n")
+    assert out == ["Jane Doe", "Experience", "Acme Corp", "Built APIs.", "Education", "BSc"]
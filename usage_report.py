@@ -1,4 +1,144 @@
-"""Deprecated: token usage reporting removed."""
+"""Latency, throughput and token report over the llm_usage table.
+
+Examples:
+    python usage_report.py                       # per provider/model, all time
+    python usage_report.py --by job --job-id 42  # one job
+    python usage_report.py --by provider model engine --since-hours 24 --json
+"""
+import argparse
+import json
+import sys
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import numpy as np
+from sqlalchemy import select
+
+from database.db_manager import init_db
+from database.models import Usage
+
+GROUP_COLUMNS = {
+    "job": Usage.job_id,
+    "provider": Usage.provider,
+    "model": Usage.model,
+    "engine": Usage.engine,
+}
+
+
+def _pct(values: List[float], q: float) -> float | None:
+    return round(float(np.percentile(values, q)), 1) if values else None
+
+
+def build_report(group_by: List[str], job_id: int | None = None, provider: str | None = None,
+                 model: str | None = None, since_hours: float | None = None) -> List[Dict[str, Any]]:
+    engine, _ = init_db()
+    Usage.__table__.create(bind=engine, checkfirst=True)
+    group_cols = [GROUP_COLUMNS[g] for g in group_by]
+    stmt = select(
+        *group_cols, Usage.wall_ms, Usage.queue_ms, Usage.retries, Usage.resumes, Usage.input_tokens,
+        Usage.output_tokens, Usage.cached_tokens, Usage.tokens_estimated, Usage.cache_hit, Usage.error,
+        Usage.created_at,
+    )
+    if job_id is not None:
+        stmt = stmt.where(Usage.job_id == job_id)
+    if provider:
+        stmt = stmt.where(Usage.provider == provider)
+    if model:
+        stmt = stmt.where(Usage.model == model)
+    if since_hours:
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=since_hours)
+        stmt = stmt.where(Usage.created_at >= cutoff)
+
+    groups: Dict[tuple, Dict[str, Any]] = defaultdict(lambda: {
+        "wall": [], "queue": [], "calls": 0, "cache_hits": 0, "errors": 0, "retries": 0, "resumes": 0,
+        "input_tokens": 0, "output_tokens": 0, "cached_tokens": 0, "estimated": 0, "first": None, "last": None,
+    })
+    n = len(group_cols)
+    with engine.connect() as conn:
+        # Stream rows so large tables never sit in memory as ORM objects
+        for row in conn.execution_options(stream_results=True, yield_per=5000).execute(stmt):
+            key = tuple(row[:n])
+            (wall_ms, queue_ms, retries, resumes, in_tok, out_tok, cached_tok, estimated, cache_hit, error,
+             created_at) = row[n:]
+            g = groups[key]
+            g["resumes"] += resumes or 1
+            if cache_hit:
+                g["cache_hits"] += 1
+            else:
+                g["calls"] += 1
+                if wall_ms is not None:
+                    g["wall"].append(wall_ms)
+                if queue_ms is not None:
+                    g["queue"].append(queue_ms)
+            g["errors"] += int(bool(error))
+            g["retries"] += retries or 0
+            g["input_tokens"] += in_tok or 0
+            g["output_tokens"] += out_tok or 0
+            g["cached_tokens"] += cached_tok or 0
+            g["estimated"] += int(bool(estimated))
+            if created_at is not None:
+                g["first"] = created_at if g["first"] is None else min(g["first"], created_at)
+                g["last"] = created_at if g["last"] is None else max(g["last"], created_at)
+
+    report = []
+    for key, g in sorted(groups.items(), key=lambda kv: tuple(str(k) for k in kv[0])):
+        span = (g["last"] - g["first"]).total_seconds() if g["first"] and g["last"] else 0.0
+        calls = g["calls"]
+        report.append({
+            **dict(zip(group_by, key)),
+            "calls": calls,
+            "cache_hits": g["cache_hits"],
+            "errors": g["errors"],
+            "retries": g["retries"],
+            "resumes": g["resumes"],
+            "p50_ms": _pct(g["wall"], 50),
+            "p95_ms": _pct(g["wall"], 95),
+            "p99_ms": _pct(g["wall"], 99),
+            "queue_p95_ms": _pct(g["queue"], 95),
+            "resumes_per_min": round(g["resumes"] / span * 60, 1) if span > 0 else None,
+            "input_tokens": g["input_tokens"],
+            "output_tokens": g["output_tokens"],
+            "cached_tokens": g["cached_tokens"],
+            "avg_input_tokens": round(g["input_tokens"] / calls, 1) if calls else None,
+            "estimated_rows": g["estimated"],
+        })
+    return report
+
+
+def _print_table(rows: List[Dict[str, Any]]) -> None:
+    if not rows:
+        print("No usage rows match.")
+        return
+    headers = list(rows[0].keys())
+    cells = [[("—" if r[h] is None else str(r[h])) for h in headers] for r in rows]
+    widths = [max(len(h), *(len(c[i]) for c in cells)) for i, h in enumerate(headers)]
+    print("  ".join(h.ljust(w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for c in cells:
+        print("  ".join(v.ljust(w) for v, w in zip(c, widths)))
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Report LLM call latency, throughput and tokens.")
+    parser.add_argument("--by", nargs="+", choices=sorted(GROUP_COLUMNS), default=["provider", "model"],
+                        help="group rows by these columns (default: provider model)")
+    parser.add_argument("--job-id", type=int)
+    parser.add_argument("--provider")
+    parser.add_argument("--model")
+    parser.add_argument("--since-hours", type=float, help="only calls from the last N hours")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args(argv)
+
+    rows = build_report(args.by, job_id=args.job_id, provider=args.provider, model=args.model,
+                        since_hours=args.since_hours)
+    if args.json:
+        json.dump(rows, sys.stdout, indent=2, default=str)
+        print()
+    else:
+        _print_table(rows)
+    return 0
+
 
 if __name__ == "__main__":
-    print("usage_report disabled: token tracking removed from system.")
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""Parallel resume parsing stage.
+
+Parses uploads across CPU cores with a process pool. Each file gets a wall
+clock budget (SIGALRM inside the worker) and each worker an address-space
+cap, so one pathological PDF that falls through to pdfminer cannot stall or
+exhaust the batch. Every file yields a report dict: filename, text, method
+(PyPDF2 | pdfminer | docx), duration, error.
+
+The pool is created once per process and reused by every call. Its workers
+are started with ``forkserver`` (``spawn`` where that is unavailable), never
+``fork``: the app and the CLIs call this from multithreaded processes.
+Whenever a time or memory cap is configured, files are parsed in a worker
+even if there is only one, because the caps cannot be enforced in the
+caller (SIGALRM only works on the main thread, and Streamlit runs scripts
+on other threads).
+"""
+import atexit
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from config.settings import settings
+from .resume_parser import parse_resume_bytes_with_method
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore
+
+
+class ParseTimeout(BaseException):
+    """Raised in a worker when a file exceeds its budget.
+
+    Derives from BaseException so the broad ``except Exception`` fallbacks in
+    the parsers cannot swallow it and start the slow pdfminer path instead.
+    """
+
+
+def _current_vm_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _init_worker(memory_mb: int) -> None:
+    # Cap growth beyond the freshly started interpreter rather than a total size
+    if resource is None or memory_mb <= 0:
+        return
+    base = _current_vm_bytes()
+    if base is None:
+        return
+    limit = base + memory_mb * 1024 * 1024
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ValueError, OSError):
+        pass
+
+
+def _on_alarm(signum, frame):
+    raise ParseTimeout()
+
+
+def parse_one(filename: str, data: bytes, timeout: float = 0) -> Dict[str, Any]:
+    """Parse one file and report how it went; never raises for parser failures."""
+    report: Dict[str, Any] = {"filename": filename, "text": "", "method": None, "duration": 0.0, "error": None, "retryable": False}
+    use_alarm = bool(timeout) and hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+    start = time.perf_counter()
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        text, method = parse_resume_bytes_with_method(filename, data)
+        report["text"], report["method"] = text, method
+        if method is None:
+            report["error"] = "unsupported file type"
+        elif not text.strip():
+            report["error"] = "no text extracted"
+    except ParseTimeout:
+        report["error"] = f"timed out after {timeout:g}s"
+        report["retryable"] = True
+    except MemoryError:
+        report["error"] = "memory limit exceeded"
+        report["retryable"] = True
+    except Exception as e:
+        report["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    report["duration"] = time.perf_counter() - start
+    return report
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_key: Tuple[int, int] | None = None
+_pool_lock = threading.Lock()
+
+
+def _mp_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _get_pool(workers: int, memory_mb: int) -> ProcessPoolExecutor:
+    """The shared pool, rebuilt only when the worker count or memory cap changes (or it broke)."""
+    global _pool, _pool_key
+    with _pool_lock:
+        if _pool is not None and (_pool_key != (workers, memory_mb) or getattr(_pool, "_broken", False)):
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context(),
+                                        initializer=_init_worker, initargs=(memory_mb,))
+            _pool_key = (workers, memory_mb)
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+def parse_files(
+    files: Sequence[Tuple[str, bytes]],
+    max_workers: int | None = None,
+    timeout: float | None = None,
+    memory_mb: int | None = None,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> List[Dict[str, Any]]:
+    """Parse (filename, bytes) pairs in parallel; returns one report per input, in input order."""
+    total = len(files)
+    timeout = settings.parse_timeout if timeout is None else timeout
+    memory_mb = settings.parse_memory_mb if memory_mb is None else memory_mb
+    workers = max_workers or settings.parse_workers or os.cpu_count() or 1
+    reports: List[Dict[str, Any] | None] = [None] * total
+
+    if not total:
+        return []
+    if min(workers, total) <= 1 and not timeout and memory_mb <= 0:
+        for idx, (filename, data) in enumerate(files):
+            reports[idx] = parse_one(filename, data, timeout)
+            if on_progress:
+                on_progress(idx + 1, total)
+        return reports  # type: ignore[return-value]
+
+    done = 0
+    pool = _get_pool(workers, memory_mb)
+    futures = {pool.submit(parse_one, filename, data, timeout): idx for idx, (filename, data) in enumerate(files)}
+    for future in as_completed(futures):
+        idx = futures[future]
+        try:
+            reports[idx] = future.result()
+        except BrokenProcessPool:  # the next call starts a fresh pool
+            reports[idx] = {"filename": files[idx][0], "text": "", "method": None, "duration": 0.0,
+                            "error": "parser process crashed", "retryable": True}
+        done += 1
+        if on_progress:
+            on_progress(done, total)
+    return reports  # type: ignore[return-value]
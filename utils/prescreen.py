@@ -0,0 +1,152 @@
+"""Lexical prescreen that ranks resumes against the JD before any LLM call.
+
+Scores every resume with BM25 over the job-description terms (vectorised
+with NumPy), sends only the best candidates to the reviewer and files the
+rest as category C with the lexical score as ``match_score``. Shadow mode
+still reviews everyone so the prescreen's recall can be measured.
+"""
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or our that the their this to was we "
+    "were will with you your who what which can should must able about into over under across other etc per "
+    "also any all more most such than then these those they them work working years year experience".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in _STOPWORDS and len(t) > 1]
+
+
+def bm25_scores(query: str, docs: Sequence[str], k1: float = 1.5, b: float = 0.75) -> np.ndarray:
+    """BM25 score of each doc for the query; only query terms are materialised, so cost is O(total tokens)."""
+    q_terms = tokenize(query)
+    if not q_terms or not docs:
+        return np.zeros(len(docs), dtype=np.float64)
+    vocab: Dict[str, int] = {}
+    for t in q_terms:
+        vocab.setdefault(t, len(vocab))
+    q_weight = np.bincount([vocab[t] for t in q_terms], minlength=len(vocab)).astype(np.float64)
+    q_weight = np.minimum(q_weight, 3.0)  # repeated JD terms matter, but not linearly
+
+    rows: List[int] = []
+    cols: List[int] = []
+    doc_len = np.empty(len(docs), dtype=np.float64)
+    for i, doc in enumerate(docs):
+        toks = tokenize(doc)
+        doc_len[i] = len(toks)
+        hits = [vocab[t] for t in toks if t in vocab]
+        rows.extend([i] * len(hits))
+        cols.extend(hits)
+    tf = np.zeros((len(docs), len(vocab)), dtype=np.float64)
+    np.add.at(tf, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)), 1.0)
+
+    n = len(docs)
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((n - df + 0.5) / (df + 0.5))
+    avgdl = doc_len.mean() or 1.0
+    norm = k1 * (1.0 - b + b * doc_len / avgdl)
+    weighted = tf * (k1 + 1.0) / (tf + norm[:, None])
+    return weighted @ (idf * q_weight)
+
+
+def prescreen(job_desc: str, hr_prompt: str, resumes: Sequence[Tuple[int, str]], top_k: int | None = None,
+              threshold: int | None = None) -> Tuple[List[Tuple[int, str]], List[Dict[str, Any]], Dict[int, int]]:
+    """Split resumes into (selected for LLM review, screened-out results, lexical scores by resume id).
+
+    Lexical scores are scaled 0-100 with the best resume in the batch at 100.
+    ``threshold`` drops resumes scoring below it; ``top_k`` caps how many are kept.
+    With neither set every resume is selected.
+    """
+    resumes = list(resumes)
+    raw = bm25_scores(f"{job_desc}\n{hr_prompt or ''}", [text for _, text in resumes])
+    top = raw.max() if raw.size else 0.0
+    scaled = np.rint(raw / top * 100).astype(int) if top > 0 else np.zeros(len(resumes), dtype=int)
+    order = np.argsort(-raw, kind="stable")
+    scores = {resumes[i][0]: int(scaled[i]) for i in range(len(resumes))}
+
+    keep = np.ones(len(resumes), dtype=bool)
+    if threshold is not None and threshold > 0:
+        keep &= scaled >= threshold
+    if top_k is not None and top_k > 0:
+        ranked_keep = order[keep[order]][:top_k]
+        keep = np.zeros(len(resumes), dtype=bool)
+        keep[ranked_keep] = True
+
+    rank = np.empty(len(resumes), dtype=int)
+    rank[order] = np.arange(1, len(resumes) + 1)
+    selected: List[Tuple[int, str]] = []
+    screened_out: List[Dict[str, Any]] = []
+    for i, (resume_id, text) in enumerate(resumes):
+        if keep[i]:
+            selected.append((resume_id, text))
+        else:
+            screened_out.append({
+                "resume_id": resume_id,
+                "decision": "rejected",
+                "rationale": f"Lexical prescreen: score {scaled[i]}/100, ranked {rank[i]} of {len(resumes)}; not sent to the LLM.",
+                "category": "C",
+                "match_score": int(scaled[i]),
+                "cached": False,
+                "prescreened": True,
+            })
+    return selected, screened_out, scores
+
+
+def iter_review_with_prescreen(review_fn: Callable[..., Iterable[Dict[str, Any]]], chain, job_desc: str, hr_prompt: str,
+                               resumes: Sequence[Tuple[int, str]], top_k: int | None = None, threshold: int | None = None,
+                               shadow: bool = False, report: Dict[str, Any] | None = None,
+                               **review_kwargs) -> Iterator[Dict[str, Any]]:
+    """Yield results from ``review_fn`` behind the prescreen, in the order ``review_fn`` produces them.
+
+    ``review_fn`` may return a list or be a streaming iterator such as ``iter_review_resumes``.
+    Screened-out resumes are yielded first. The prescreen report is written into ``report``;
+    the shadow-mode ``recall`` is filled in once the last result has been yielded.
+    """
+    resumes = list(resumes)
+    selected, screened_out, scores = prescreen(job_desc, hr_prompt, resumes, top_k=top_k, threshold=threshold)
+    kept_ids = {rid for rid, _ in selected}
+    report = report if report is not None else {}
+    report.update({
+        "total": len(resumes),
+        "kept": len(selected),
+        "screened_out": len(screened_out),
+        "shadow": shadow,
+        "recall": None,
+        "missed": [],
+    })
+    if not shadow:
+        yield from screened_out
+        if selected:
+            yield from review_fn(chain, job_desc, hr_prompt, selected, **review_kwargs)
+        return
+
+    positives: List[int] = []
+    for r in review_fn(chain, job_desc, hr_prompt, resumes, **review_kwargs):
+        r["lexical_score"] = scores.get(r["resume_id"])
+        r["prescreen_kept"] = r["resume_id"] in kept_ids
+        if r.get("category") in ("A", "B") and not r.get("error"):
+            positives.append(r["resume_id"])
+        yield r
+    report["missed"] = [rid for rid in positives if rid not in kept_ids]
+    if positives:
+        report["recall"] = 1.0 - len(report["missed"]) / len(positives)
+
+
+def review_with_prescreen(review_fn: Callable[..., List[Dict[str, Any]]], chain, job_desc: str, hr_prompt: str,
+                          resumes: Sequence[Tuple[int, str]], top_k: int | None = None, threshold: int | None = None,
+                          shadow: bool = False, **review_kwargs) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Run ``review_fn`` (``review_resumes`` or ``review_resumes_async``) behind the prescreen.
+
+    In shadow mode every resume is reviewed and the report's ``recall`` is the share of
+    LLM A/B verdicts the prescreen would have kept (``missed`` lists the ones it would have dropped).
+    """
+    report: Dict[str, Any] = {}
+    results = list(iter_review_with_prescreen(review_fn, chain, job_desc, hr_prompt, resumes, top_k=top_k,
+                                              threshold=threshold, shadow=shadow, report=report, **review_kwargs))
+    results.sort(key=lambda x: x["resume_id"])
+    return results, report
@@ -0,0 +1,329 @@
+"""Persistent hashed n-gram index over every stored resume.
+
+Each resume is reduced to its ``RESUME_INDEX_TERMS`` highest-weighted word
+unigrams and bigrams (the prescreen tokenizer), weighted by sublinear term
+frequency x IDF, hashed into a 2^22 feature space and L2-normalised: a sparse
+keyword signature. Signatures are stored as append-only NumPy segments under
+``RESUME_INDEX_DIR``, laid out term-major (sorted feature ids + row + float16
+weight), so a query only touches the postings of its own terms. A
+document-frequency table kept alongside supplies the IDF weights. ``sync``
+embeds only rows with an id above the last indexed one, so keeping the index
+current costs one query when nothing changed.
+
+The app, ``worker.py`` and the CLIs may share one index directory. Loads,
+syncs, appends and merges hold an exclusive ``flock`` on ``index.lock`` and
+re-read ``meta.json`` under it first, so each writer appends after whatever
+another process already wrote and never deletes segments it no longer lists.
+
+A query takes a few milliseconds on 100k resumes. The hits can go straight
+into ``review_resumes``::
+
+    index = get_resume_index()
+    candidates = index.candidates(session, job_desc, hr_prompt, top_n=50)
+    results = review_resumes(chain, job_desc, hr_prompt, candidates)
+"""
+import json
+import os
+import threading
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from config.settings import settings
+from database.models import Resume
+from .prescreen import tokenize
+
+try:
+    import fcntl
+except ImportError:  # Windows: no inter-process lock, one writing process per index directory
+    fcntl = None  # type: ignore
+
+_FEATURE_BITS = 22  # 4M hashed features: collisions are rare and the df table stays at 16 MB
+_MAX_SEGMENTS = 16  # merge segments beyond this many so loading and querying stay cheap
+_FORMAT_VERSION = 2
+
+
+def features(text: str) -> Counter:
+    toks = tokenize(text)
+    feats = Counter(toks)
+    feats.update(f"{a} {b}" for a, b in zip(toks, toks[1:]))
+    return feats
+
+
+class _Hasher:
+    """Stable (process-independent) feature ids with a memo of already-seen features."""
+
+    def __init__(self):
+        self._memo: Dict[str, int] = {}
+
+    def __call__(self, feat: str) -> int:
+        fid = self._memo.get(feat)
+        if fid is None:
+            fid = zlib.crc32(feat.encode("utf-8")) & ((1 << _FEATURE_BITS) - 1)
+            if len(self._memo) > 2_000_000:  # bound memory on huge vocabularies
+                self._memo.clear()
+            self._memo[feat] = fid
+        return fid
+
+
+class _Segment:
+    """Term-major postings for a run of resumes: row i of the segment is ``ids[i]``."""
+
+    def __init__(self, ids: np.ndarray, feature: np.ndarray, row: np.ndarray, weight: np.ndarray):
+        self.ids = ids
+        self.feature = feature
+        self.row = row
+        self.weight = weight
+
+    @classmethod
+    def build(cls, ids: np.ndarray, doc_features: List[np.ndarray], doc_weights: List[np.ndarray]) -> "_Segment":
+        lengths = np.fromiter((len(f) for f in doc_features), dtype=np.int64, count=len(doc_features))
+        feature = np.concatenate(doc_features) if doc_features else np.empty(0, dtype=np.int32)
+        weight = np.concatenate(doc_weights) if doc_weights else np.empty(0, dtype=np.float16)
+        row = np.repeat(np.arange(len(ids), dtype=np.int32), lengths)
+        order = np.argsort(feature, kind="stable")
+        return cls(ids, feature[order].astype(np.int32), row[order], weight[order].astype(np.float16))
+
+    @classmethod
+    def merge(cls, segments: List["_Segment"]) -> "_Segment":
+        offsets = np.cumsum([0] + [len(s.ids) for s in segments[:-1]])
+        feature = np.concatenate([s.feature for s in segments])
+        row = np.concatenate([s.row + off for s, off in zip(segments, offsets)]).astype(np.int32)
+        weight = np.concatenate([s.weight for s in segments])
+        order = np.argsort(feature, kind="stable")
+        return cls(np.concatenate([s.ids for s in segments]), feature[order], row[order], weight[order])
+
+    def scores(self, q_features: np.ndarray, q_weights: np.ndarray) -> np.ndarray:
+        lo = np.searchsorted(self.feature, q_features, side="left")
+        hi = np.searchsorted(self.feature, q_features, side="right")
+        counts = hi - lo
+        out = np.zeros(len(self.ids), dtype=np.float32)
+        total = int(counts.sum())
+        if not total:
+            return out
+        # Flat index of every posting of every query feature, without a Python loop
+        starts = np.repeat(lo - np.cumsum(counts) + counts, counts)
+        idx = starts + np.arange(total)
+        qw = np.repeat(q_weights, counts)
+        np.add.at(out, self.row[idx], self.weight[idx].astype(np.float32) * qw)
+        return out
+
+
+class ResumeIndex:
+    def __init__(self, path: str | None = None, terms_per_resume: int | None = None):
+        self.path = path or settings.resume_index_dir
+        self.terms = terms_per_resume or settings.resume_index_terms
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_file: Any = None
+        self._hash = _Hasher()
+        self.df = np.zeros(1 << _FEATURE_BITS, dtype=np.int32)
+        self.count = 0
+        self.last_id = 0
+        self._segments: List[_Segment] = []
+        self._segment_files: List[str] = []
+        with self._locked():
+            pass  # loads meta.json under the lock
+
+    # -- storage -----------------------------------------------------------------
+    def _meta_path(self) -> str:
+        return os.path.join(self.path, "meta.json")
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Thread lock plus the inter-process file lock (re-entrant); the on-disk state is reloaded on entry."""
+        with self._lock:
+            if self._lock_depth == 0:
+                os.makedirs(self.path, exist_ok=True)
+                self._lock_file = open(os.path.join(self.path, "index.lock"), "a+")
+                if fcntl is not None:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                if self._lock_depth == 1:
+                    self._load()
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    self._lock_file.close()  # closing releases the flock
+                    self._lock_file = None
+
+    def _load(self) -> None:
+        """Bring the in-memory index up to date with meta.json, loading only segments not already in memory."""
+        if not os.path.exists(self._meta_path()):
+            return
+        with open(self._meta_path(), "r", encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if meta.get("version") != _FORMAT_VERSION:
+            print(f"[resume_index] Warning: index at {self.path} has an old format; rebuilding")
+            return
+        names = list(meta.get("segments", []))
+        if names == self._segment_files:
+            return
+        loaded = dict(zip(self._segment_files, self._segments))
+        segments = []
+        for name in names:
+            if name not in loaded:
+                with np.load(os.path.join(self.path, name)) as seg:
+                    loaded[name] = _Segment(seg["ids"], seg["feature"], seg["row"], seg["weight"])
+            segments.append(loaded[name])
+        self._segments, self._segment_files = segments, names
+        self.last_id = int(meta.get("last_id", 0))
+        self.count = sum(len(s.ids) for s in self._segments)
+        df_path = os.path.join(self.path, "df.npy")
+        if os.path.exists(df_path):
+            self.df = np.load(df_path)
+
+    def _write_meta(self) -> None:
+        meta = {"version": _FORMAT_VERSION, "last_id": self.last_id, "count": self.count,
+                "terms_per_resume": self.terms, "segments": self._segment_files}
+        tmp = self._meta_path() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(meta, fh)
+        os.replace(tmp, self._meta_path())  # readers see either the old or the new segment list
+
+    def _save_segment(self, seg: _Segment) -> str:
+        name = f"seg-{int(seg.ids[0]):010d}-{int(seg.ids[-1]):010d}.npz"
+        tmp = os.path.join(self.path, f"{name}.tmp.npz")
+        np.savez(tmp, ids=seg.ids, feature=seg.feature, row=seg.row, weight=seg.weight)
+        os.replace(tmp, os.path.join(self.path, name))
+        return name
+
+    def _append_segment(self, seg: _Segment) -> None:
+        """Persist a new segment (caller holds ``_locked``); merges once there are too many."""
+        self._segments.append(seg)
+        self._segment_files.append(self._save_segment(seg))
+        np.save(os.path.join(self.path, "df.npy"), self.df)
+        stale: List[str] = []
+        if len(self._segments) > _MAX_SEGMENTS:
+            merged = _Segment.merge(self._segments)
+            stale = self._segment_files
+            self._segments = [merged]
+            self._segment_files = [self._save_segment(merged)]
+        self._write_meta()
+        for name in stale:
+            if name not in self._segment_files:
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except OSError:
+                    pass
+
+    # -- embedding ---------------------------------------------------------------
+    def _idf(self, fids: np.ndarray) -> np.ndarray:
+        return np.log((self.count + 1) / (self.df[fids].astype(np.float32) + 1)) + 1.0
+
+    def _weighted(self, text: str, top: int | None) -> Tuple[np.ndarray, np.ndarray]:
+        feats = features(text)
+        if not feats:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        fids = np.fromiter((self._hash(f) for f in feats), dtype=np.int64, count=len(feats))
+        tf = np.fromiter(feats.values(), dtype=np.float32, count=len(feats))
+        fids, inverse = np.unique(fids, return_inverse=True)  # merge the rare hash collisions
+        tf = np.bincount(inverse, weights=tf).astype(np.float32)
+        weights = (1.0 + np.log(tf)) * self._idf(fids)
+        if top and len(fids) > top:
+            keep = np.argpartition(-weights, top - 1)[:top]
+            fids, weights = fids[keep], weights[keep]
+        norm = float(np.linalg.norm(weights))
+        return fids.astype(np.int32), (weights / norm if norm > 0 else weights)
+
+    # -- public API --------------------------------------------------------------
+    def add(self, rows: Iterable[Tuple[int, str]]) -> int:
+        """Index (resume_id, text) rows with ids above ``last_id``; returns how many were added."""
+        with self._locked():
+            rows = sorted((int(rid), text or "") for rid, text in rows if int(rid) > self.last_id)
+            if not rows:
+                return 0
+            # Count the batch's document frequencies first so its own rare terms get their IDF
+            all_feats = [np.unique(np.fromiter((self._hash(f) for f in features(text)), dtype=np.int64)) for _, text in rows]
+            for fids in all_feats:
+                self.df[fids] += 1
+            self.count += len(rows)
+            doc_features, doc_weights = [], []
+            for _, text in rows:
+                fids, weights = self._weighted(text, self.terms)
+                doc_features.append(fids)
+                doc_weights.append(weights.astype(np.float16))
+            ids = np.fromiter((rid for rid, _ in rows), dtype=np.int64, count=len(rows))
+            self.last_id = int(ids[-1])
+            self._append_segment(_Segment.build(ids, doc_features, doc_weights))
+            return len(rows)
+
+    def sync(self, session, batch_size: int = 2000) -> int:
+        """Embed every ``Resume`` stored since the last sync, reading the table in batches."""
+        added = 0
+        with self._locked():
+            while True:
+                rows = session.execute(
+                    select(Resume.id, Resume.content)
+                    .where(Resume.id > self.last_id)
+                    .order_by(Resume.id)
+                    .limit(batch_size)
+                ).all()
+                if not rows:
+                    return added
+                added += self.add(rows)
+
+    def search(self, job_desc: str, hr_prompt: str = "", top_n: int = 50, min_score: float | None = None,
+               exclude_ids: Iterable[int] | None = None) -> List[Tuple[int, float]]:
+        """Top-N (resume_id, cosine score) for a job description, best first."""
+        with self._lock:
+            segments = list(self._segments)
+            q_features, q_weights = self._weighted(f"{job_desc}\n{hr_prompt or ''}", None)
+        if not segments or not len(q_features):
+            return []
+        order = np.argsort(q_features)
+        q_features, q_weights = q_features[order], q_weights[order].astype(np.float32)
+        ids = np.concatenate([s.ids for s in segments])
+        scores = np.concatenate([s.scores(q_features, q_weights) for s in segments])
+        if exclude_ids:
+            scores[np.isin(ids, np.fromiter(exclude_ids, dtype=np.int64))] = -np.inf
+        k = min(top_n, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            (int(ids[i]), round(float(scores[i]), 4))
+            for i in top
+            if scores[i] > 0 and (min_score is None or scores[i] >= min_score)
+        ]
+
+    def candidates(self, session, job_desc: str, hr_prompt: str = "", top_n: int = 50, sync: bool = True,
+                   **search_kwargs) -> List[Tuple[int, str]]:
+        """(resume_id, text) of the best archived matches, ready for ``review_resumes``."""
+        if sync:
+            self.sync(session)
+        hits = self.search(job_desc, hr_prompt, top_n=top_n, **search_kwargs)
+        return load_resume_texts(session, [rid for rid, _ in hits])
+
+    def stats(self) -> Dict[str, Any]:
+        postings = sum(len(s.feature) for s in self._segments)
+        return {"path": self.path, "resumes": self.count, "last_id": self.last_id, "segments": len(self._segments),
+                "postings": postings, "memory_mb": round((postings * 10 + self.df.nbytes) / 1e6, 1)}
+
+
+def load_resume_texts(session, resume_ids: Sequence[int]) -> List[Tuple[int, str]]:
+    """Texts for ``resume_ids`` in the given order; ids no longer stored are skipped."""
+    texts: Dict[int, str] = {}
+    ids = list(resume_ids)
+    for i in range(0, len(ids), 500):
+        for rid, content in session.execute(select(Resume.id, Resume.content).where(Resume.id.in_(ids[i:i + 500]))):
+            texts[rid] = content
+    return [(rid, texts[rid]) for rid in ids if rid in texts]
+
+
+_index: ResumeIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_resume_index() -> ResumeIndex:
+    """Process-wide index at ``RESUME_INDEX_DIR`` (loaded once, shared by all sessions)."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ResumeIndex()
+        return _index
@@ -1,28 +1,38 @@
 from io import BytesIO
-from typing import BinaryIO
+from typing import BinaryIO, Tuple
 
 from PyPDF2 import PdfReader
 from pdfminer.high_level import extract_text as pdfminer_extract_text
 from docx import Document
 
 
-def parse_pdf(file_bytes: bytes) -> str:
+def parse_pdf_with_method(file_bytes: bytes) -> Tuple[str, str]:
+    """Return (text, method) where method is the extractor that produced the text."""
     try:
         # Fast path with PyPDF2
         pdf_reader = PdfReader(BytesIO(file_bytes))
         text = []
         for page in pdf_reader.pages:
             text.append(page.extract_text() or "")
-        out = "\n".join(text).strip()
+        # Form feed between pages, as pdfminer does: compaction uses it to find headers/footers
+        out = "\f".join(text).strip()
         if out:
-            return out
+            return out, "PyPDF2"
+    except MemoryError:
+        raise
     except Exception:
         pass
     # Fallback to pdfminer
     try:
-        return pdfminer_extract_text(BytesIO(file_bytes)) or ""
+        return pdfminer_extract_text(BytesIO(file_bytes)) or "", "pdfminer"
+    except MemoryError:
+        raise
     except Exception:
-        return ""
+        return "", "pdfminer"
+
+
+def parse_pdf(file_bytes: bytes) -> str:
+    return parse_pdf_with_method(file_bytes)[0]
 
 
 def parse_docx(file_bytes: bytes) -> str:
@@ -30,15 +40,24 @@ def parse_docx(file_bytes: bytes) -> str:
         bio = BytesIO(file_bytes)
         doc = Document(bio)
         return "\n".join(p.text for p in doc.paragraphs)
+    except MemoryError:
+        raise
     except Exception:
         return ""
 
 
-def parse_resume_file(uploaded_file) -> str:
-    data = uploaded_file.read()
-    name = uploaded_file.name.lower()
+def parse_resume_bytes_with_method(filename: str, data: bytes) -> Tuple[str, str | None]:
+    name = filename.lower()
     if name.endswith(".pdf"):
-        return parse_pdf(data)
+        return parse_pdf_with_method(data)
     if name.endswith(".docx"):
-        return parse_docx(data)
-    return ""
+        return parse_docx(data), "docx"
+    return "", None
+
+
+def parse_resume_bytes(filename: str, data: bytes) -> str:
+    return parse_resume_bytes_with_method(filename, data)[0]
+
+
+def parse_resume_file(uploaded_file) -> str:
+    return parse_resume_bytes(uploaded_file.name, uploaded_file.read())
@@ -1,17 +1,193 @@
-"""Deprecated module: token counting removed from system.
+"""Local token estimation and resume compaction.
 
-Left in place as a no-op to avoid import errors if any stale references remain.
-Will be safe to delete once confirmed unused across all deployments.
+``count_tokens`` uses tiktoken when it is installed and otherwise a fast
+regex estimate (within a few percent for English prose), so budgets can be
+enforced without calling a provider. ``compact_resume`` strips PDF-extraction
+noise (whitespace runs, page numbers, headers/footers repeated across pages)
+and, if a budget is given, trims low-priority sections until the text fits.
 """
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Sequence, Tuple
 
-class TokenUsage:  # minimal placeholder
-    def __init__(self, *_, **__):
-        self.input_tokens = 0
-        self.output_tokens = 0
-        self.total_tokens = 0
+_WORD_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_encoding: Any = None
+_encoding_loaded = False
 
-def compute_usage(*_, **__):  # no-op
-    return TokenUsage()
 
-def summarize_prompt(*parts, **_):
-    return ""
+def _get_encoding():
+    # Loaded lazily: tiktoken may need to fetch its vocabulary on first use
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:  # Optional: exact counts for OpenAI-style BPE vocabularies
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:  # pragma: no cover - tiktoken missing or offline
+            _encoding = None
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    # ~4 characters per token for words, one per punctuation mark
+    return sum(math.ceil(len(w) / 4) for w in _WORD_RE.findall(text))
+
+
+class TokenUsage:
+    def __init__(self, input_tokens: int = 0, output_tokens: int = 0):
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.total_tokens = input_tokens + output_tokens
+
+
+def compute_usage(prompt_text: str = "", output_text: str = "") -> TokenUsage:
+    """Estimated usage of one call, for providers that return no usage metadata."""
+    return TokenUsage(count_tokens(prompt_text), count_tokens(output_text))
+
+
+def summarize_prompt(*parts, max_chars: int = 200, **_) -> str:
+    text = " ".join(str(p) for p in parts if p)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text if len(text) <= max_chars else text[: max_chars - 1] + "…"
+
+
+# "Page 3", "Page 3 of 5", "3 of 5", "3/5": page numbers wherever they sit on the page
+_PAGE_MARKER_RE = re.compile(r"^[-–—]?\s*(?:page\s*\d{1,3}(?:\s*(?:of|/)\s*\d{1,3})?|\d{1,3}\s*(?:of|/)\s*\d{1,3})\s*[-–—]?$", re.I)
+# "3", "- 3 -": a page number only among a page's edge lines; elsewhere it is content (a table cell, a count)
+_BARE_NUMBER_RE = re.compile(r"^[-–—]?\s*\d{1,3}\s*[-–—]?$")
+_SPACES_RE = re.compile(r"[ \t\u00a0\u2000-\u200b\u3000]+")
+_EDGE_LINES = 2  # lines at the top and bottom of a page that may be a header/footer
+_MIN_REPEATED_PAGES = 3
+
+# Lower number = kept first when a resume must be truncated
+_SECTION_PRIORITY = [
+    (re.compile(r"^(professional\s+)?(summary|profile|objective|about( me)?)\b", re.I), 1),
+    (re.compile(r"^(technical\s+|core\s+|key\s+)?(skills|competencies|technologies|tech stack|expertise)\b", re.I), 1),
+    (re.compile(r"^(professional\s+|work\s+)?(experience|employment|work history|career history)\b", re.I), 2),
+    (re.compile(r"^(education|academic|qualifications)\b", re.I), 3),
+    (re.compile(r"^(projects|key projects|personal projects)\b", re.I), 3),
+    (re.compile(r"^(certifications?|licenses|courses|training)\b", re.I), 4),
+    (re.compile(r"^(languages|awards|achievements|honors)\b", re.I), 5),
+    (re.compile(r"^(publications|volunteer(ing)?|activities|memberships)\b", re.I), 6),
+    (re.compile(r"^(interests|hobbies|references|personal (details|information)|declaration)\b", re.I), 9),
+]
+
+
+def _heading_priority(line: str) -> int | None:
+    candidate = line.strip().rstrip(":").strip()
+    if not candidate or len(candidate) > 40:
+        return None
+    for pattern, priority in _SECTION_PRIORITY:
+        if pattern.match(candidate):
+            return priority
+    return None
+
+
+def normalize_resume_text(text: str) -> str:
+    """Collapse whitespace, drop page numbers and headers/footers repeated on three or more pages.
+
+    Pages are split on form feeds (``\f``), which the PDF parser puts between
+    pages. "Page 3" / "3 of 5" / "3/5" lines are dropped anywhere; a bare number
+    only among a page's first or last ``_EDGE_LINES`` lines. A header/footer is
+    a line among those edge lines on at least ``_MIN_REPEATED_PAGES`` pages; its
+    first occurrence is kept. Lines repeated in the body of a page are left alone.
+    """
+    pages = []
+    for page in (text or "").replace("\r\n", "\n").replace("\r", "\n").split("\f"):
+        lines = [_SPACES_RE.sub(" ", ln).strip() for ln in page.split("\n")]
+        lines = [ln for ln in lines if not _PAGE_MARKER_RE.match(ln)]
+        filled = [i for i, ln in enumerate(lines) if ln]
+        numbers = {i for i in filled[:_EDGE_LINES] + filled[-_EDGE_LINES:] if _BARE_NUMBER_RE.match(lines[i])}
+        if numbers:
+            lines = [ln for i, ln in enumerate(lines) if i not in numbers]
+            filled = [i for i, ln in enumerate(lines) if ln]
+        edges = set(filled[:_EDGE_LINES] + filled[-_EDGE_LINES:])
+        pages.append((lines, edges))
+    counts = Counter(ln for lines, edges in pages for ln in {lines[i] for i in edges} if len(ln) <= 120)
+    repeated = {ln for ln, n in counts.items() if n >= _MIN_REPEATED_PAGES}
+    out: List[str] = []
+    seen_repeated = set()
+    blank = False
+    for lines, edges in pages:
+        for i, ln in enumerate(lines):
+            if not ln:
+                if out and not blank:
+                    out.append("")
+                blank = True
+                continue
+            if i in edges and ln in repeated:
+                if ln in seen_repeated:
+                    continue
+                seen_repeated.add(ln)
+            out.append(ln)
+            blank = False
+    return "\n".join(out).strip()
+
+
+def _truncate_by_priority(text: str, token_budget: int) -> str:
+    sections: List[Dict[str, Any]] = [{"priority": 0, "lines": []}]  # preamble: name/contact
+    for ln in text.split("\n"):
+        priority = _heading_priority(ln)
+        if priority is not None:
+            sections.append({"priority": priority, "lines": [ln]})
+        else:
+            sections[-1]["lines"].append(ln)
+    for sec in sections:
+        sec["tokens"] = count_tokens("\n".join(sec["lines"]))
+
+    remaining = token_budget
+    keep: Dict[int, List[str]] = {}
+    for idx in sorted(range(len(sections)), key=lambda i: (sections[i]["priority"], i)):
+        sec = sections[idx]
+        if sec["tokens"] <= remaining:
+            keep[idx] = sec["lines"]
+            remaining -= sec["tokens"]
+            continue
+        # Keep the head of the first section that no longer fits, then stop
+        partial: List[str] = []
+        for ln in sec["lines"]:
+            cost = count_tokens(ln) + 1
+            if cost > remaining:
+                break
+            partial.append(ln)
+            remaining -= cost
+        if partial:
+            keep[idx] = partial + ["[... truncated]"]
+        break
+    return "\n".join("\n".join(keep[i]) for i in sorted(keep)).strip()
+
+
+def compact_resume(text: str, token_budget: int | None = None) -> Tuple[str, Dict[str, int]]:
+    """Return (compacted text, stats) with original/compacted/saved token counts."""
+    original = count_tokens(text)
+    compacted = normalize_resume_text(text)
+    truncated = 0
+    if token_budget and token_budget > 0 and count_tokens(compacted) > token_budget:
+        compacted = _truncate_by_priority(compacted, token_budget)
+        truncated = 1
+    final = count_tokens(compacted)
+    return compacted, {
+        "original_tokens": original,
+        "compacted_tokens": final,
+        "saved_tokens": max(0, original - final),
+        "truncated": truncated,
+    }
+
+
+def compact_resumes(resumes: Sequence[Tuple[int, str]], token_budget: int | None = None) -> Tuple[List[Tuple[int, str]], Dict[str, Any]]:
+    """Compact a batch; the report has per-resume stats plus batch totals."""
+    out: List[Tuple[int, str]] = []
+    report: Dict[str, Any] = {"per_resume": {}, "original_tokens": 0, "compacted_tokens": 0, "saved_tokens": 0, "truncated": 0}
+    for resume_id, text in resumes:
+        compacted, stats = compact_resume(text, token_budget)
+        out.append((resume_id, compacted))
+        report["per_resume"][resume_id] = stats
+        for key in ("original_tokens", "compacted_tokens", "saved_tokens", "truncated"):
+            report[key] += stats[key]
+    return out, report
@@ -0,0 +1,218 @@
+"""Screening worker: reviews the work items of queued jobs (``database/job_queue.py``) outside the UI.
+
+Run as many as needed, on any host that can reach the database. Each worker
+process claims a batch of one job's resumes and reviews them with that job's
+provider, temperature, engine and options. A heartbeat thread renews the
+lease while the batch runs, and each verdict is committed as it completes.
+On SIGINT or SIGTERM a worker hands back the items it has not finished.
+
+Examples:
+    python worker.py                          # WORKER_PROCESSES processes, run until stopped
+    python worker.py --processes 4 --batch-size 10
+    python worker.py --once                   # drain the queue, then exit
+"""
+import argparse
+import json
+import multiprocessing
+import signal
+import sys
+import threading
+import time
+from functools import partial
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import select
+
+from config.settings import settings
+from database.db_manager import init_db, migrate_schema
+from database.job_queue import claim_items, complete_items, queue_stats, release_items, renew_lease, worker_name
+from database.models import Base, Job, Resume
+from llm.async_engine import iter_review_resumes_async
+from llm.cascade import iter_review_resumes_cascade
+from llm.llm_handler import get_batch_reviewer_chain, get_reviewer_chain, iter_review_resumes, iter_review_resumes_packed
+from llm.usage_tracker import get_usage_recorder, usage_context
+from utils.token_counter import compact_resumes
+
+
+def _review_fn(job: Job, options: Dict[str, Any]) -> Callable:
+    """The streaming review function for ``job.engine``, with the job's options bound (mirrors the app)."""
+    hedge_provider = options.get("hedge_provider")
+    if job.engine == "async":
+        return iter_review_resumes_async
+    if job.engine == "packed":
+        return partial(iter_review_resumes_packed, hedge_provider=hedge_provider,
+                       batch_chain=get_batch_reviewer_chain(provider=job.provider, temperature=job.temperature))
+    if job.engine == "cascade":
+        screen_chain = None
+        if options.get("screen_provider"):
+            screen_chain = get_reviewer_chain(provider=options["screen_provider"], temperature=job.temperature,
+                                              model=options.get("screen_model"))
+        band = tuple(options["band"]) if options.get("band") else None
+        return partial(iter_review_resumes_cascade, screen_chain=screen_chain,
+                       screen_provider=options.get("screen_provider"), band=band, hedge_provider=hedge_provider)
+    return partial(iter_review_resumes, hedge_provider=hedge_provider, max_workers=options.get("max_workers", 5))
+
+
+class _Heartbeat(threading.Thread):
+    """Renews a claim's lease (every third of the lease, at most 10 s apart); cancels the batch on shutdown or a lost lease."""
+
+    def __init__(self, Session, owner: str, lease_seconds: float, cancel: threading.Event, stop: threading.Event):
+        super().__init__(name="lease-heartbeat", daemon=True)
+        self.Session = Session
+        self.owner = owner
+        self.lease_seconds = lease_seconds
+        self.cancel = cancel
+        self.stop = stop
+        self.done = threading.Event()
+
+    def run(self) -> None:
+        interval = min(10.0, self.lease_seconds / 3)
+        last_renewal = time.monotonic()
+        while not self.done.wait(min(1.0, interval)):
+            if self.stop.is_set():
+                self.cancel.set()
+                return
+            if time.monotonic() - last_renewal < interval:
+                continue
+            last_renewal = time.monotonic()
+            session = self.Session()
+            try:
+                if not renew_lease(session, self.owner, self.lease_seconds):
+                    self.cancel.set()  # cancelled job or reclaimed lease: stop spending tokens on it
+                    return
+            except Exception as e:
+                print(f"[worker] Warning: lease renewal failed: {e}", file=sys.stderr)
+            finally:
+                session.close()
+
+
+def process_claim(Session, owner: str, job_id: int, resume_ids: List[int], args, stop: threading.Event) -> Dict[str, int]:
+    """Review one claimed batch, committing verdicts every ``flush_size`` results or second."""
+    session = Session()
+    cancel = threading.Event()
+    heartbeat = _Heartbeat(Session, owner, args.lease_seconds, cancel, stop)
+    stats = {"reviewed": 0, "accepted": 0}
+    error = None
+    try:
+        job = session.get(Job, job_id)
+        options = json.loads(job.options or "{}")
+        texts = session.execute(select(Resume.id, Resume.content).where(Resume.id.in_(resume_ids))).all()
+        to_review, _ = compact_resumes([(rid, text) for rid, text in texts],
+                                       token_budget=options.get("token_budget", settings.resume_token_budget))
+        chain = get_reviewer_chain(provider=job.provider, temperature=job.temperature)
+        review_fn = _review_fn(job, options)
+        heartbeat.start()
+        buffer: List[Dict[str, Any]] = []
+        last_flush = time.monotonic()
+        with usage_context(job_id=job_id):
+            stream = review_fn(chain, job.description, job.hr_prompt or "", to_review, provider_name=job.provider,
+                               use_cache=options.get("use_cache", True), cancel_event=cancel)
+            try:
+                for result in stream:
+                    buffer.append(result)
+                    stats["reviewed"] += 1
+                    if len(buffer) >= args.flush_size or time.monotonic() - last_flush >= 1.0:
+                        stats["accepted"] += complete_items(session, owner, job_id, buffer, args.max_attempts)
+                        buffer, last_flush = [], time.monotonic()
+            finally:
+                stream.close()
+                if buffer:
+                    stats["accepted"] += complete_items(session, owner, job_id, buffer, args.max_attempts)
+    except Exception as e:
+        error = f"Review batch failed: {type(e).__name__}: {e}"
+        raise
+    finally:
+        heartbeat.done.set()
+        try:
+            # Unreviewed items go back to the queue. Only shutdown and cancellation refund the attempt;
+            # a crash (or a stream that ended early) counts, so a batch that always fails reaches max attempts.
+            if error is None and (stop.is_set() or cancel.is_set()):
+                release_items(session, owner)
+            else:
+                release_items(session, owner, error=error or "Review ended without a verdict.",
+                              max_attempts=args.max_attempts)
+        finally:
+            session.close()
+    return stats
+
+
+def run_worker(args, index: int = 0) -> int:
+    """Claim and review batches until stopped (or, with ``--once``, until the queue is drained)."""
+    _, Session = init_db()
+    stop = threading.Event()
+
+    def _stop(signum, _frame):
+        if stop.is_set():
+            raise KeyboardInterrupt
+        print(f"[worker {index}] stopping after handing back unfinished items", file=sys.stderr)
+        stop.set()
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+    name = f"{worker_name()}#{index}"
+    try:
+        while not stop.is_set():
+            session = Session()
+            try:
+                claim = claim_items(session, name, args.batch_size, args.lease_seconds, args.max_attempts)
+                pending = queue_stats(session) if claim is None and args.once else {}
+            finally:
+                session.close()
+            if claim is None:
+                if args.once and not pending.get("pending") and not pending.get("leased"):
+                    return 0
+                stop.wait(args.poll_interval)
+                continue
+            owner, job_id, resume_ids = claim
+            started = time.monotonic()
+            try:
+                stats = process_claim(Session, owner, job_id, resume_ids, args, stop)
+            except Exception as e:
+                print(f"[worker {index}] job {job_id}: batch failed: {type(e).__name__}: {e}", file=sys.stderr)
+                stop.wait(args.poll_interval)
+                continue
+            print(f"[worker {index}] job {job_id}: {stats['accepted']}/{len(resume_ids)} stored "
+                  f"in {time.monotonic() - started:.1f}s", file=sys.stderr)
+    finally:
+        get_usage_recorder().flush()
+    return 0
+
+
+def _child(args, index: int) -> None:
+    sys.exit(run_worker(args, index))
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Review queued screening jobs.")
+    parser.add_argument("--processes", type=int, default=settings.worker_processes)
+    parser.add_argument("--batch-size", type=int, default=settings.worker_batch_size, help="resumes leased per claim")
+    parser.add_argument("--lease-seconds", type=float, default=settings.worker_lease_seconds)
+    parser.add_argument("--max-attempts", type=int, default=settings.worker_max_attempts)
+    parser.add_argument("--poll-interval", type=float, default=settings.worker_poll_interval)
+    parser.add_argument("--flush-size", type=int, default=10, help="verdicts per commit")
+    parser.add_argument("--once", action="store_true", help="exit when no queued work is left")
+    args = parser.parse_args(argv)
+
+    engine, _ = init_db()
+    Base.metadata.create_all(bind=engine)
+    migrate_schema(engine)
+    if args.processes <= 1:
+        return run_worker(args)
+
+    # Fresh interpreters: no inherited DB connections, HTTP pools or threads
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_child, args=(args, i), name=f"worker-{i}") for i in range(args.processes)]
+    for p in procs:
+        p.start()
+    signal.signal(signal.SIGTERM, lambda *_: [p.terminate() for p in procs if p.is_alive()])  # children stop gracefully
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        for p in procs:  # the terminal already sent SIGINT to every child; wait for them to hand back items
+            p.join()
+    return 0 if all(p.exitcode == 0 for p in procs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())